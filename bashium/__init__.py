@@ -0,0 +1 @@
+"""BASHIUM support modules (kept free of GUI imports)."""
@@ -0,0 +1,5 @@
+import sys
+
+from bashium.cli import main
+
+sys.exit(main())
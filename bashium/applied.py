@@ -0,0 +1,182 @@
+"""Records of successfully applied modules, so satisfied modules can be skipped.
+
+A record holds a fingerprint of what the module was run with: a hash of
+its manifest and scripts, the inputs of the run (profile answers) and the
+state of the files it changes (the manifest's `watch` paths, stat calls
+only). The record is valid while all of them are unchanged and the
+packages that were installed at the time still are.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+from bashium.paths import state_dir
+from bashium.scheduler import DONE
+
+STORE_VERSION = 1
+
+# (path, mtime_ns, size) -> sha256 of the file, for this process
+_file_hashes: dict[tuple[str, int, int], str] = {}
+_hash_lock = threading.Lock()
+
+
+def _file_hash(path: Path) -> str:
+    try:
+        st = path.stat()
+    except OSError:
+        return "-"
+    key = (str(path), st.st_mtime_ns, st.st_size)
+    with _hash_lock:
+        cached = _file_hashes.get(key)
+    if cached is not None:
+        return cached
+    try:
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return "-"
+    with _hash_lock:
+        _file_hashes[key] = digest
+    return digest
+
+
+def scripts_digest(module) -> str:
+    """Hash of the manifest and every script the module runs."""
+    h = hashlib.sha256()
+    paths = list(module.scripts)
+    if module.manifest is not None and module.manifest.source is not None:
+        paths.append(module.manifest.source)
+    for path in paths:
+        h.update(f"\0{path.name}\0{_file_hash(path)}".encode())
+    return h.hexdigest()
+
+
+def _stat_token(path: Path) -> str:
+    try:
+        st = path.stat()
+    except OSError:
+        return "-"
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def watch_digest(paths: Iterable[Path]) -> str:
+    """Hash of the stat() of each path, and of each entry of the directories among them."""
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(f"\0{path}\0{_stat_token(path)}".encode())
+        if not path.is_dir():
+            continue
+        # In-place edits do not change the directory mtime
+        try:
+            names = sorted(os.listdir(path))
+        except OSError:
+            continue
+        for name in names:
+            h.update(f"\0{name}\0{_stat_token(path / name)}".encode())
+    return h.hexdigest()
+
+
+def inputs_digest(inputs) -> Optional[str]:
+    """Hash of JSON-serialisable run inputs; None for an interactive run."""
+    if inputs is None:
+        return None
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+# Inputs of a run from the GUI: answered in the terminal, no profile
+INTERACTIVE_INPUTS = inputs_digest({})
+
+
+class AppliedStore:
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or state_dir() / "applied.json"
+        self.records: dict[str, dict] = self._read()
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict[str, dict]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception:
+            return {}
+        if data.get("version") != STORE_VERSION or not isinstance(data.get("modules"), dict):
+            return {}
+        return data["modules"]
+
+    def _write(self, update: dict[str, Optional[dict]]) -> None:
+        with self._lock:
+            # Re-read first: the GUI and `bashium apply` may both record modules
+            records = self._read()
+            for name, record in update.items():
+                if record is None:
+                    records.pop(name, None)
+                else:
+                    records[name] = record
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"version": STORE_VERSION, "modules": records}, indent=2), encoding="utf-8")
+            os.replace(tmp, self.path)
+            self.records = records
+
+    def fingerprint(self, module, inputs: Optional[str] = None) -> dict:
+        watch = module.manifest.watch if module.manifest is not None else ()
+        return {
+            "scripts": scripts_digest(module),
+            "watch": watch_digest(watch),
+            "inputs": inputs,
+        }
+
+    def record(self, module, inputs: str, dpkg=None) -> None:
+        """Store the fingerprint after a successful run.
+
+        `inputs` comes from inputs_digest(): the profile inputs of an
+        unattended run, INTERACTIVE_INPUTS for a run from the GUI.
+        """
+        record = self.fingerprint(module, inputs)
+        record["applied"] = time.time()
+        record["packages"] = [p for p in module.packages if dpkg.is_installed(p)] if dpkg is not None else []
+        self._write({module.name: record})
+
+    def forget(self, *names: str) -> None:
+        self._write({name: None for name in names})
+
+    def clear(self) -> None:
+        self._write({name: None for name in self._read()})
+
+    def check(self, module, inputs: Optional[str] = None, dpkg=None) -> str:
+        """Empty if the module is satisfied, otherwise why it has to run."""
+        record = self.records.get(module.name)
+        if record is None:
+            return "not applied"
+        current = self.fingerprint(module, inputs)
+        if record.get("scripts") != current["scripts"]:
+            return "scripts changed"
+        if record.get("watch") != current["watch"]:
+            return "watched files changed"
+        if record.get("inputs") is None:
+            # Left by older versions, which recorded runs without their inputs
+            return "interactive run"
+        # A check without inputs (the GUI) accepts any recorded run
+        if inputs is not None and record.get("inputs") != inputs:
+            return "different inputs"
+        if dpkg is not None:
+            missing = dpkg.missing(record.get("packages") or [])
+            if missing:
+                return f"packages removed: {' '.join(missing)}"
+        return ""
+
+    def satisfied(self, module, inputs: Optional[str] = None, dpkg=None) -> bool:
+        return not self.check(module, inputs, dpkg)
+
+
+def mark_satisfied(jobs: list, store: AppliedStore, inputs: Optional[str] = None, dpkg=None) -> list:
+    """Mark jobs of satisfied modules as done before scheduling; dependents still run."""
+    marked = []
+    for job in jobs:
+        if store.satisfied(job.module, inputs, dpkg):
+            job.state, job.returncode, job.reason = DONE, 0, "already applied"
+            marked.append(job)
+    return marked
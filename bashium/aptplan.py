@@ -0,0 +1,281 @@
+"""Batch the `apt install` calls of several module scripts into one transaction."""
+
+import os
+import re
+import shlex
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+from bashium.trace import spawn_span
+
+APT_GET = "apt-get"
+APT_CACHE = "apt-cache"
+
+# apt-get/apt options that consume the following argument
+_OPTIONS_WITH_VALUE = {"-t", "--target-release", "-o", "--option", "-c", "--config-file"}
+
+# Optionally behind a case pattern, VAR=value assignments, `env` and `sudo`
+# (with flags such as -E)
+_INSTALL_RE = re.compile(
+    r"^\s*(?:[\w*|.-]+\)\s*)?(?:(?:[A-Za-z_]\w*=\S*|env|sudo(?:\s+-[A-Za-z]+)*)\s+)*"
+    r"apt(?:-get)?\s+(?:\S+\s+)*?install\s+(.*)$"
+)
+_INST_RE = re.compile(r"^Inst (\S+)(?: \[([^\]]*)\])?(?: \((\S+))?")
+_NEED_RE = re.compile(r"^Need to get (?:[\d.,]+ [kMGT]?B/)?([\d.,]+ [kMGT]?B) of archives")
+_AFTER_RE = re.compile(r"^After this operation, ([\d.,]+ [kMGT]?B) (?:of additional disk space will be used|disk space will be freed)")
+
+_UNITS = {"B": 1, "kB": 1000, "MB": 1000**2, "GB": 1000**3, "TB": 1000**4}
+
+
+# Blocks whose body may not run: if/case and function bodies
+_BLOCK_OPEN_RE = re.compile(r"(?:^|[;&|]|\bthen\b|\belse\b|\bdo\b)\s*(if|case)\b")
+_BLOCK_CLOSE_RE = re.compile(r"(?:^|;)\s*(fi|esac)\b")
+_FUNCTION_RE = re.compile(r"^\s*(?:function\s+)?[\w-]+\s*\(\)\s*\{?\s*$")
+_FUNCTION_END_RE = re.compile(r"^\s*\}\s*$")
+_HEREDOC_RE = re.compile(r"(?<!<)<<-?\s*(['\"]?)(\w+)\1")
+_COMMENT_RE = re.compile(r"(?:^|\s)#.*$")
+
+
+def _install_packages(line: str) -> list[str]:
+    m = _INSTALL_RE.match(line)
+    if not m:
+        return []
+    try:
+        tokens = shlex.split(m.group(1))
+    except ValueError:
+        return []
+    packages = []
+    skip = False
+    for tok in tokens:
+        if skip:
+            skip = False
+            continue
+        if tok in _OPTIONS_WITH_VALUE:
+            skip = True
+            continue
+        if tok.startswith("-") or "$" in tok or tok in (";", ";;", "&&", "||", "|"):
+            continue
+        packages.append(tok)
+    return packages
+
+
+def script_packages(path: Path) -> list[tuple[str, bool]]:
+    """(package, conditional) for each package passed to `apt install` / `apt-get install`.
+
+    A package is conditional when its install line is inside an if/case block
+    or a function, i.e. whether it is installed depends on the answers or the
+    hardware.
+    """
+    try:
+        text = path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return []
+
+    packages: list[tuple[str, bool]] = []
+    blocks: list[str] = []
+    heredoc = None
+    for line in text.splitlines():
+        if heredoc is not None:
+            if line.strip() == heredoc:
+                heredoc = None
+            continue
+        code = _COMMENT_RE.sub("", line)
+        packages.extend((pkg, bool(blocks)) for pkg in _install_packages(code))
+
+        if _FUNCTION_RE.match(code):
+            blocks.append("function")
+        elif _FUNCTION_END_RE.match(code) and blocks and blocks[-1] == "function":
+            blocks.pop()
+        # Opened and closed on one line, e.g. "if [[ $x ]]; then y; fi", cancel out
+        for m in _BLOCK_OPEN_RE.finditer(code):
+            blocks.append(m.group(1))
+        for m in _BLOCK_CLOSE_RE.finditer(code):
+            if blocks and blocks[-1] != "function":
+                blocks.pop()
+        m = _HEREDOC_RE.search(code)
+        if m:
+            heredoc = m.group(2)
+    return packages
+
+
+def packages_from_script(path: Path) -> list[str]:
+    """Package names passed to `apt install` / `apt-get install` in a shell script."""
+    return [pkg for pkg, _ in script_packages(path)]
+
+
+def collect_packages(scripts: Iterable[Path]) -> list[str]:
+    """Ordered, de-duplicated union of the packages of all scripts."""
+    seen: dict[str, None] = {}
+    for script in scripts:
+        for pkg in packages_from_script(script):
+            seen.setdefault(pkg, None)
+    return list(seen)
+
+
+def conditional_packages(scripts: Iterable[Path]) -> set[str]:
+    """Packages of the scripts that are never installed unconditionally."""
+    conditional: set[str] = set()
+    always: set[str] = set()
+    for script in scripts:
+        for pkg, is_conditional in script_packages(script):
+            (conditional if is_conditional else always).add(pkg)
+    return conditional - always
+
+
+def parse_size(text: str) -> int:
+    number, _, unit = text.partition(" ")
+    try:
+        return int(float(number.replace(",", "")) * _UNITS.get(unit, 1))
+    except ValueError:
+        return 0
+
+
+def format_size(size: int) -> str:
+    value = float(abs(size))
+    for unit in ("B", "kB", "MB", "GB"):
+        if value < 1000 or unit == "GB":
+            break
+        value /= 1000
+    sign = "-" if size < 0 else ""
+    return f"{sign}{value:.0f} {unit}" if unit == "B" else f"{sign}{value:.1f} {unit}"
+
+
+@dataclass
+class AptPlan:
+    requested: list[str]
+    # (package, new version) for every package apt would unpack
+    install: list[tuple[str, str]] = field(default_factory=list)
+    upgrade: list[tuple[str, str]] = field(default_factory=list)
+    download_bytes: int = 0
+    # Change in installed size; negative when space is freed
+    installed_bytes: int = 0
+    errors: list[str] = field(default_factory=list)
+    returncode: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.errors
+
+    def summary(self) -> str:
+        lines = [f"Requested packages ({len(self.requested)}): {' '.join(self.requested) or '-'}"]
+        if self.install:
+            lines.append(f"New ({len(self.install)}): {' '.join(p for p, _ in self.install)}")
+        if self.upgrade:
+            lines.append(f"Upgraded ({len(self.upgrade)}): {' '.join(p for p, _ in self.upgrade)}")
+        if not self.install and not self.upgrade and self.ok:
+            lines.append("Nothing to install, all packages are up to date.")
+        lines.append(f"Download size: {format_size(self.download_bytes)}")
+        lines.append(f"Installed size change: {format_size(self.installed_bytes)}")
+        lines.extend(self.errors)
+        return "\n".join(lines)
+
+
+def apt_env() -> dict[str, str]:
+    # Output is parsed, so keep it untranslated
+    return {**os.environ, "LC_ALL": "C", "LANG": "C"}
+
+
+def _cache_sizes(packages: list[str], apt_cache: str) -> tuple[int, int]:
+    """Candidate download and installed sizes from `apt-cache show`."""
+    if not packages:
+        return 0, 0
+    argv = [apt_cache, "show", "--no-all-versions", *packages]
+    try:
+        with spawn_span(argv):
+            out = subprocess.run(
+                argv,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                env=apt_env(),
+                check=False,
+            ).stdout
+    except Exception:
+        return 0, 0
+
+    download = installed = 0
+    for line in out.splitlines():
+        if line.startswith("Size:"):
+            download += parse_size(line[5:].strip())
+        elif line.startswith("Installed-Size:"):
+            # Installed-Size is in KiB
+            installed += parse_size(line[15:].strip()) * 1024
+    return download, installed
+
+
+def parse_simulation(output: str, plan: AptPlan) -> AptPlan:
+    for line in output.splitlines():
+        m = _INST_RE.match(line)
+        if m:
+            name, old, new = m.group(1), m.group(2), m.group(3) or ""
+            (plan.upgrade if old else plan.install).append((name, new))
+            continue
+        m = _NEED_RE.match(line)
+        if m:
+            plan.download_bytes = parse_size(m.group(1))
+            continue
+        m = _AFTER_RE.match(line)
+        if m:
+            size = parse_size(m.group(1))
+            plan.installed_bytes = -size if line.rstrip().endswith("freed.") else size
+            continue
+        if line.startswith("E: "):
+            plan.errors.append(line)
+    return plan
+
+
+def simulate(packages: list[str], apt_get: str = APT_GET, apt_cache: str = APT_CACHE) -> AptPlan:
+    """Dry-run (`apt-get -s install`) of one transaction for all packages."""
+    plan = AptPlan(requested=list(packages))
+    if not packages:
+        return plan
+
+    argv = [apt_get, "-s", "install", *packages]
+    try:
+        with spawn_span(argv):
+            proc = subprocess.run(
+                argv,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                env=apt_env(),
+                check=False,
+            )
+    except Exception as e:
+        plan.errors.append(f"E: failed to run {apt_get}: {e}")
+        plan.returncode = 1
+        return plan
+
+    plan.returncode = proc.returncode
+    parse_simulation(proc.stdout, plan)
+
+    if not plan.download_bytes and (plan.install or plan.upgrade):
+        # No size summary in the simulation output; ask apt-cache instead
+        plan.download_bytes, plan.installed_bytes = _cache_sizes(
+            [p for p, _ in plan.install + plan.upgrade], apt_cache
+        )
+    return plan
+
+
+def install_command(packages: list[str], apt_get: str = APT_GET) -> list[str]:
+    argv = [apt_get, "install", "-y", *packages]
+    if os.geteuid() != 0:
+        argv.insert(0, "sudo")
+    return argv
+
+
+def execute(packages: list[str], apt_get: str = APT_GET) -> int:
+    """Run the single install transaction with output on the terminal."""
+    if not packages:
+        return 0
+    argv = install_command(packages, apt_get)
+    try:
+        with spawn_span(argv):
+            return subprocess.run(argv, check=False).returncode
+    except Exception as e:
+        raise RuntimeError(f"Failed to run {apt_get}: {e}")
+
@@ -0,0 +1,188 @@
+"""In-process parser and index for APT sources (one-line `.list` and deb822 `.sources`)."""
+
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+APT_SOURCES_LIST = Path("/etc/apt/sources.list")
+APT_SOURCES_DIR = Path("/etc/apt/sources.list.d")
+
+# Components reported by `main.py sources` and shown in the module status tables
+TRACKED_COMPONENTS = ("main", "contrib", "non-free", "non-free-firmware")
+
+
+@dataclass(frozen=True)
+class SourceEntry:
+    path: Path
+    types: tuple[str, ...]
+    uris: tuple[str, ...]
+    suites: tuple[str, ...]
+    components: tuple[str, ...]
+    enabled: bool = True
+
+
+def parse_one_line(text: str, path: Path) -> list[SourceEntry]:
+    entries = []
+    for raw in text.splitlines():
+        line = raw.split("#", 1)[0].strip()
+        if not line:
+            continue
+
+        # Drop "[arch=amd64 signed-by=...]" options
+        if "[" in line:
+            head, _, rest = line.partition("[")
+            _, _, tail = rest.partition("]")
+            line = f"{head} {tail}"
+
+        fields = line.split()
+        if len(fields) < 3 or fields[0] not in ("deb", "deb-src"):
+            continue
+        entries.append(
+            SourceEntry(
+                path=path,
+                types=(fields[0],),
+                uris=(fields[1],),
+                suites=(fields[2],),
+                components=tuple(fields[3:]),
+            )
+        )
+    return entries
+
+
+def _deb822_stanzas(text: str) -> Iterable[dict[str, str]]:
+    stanza: dict[str, str] = {}
+    key: Optional[str] = None
+    for raw in text.splitlines():
+        if raw.startswith("#"):
+            continue
+        if not raw.strip():
+            if stanza:
+                yield stanza
+            stanza, key = {}, None
+            continue
+        if raw[0] in " \t":
+            if key is not None:
+                stanza[key] += " " + raw.strip()
+            continue
+        name, sep, value = raw.partition(":")
+        if not sep:
+            continue
+        key = name.strip().lower()
+        stanza[key] = value.strip()
+    if stanza:
+        yield stanza
+
+
+def parse_deb822(text: str, path: Path) -> list[SourceEntry]:
+    entries = []
+    for stanza in _deb822_stanzas(text):
+        types = tuple(t for t in stanza.get("types", "").split() if t in ("deb", "deb-src"))
+        uris = tuple(stanza.get("uris", "").split())
+        suites = tuple(stanza.get("suites", "").split())
+        if not types or not uris or not suites:
+            continue
+        entries.append(
+            SourceEntry(
+                path=path,
+                types=types,
+                uris=uris,
+                suites=suites,
+                components=tuple(stanza.get("components", "").split()),
+                enabled=stanza.get("enabled", "yes").lower() not in ("no", "false", "0"),
+            )
+        )
+    return entries
+
+
+_file_cache: dict[Path, tuple[tuple[int, int], list[SourceEntry]]] = {}
+_file_cache_lock = threading.Lock()
+
+
+def _parse_file(path: Path) -> list[SourceEntry]:
+    try:
+        st = path.stat()
+    except OSError:
+        return []
+    key = (st.st_mtime_ns, st.st_size)
+
+    with _file_cache_lock:
+        cached = _file_cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    try:
+        text = path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return []
+    entries = parse_deb822(text, path) if path.suffix == ".sources" else parse_one_line(text, path)
+    with _file_cache_lock:
+        _file_cache[path] = (key, entries)
+    return entries
+
+
+def source_files(sources_list: Path = APT_SOURCES_LIST, sources_dir: Path = APT_SOURCES_DIR) -> list[Path]:
+    files = [sources_list]
+    try:
+        # APT itself ignores files with other extensions
+        files.extend(
+            sources_dir / name
+            for name in sorted(os.listdir(sources_dir))
+            if name.endswith((".list", ".sources"))
+        )
+    except OSError:
+        pass
+    return files
+
+
+class SourcesIndex:
+    """Enabled binary (`deb`) repositories: uri -> suite -> components."""
+
+    def __init__(self, entries: list[SourceEntry]):
+        self.entries = entries
+        self.repositories: dict[str, dict[str, set[str]]] = {}
+        for entry in entries:
+            if not entry.enabled or "deb" not in entry.types:
+                continue
+            for uri in entry.uris:
+                suites = self.repositories.setdefault(uri.rstrip("/"), {})
+                for suite in entry.suites:
+                    suites.setdefault(suite, set()).update(entry.components)
+
+    def components(self) -> set[str]:
+        found: set[str] = set()
+        for suites in self.repositories.values():
+            for components in suites.values():
+                found |= components
+        return found
+
+    def suites(self) -> set[str]:
+        return {suite for suites in self.repositories.values() for suite in suites}
+
+    def has_component(self, component: str) -> bool:
+        return component in self.components()
+
+    def component_status(self, components: Iterable[str] = TRACKED_COMPONENTS) -> dict[str, bool]:
+        enabled = self.components()
+        return {c: c in enabled for c in components}
+
+    def to_dict(self) -> dict:
+        return {
+            "components": self.component_status(),
+            "repositories": {
+                uri: {suite: sorted(components) for suite, components in suites.items()}
+                for uri, suites in self.repositories.items()
+            },
+        }
+
+
+def load_sources_index(
+    sources_list: Path = APT_SOURCES_LIST,
+    sources_dir: Path = APT_SOURCES_DIR,
+) -> SourcesIndex:
+    """Build the index; unchanged files are served from the mtime-keyed parse cache."""
+    entries: list[SourceEntry] = []
+    for path in source_files(sources_list, sources_dir):
+        entries.extend(_parse_file(path))
+    return SourcesIndex(entries)
@@ -0,0 +1,303 @@
+"""Content-addressed asset pack: one file holding the Xfce Look archives' contents.
+
+Layout: MAGIC, blobs, JSON index, trailer (MAGIC, index offset, index size).
+Each unique file content is stored once, keyed by SHA-256, either raw
+("stored"; large ones 4 KiB aligned so the kernel can copy or reflink them) or
+as raw deflate when that saves at least 10%. Already-compressed images stay
+stored, so installing them is a plain copy_file_range() with no inflate.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import stat
+import struct
+import time
+import zipfile
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+MAGIC = b"BSHPACK\x01"
+PACK_VERSION = 1
+PACK_NAME = "assets.pack"
+
+_TRAILER = struct.Struct("<8sQQ")
+_ALIGN = 4096
+# Smaller stored blobs are not aligned; the padding would outweigh them
+_ALIGN_MIN = 64 * 1024
+_CHUNK = 1024 * 1024
+# Deflate only when it saves at least this fraction of the size
+_MIN_SAVING = 0.10
+
+STORED = "stored"
+DEFLATED = "deflated"
+
+# Entry types
+FILE = "f"
+DIR = "d"
+SYMLINK = "l"
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC
+
+
+class PackError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Blob:
+    offset: int
+    size: int
+    stored_size: int
+    method: str
+
+
+@dataclass(frozen=True)
+class PackGroup:
+    """The contents of one source archive (e.g. themes/Gruvbox-B-MB-Dark.zip)."""
+
+    kind: str
+    name: str
+    # SHA-256 over the entry list, so unchanged groups keep their digest across rebuilds
+    digest: str
+    # [path, type, mode, mtime, blob sha / symlink target / None]
+    entries: tuple
+
+    @property
+    def key(self) -> str:
+        return f"{self.kind}/{self.name}"
+
+
+class AssetPack:
+    def __init__(self, path: Path):
+        self.path = path
+        with path.open("rb") as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            if end < len(MAGIC) + _TRAILER.size:
+                raise PackError(f"{path}: truncated pack")
+            f.seek(end - _TRAILER.size)
+            magic, index_offset, index_size = _TRAILER.unpack(f.read(_TRAILER.size))
+            if magic != MAGIC or index_offset + index_size > end:
+                raise PackError(f"{path}: not an asset pack")
+            f.seek(index_offset)
+            try:
+                index = json.loads(f.read(index_size))
+            except ValueError as e:
+                raise PackError(f"{path}: corrupt index: {e}")
+        if index.get("version") != PACK_VERSION:
+            raise PackError(f"{path}: unsupported pack version {index.get('version')}")
+
+        self.blobs = {sha: Blob(*info) for sha, info in index["blobs"].items()}
+        self.groups = {
+            f"{g['kind']}/{g['name']}": PackGroup(g["kind"], g["name"], g["digest"], tuple(g["entries"]))
+            for g in index["groups"]
+        }
+
+    def blob_bytes(self, sha: str) -> bytes:
+        """Content of one blob (e.g. a wallpaper for a thumbnail)."""
+        blob = self.blobs[sha]
+        with self.path.open("rb") as f:
+            f.seek(blob.offset)
+            data = f.read(blob.stored_size)
+        return zlib.decompress(data, -15) if blob.method == DEFLATED else data
+
+
+_open_packs: dict[tuple[str, int, int], AssetPack] = {}
+
+
+def open_pack(path: Path) -> AssetPack:
+    """AssetPack for path, parsed once per process while the file is unchanged."""
+    st = path.stat()
+    key = (str(path), st.st_mtime_ns, st.st_size)
+    pack = _open_packs.get(key)
+    if pack is None:
+        _open_packs.clear()
+        pack = _open_packs[key] = AssetPack(path)
+    return pack
+
+
+def _copy_range(src_fd: int, offset: int, count: int, dst_fd: int, mm: Optional[mmap.mmap]) -> None:
+    """Copy `count` bytes at `offset` of the pack into dst_fd without a userspace buffer when possible."""
+    done = 0
+    for copy in (_copy_file_range, _sendfile):
+        try:
+            while done < count:
+                n = copy(src_fd, offset + done, count - done, dst_fd)
+                if n <= 0:
+                    break
+                done += n
+            if done == count:
+                return
+        except OSError:
+            pass
+    # Filesystems or kernels without either syscall: write straight from the mapping
+    view = memoryview(mm)[offset + done:offset + count]
+    try:
+        while view:
+            n = os.write(dst_fd, view[:_CHUNK])
+            view = view[n:]
+    finally:
+        view.release()
+
+
+def _copy_file_range(src_fd: int, offset: int, count: int, dst_fd: int) -> int:
+    if not hasattr(os, "copy_file_range"):
+        raise OSError("copy_file_range not available")
+    return os.copy_file_range(src_fd, dst_fd, count, offset)
+
+
+def _sendfile(src_fd: int, offset: int, count: int, dst_fd: int) -> int:
+    return os.sendfile(dst_fd, src_fd, offset, count)
+
+
+def _inflate(mm: mmap.mmap, blob: Blob, dst_fd: int) -> None:
+    decomp = zlib.decompressobj(-15)
+    view = memoryview(mm)[blob.offset:blob.offset + blob.stored_size]
+    try:
+        for start in range(0, len(view), _CHUNK):
+            os.write(dst_fd, decomp.decompress(view[start:start + _CHUNK]))
+        os.write(dst_fd, decomp.flush())
+    finally:
+        view.release()
+
+
+def ensure_dir(path: Path, made: set[Path]) -> None:
+    """mkdir -p, skipping directories already created during this extraction."""
+    if path not in made:
+        path.mkdir(parents=True, exist_ok=True)
+        made.add(path)
+
+
+def _member_path(dest: Path, name: str) -> Path:
+    parts = [p for p in name.split("/") if p not in ("", ".")]
+    if not parts or ".." in parts:
+        raise PackError(f"Unsafe path in pack: {name!r}")
+    return dest.joinpath(*parts)
+
+
+def extract_group(pack_path: str, key: str, dest: str) -> list[str]:
+    """Write one group into dest; return the files written, relative to dest.
+
+    Module-level so it can run in a worker process.
+    """
+    pack = open_pack(Path(pack_path))
+    group = pack.groups[key]
+    dest_path = Path(dest)
+    written: list[str] = []
+    dirs: list[tuple[Path, int, float]] = []
+    made: set[Path] = set()
+
+    fd = os.open(pack_path, os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            for path, kind, mode, mtime, ref in group.entries:
+                target = _member_path(dest_path, path)
+                if kind == DIR:
+                    ensure_dir(target, made)
+                    dirs.append((target, mode, mtime))
+                    continue
+
+                ensure_dir(target.parent, made)
+                if target.is_symlink() or (kind == SYMLINK and target.exists()):
+                    target.unlink()
+                if kind == SYMLINK:
+                    os.symlink(ref, target)
+                else:
+                    perm = mode or 0o644
+                    try:
+                        out = os.open(target, _WRITE_FLAGS, perm)
+                    except PermissionError:
+                        target.unlink()
+                        out = os.open(target, _WRITE_FLAGS, perm)
+                    try:
+                        blob = pack.blobs[ref]
+                        if blob.method == STORED:
+                            _copy_range(fd, blob.offset, blob.size, out, mm)
+                        else:
+                            _inflate(mm, blob, out)
+                        os.fchmod(out, perm)
+                        os.utime(out, (mtime, mtime))
+                    finally:
+                        os.close(out)
+                written.append(target.relative_to(dest_path).as_posix())
+    finally:
+        os.close(fd)
+
+    for path, dmode, mtime in reversed(dirs):
+        if dmode:
+            os.chmod(path, dmode)
+        os.utime(path, (mtime, mtime))
+    return written
+
+
+def _zip_entries(zf: zipfile.ZipFile) -> Iterable[tuple[zipfile.ZipInfo, str, int, float]]:
+    for info in zf.infolist():
+        mode = info.external_attr >> 16
+        mtime = time.mktime(info.date_time + (0, 0, -1))
+        if info.is_dir():
+            kind = DIR
+        elif stat.S_ISLNK(mode):
+            kind = SYMLINK
+        else:
+            kind = FILE
+        yield info, kind, mode & 0o7777, mtime
+
+
+def build_pack(archives: Iterable[tuple[str, Path]], output: Path) -> dict:
+    """Convert (kind, zip path) pairs into a pack at `output`; returns size statistics."""
+    blobs: dict[str, list] = {}
+    groups = []
+    stats = {"groups": 0, "files": 0, "blobs": 0, "stored": 0, "deflated": 0, "bytes": 0}
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(f".{output.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as out:
+        out.write(MAGIC)
+        for kind, zip_path in archives:
+            entries = []
+            with zipfile.ZipFile(zip_path) as zf:
+                for info, etype, mode, mtime in _zip_entries(zf):
+                    path = info.filename.rstrip("/")
+                    if etype == DIR:
+                        entries.append([path, DIR, mode, mtime, None])
+                        continue
+                    data = zf.read(info)
+                    if etype == SYMLINK:
+                        entries.append([path, SYMLINK, mode, mtime, data.decode("utf-8")])
+                        continue
+
+                    sha = hashlib.sha256(data).hexdigest()
+                    entries.append([path, FILE, mode, mtime, sha])
+                    stats["files"] += 1
+                    if sha in blobs:
+                        continue
+
+                    comp = zlib.compressobj(9, zlib.DEFLATED, -15)
+                    packed = comp.compress(data) + comp.flush()
+                    if len(packed) <= len(data) * (1 - _MIN_SAVING):
+                        method = DEFLATED
+                    else:
+                        method, packed = STORED, data
+                        if len(data) >= _ALIGN_MIN:
+                            # Block-aligned so copy_file_range can share extents on CoW filesystems
+                            out.write(b"\0" * (-out.tell() % _ALIGN))
+                    blobs[sha] = [out.tell(), len(data), len(packed), method]
+                    out.write(packed)
+                    stats[method] += 1
+
+            digest = hashlib.sha256(json.dumps(entries, sort_keys=True).encode("utf-8")).hexdigest()
+            groups.append({"kind": kind, "name": zip_path.name, "digest": digest, "entries": entries})
+            stats["groups"] += 1
+
+        index = json.dumps({"version": PACK_VERSION, "blobs": blobs, "groups": groups}).encode("utf-8")
+        index_offset = out.tell()
+        out.write(index)
+        out.write(_TRAILER.pack(MAGIC, index_offset, len(index)))
+        stats["bytes"] = out.tell()
+    os.replace(tmp, output)
+    stats["blobs"] = len(blobs)
+    return stats
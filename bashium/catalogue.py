@@ -0,0 +1,228 @@
+"""Xfce Look catalogue: archive previews with a size-bounded on-disk thumbnail cache.
+
+Pillow is optional; without it the catalogue shows names only.
+"""
+
+import hashlib
+import importlib.util
+import io
+import os
+import threading
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from bashium.assetpack import FILE, open_pack
+from bashium.log import log_exception
+from bashium.paths import cache_dir
+from bashium.xfcelook import Archive
+
+THUMB_SIZE = (240, 150)
+CACHE_LIMIT = 64 * 1024 * 1024
+# Bump when the rendering changes so old thumbnails are not reused
+THUMB_VERSION = 1
+
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg")
+
+
+def pil_available() -> bool:
+    return importlib.util.find_spec("PIL") is not None
+
+
+def archive_title(archive: Archive) -> str:
+    title = archive.name[:-4] if archive.name.endswith(".zip") else archive.name
+    for suffix in IMAGE_SUFFIXES:
+        if title.lower().endswith(suffix):
+            title = title[: -len(suffix)]
+    return title.strip()
+
+
+def archive_members(archive: Archive) -> list[str]:
+    if archive.in_pack:
+        group = open_pack(archive.path).groups[archive.key]
+        return [e[0] for e in group.entries if e[1] == FILE]
+    with zipfile.ZipFile(archive.path) as zf:
+        return [i.filename for i in zf.infolist() if not i.is_dir()]
+
+
+def read_member(archive: Archive, name: str) -> bytes:
+    if archive.in_pack:
+        pack = open_pack(archive.path)
+        for path, kind, _mode, _mtime, ref in pack.groups[archive.key].entries:
+            if path == name and kind == FILE:
+                return pack.blob_bytes(ref)
+        raise KeyError(name)
+    with zipfile.ZipFile(archive.path) as zf:
+        return zf.read(name)
+
+
+def preview_member(archive: Archive, names: Iterable[str]) -> Optional[str]:
+    """The image that best represents the archive, or None (e.g. SVG-only icon themes)."""
+    images = [n for n in names if n.lower().endswith(IMAGE_SUFFIXES)]
+    if archive.kind == "wallpapers":
+        return images[0] if images else None
+
+    def rank(name: str) -> Optional[int]:
+        base = name.rsplit("/", 1)[-1].lower()
+        inner = name.split("/", 1)[-1]
+        if base == "thumbnail.png":
+            # GTK 3 thumbnails show the widgets Xfce actually uses
+            return 0 if inner.startswith("gtk-3.") else 1
+        if "/preview/" in f"/{name.lower()}" or base.startswith(("preview", "screenshot")):
+            return 2
+        return None
+
+    ranked = sorted((r, n) for n in images if (r := rank(n)) is not None)
+    return ranked[0][1] if ranked else None
+
+
+def render_thumbnail(archive: Archive, size: tuple[int, int] = THUMB_SIZE) -> Optional[bytes]:
+    """PNG bytes of the archive preview scaled to fit `size`; None when there is no preview."""
+    from PIL import Image
+
+    member = preview_member(archive, archive_members(archive))
+    if member is None:
+        return None
+    with Image.open(io.BytesIO(read_member(archive, member))) as img:
+        # JPEG: decode at a reduced scale instead of full size
+        img.draft("RGB", size)
+        img.thumbnail(size)
+        out = io.BytesIO()
+        img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB").save(out, "PNG", optimize=False)
+    return out.getvalue()
+
+
+class ThumbnailCache:
+    """Thumbnails under ~/.cache/bashium/thumbnails, evicted least-recently-used first.
+
+    Recency is the file mtime, refreshed on every hit; the total size is
+    scanned once and then tracked. An empty file records "no preview".
+    """
+
+    def __init__(self, root: Optional[Path] = None, limit: int = CACHE_LIMIT):
+        self.root = root or cache_dir() / "thumbnails"
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._sizes: Optional[dict[str, int]] = None
+
+    def key(self, archive: Archive, size: tuple[int, int]) -> str:
+        version = archive.digest or f"{archive.size}:{archive.mtime}"
+        raw = f"{THUMB_VERSION}\0{archive.key}\0{version}\0{size[0]}x{size[1]}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.png"
+
+    def _scan(self) -> dict[str, int]:
+        if self._sizes is None:
+            self._sizes = {}
+            try:
+                with os.scandir(self.root) as it:
+                    for entry in it:
+                        if entry.name.endswith(".png"):
+                            self._sizes[entry.name[:-4]] = entry.stat().st_size
+            except OSError:
+                pass
+        return self._sizes
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            log_exception("Failed to store thumbnail", e)
+            return
+        with self._lock:
+            self._scan()[key] = len(data)
+            self._evict()
+
+    def _evict(self) -> None:
+        sizes = self._scan()
+        total = sum(sizes.values())
+        if total <= self.limit:
+            return
+        by_age = []
+        for key in sizes:
+            try:
+                by_age.append((self._path(key).stat().st_mtime_ns, key))
+            except OSError:
+                by_age.append((0, key))
+        for _mtime, key in sorted(by_age):
+            if total <= self.limit:
+                break
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+            total -= sizes.pop(key)
+
+
+class ThumbnailLoader:
+    """Renders thumbnails on a small worker pool; Pillow releases the GIL while decoding.
+
+    `on_ready(archive_key, png_bytes_or_None)` is called from a worker thread.
+    """
+
+    def __init__(
+        self,
+        cache: ThumbnailCache,
+        on_ready: Callable[[str, Optional[bytes]], None],
+        size: tuple[int, int] = THUMB_SIZE,
+        workers: Optional[int] = None,
+    ):
+        self.cache = cache
+        self.on_ready = on_ready
+        self.size = size
+        self.pool = ThreadPoolExecutor(
+            max_workers=workers or min(4, os.cpu_count() or 1),
+            thread_name_prefix="bashium-thumb",
+        )
+        self._pending: dict[str, Future] = {}
+        self._done: set[str] = set()
+        self._lock = threading.Lock()
+
+    def request_visible(self, archives: Iterable[Archive]) -> None:
+        """Queue the visible archives; queued ones that scrolled out of view are dropped."""
+        archives = list(archives)
+        visible = {a.key for a in archives}
+        with self._lock:
+            for key, future in list(self._pending.items()):
+                if key not in visible and future.cancel():
+                    del self._pending[key]
+            for archive in archives:
+                if archive.key in self._done or archive.key in self._pending:
+                    continue
+                self._pending[archive.key] = self.pool.submit(self._load, archive)
+
+    def _load(self, archive: Archive) -> None:
+        key = self.cache.key(archive, self.size)
+        data = self.cache.get(key)
+        if data is None:
+            try:
+                data = render_thumbnail(archive, self.size) or b""
+            except Exception as e:
+                # Not cached: a later Pillow install or fixed archive gets another try
+                log_exception(f"Failed to render thumbnail for {archive.key}", e)
+                data = b""
+            else:
+                self.cache.put(key, data)
+        with self._lock:
+            self._pending.pop(archive.key, None)
+            self._done.add(archive.key)
+        self.on_ready(archive.key, data or None)
+
+    def shutdown(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,445 @@
+"""Command-line entry point. GUI modules are imported only when the GUI is started."""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+HW_LABELS = (
+    ("Wi-Fi", "wifi_text"),
+    ("Bluetooth", "bt_text"),
+    ("NVIDIA", "nvidia_text"),
+    ("Repository", "nonfree_text"),
+    ("USB Devices", "usb_text"),
+)
+
+
+def load_hardware(no_cache: bool = False) -> tuple[dict, dict, bool]:
+    """hw_info, hw_flags and whether they came from the hardware cache."""
+    from bashium.hwcache import HardwareCache, detect_and_store, hardware_fingerprint
+
+    cache = HardwareCache()
+    fingerprint = hardware_fingerprint()
+    cached = None if no_cache else cache.load(fingerprint)
+    if cached is not None:
+        return cached[0], cached[1], True
+    hw_info, hw_flags = detect_and_store(cache, fingerprint)
+    return hw_info, hw_flags, False
+
+
+def cmd_probe(args: argparse.Namespace) -> int:
+    hw_info, hw_flags, cached = load_hardware(args.no_cache)
+
+    if args.json:
+        result = {"hw_info": hw_info, "hw_flags": hw_flags, "cached": cached}
+        if args.watch:
+            # JSON Lines: the full result first, then one object per change
+            print(json.dumps(result, sort_keys=True), flush=True)
+            return _watch_hardware((hw_info, hw_flags), as_json=True)
+        json.dump(result, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write("\n")
+        return 0
+
+    for label, key in HW_LABELS:
+        print(f"{label}: {hw_info.get(key, 'Unknown')}")
+    if args.watch:
+        return _watch_hardware((hw_info, hw_flags))
+    return 0
+
+
+def _watch_hardware(initial: tuple[dict, dict], as_json: bool = False) -> int:
+    from bashium.hotplug import start_monitor
+    from bashium.hwcache import HardwareCache
+
+    labels = {key: label for label, key in HW_LABELS}
+
+    def changed(hw_update: dict, flag_update: dict) -> None:
+        if as_json:
+            line = {"time": time.time(), "hw_info": hw_update, "hw_flags": flag_update}
+            print(json.dumps(line, sort_keys=True), flush=True)
+            return
+        stamp = time.strftime("%H:%M:%S")
+        for key, text in hw_update.items():
+            print(f"[{stamp}] {labels.get(key, key)}: {text}", flush=True)
+
+    monitor = start_monitor(changed, initial=initial, cache=HardwareCache())
+    if monitor is None:
+        print("Hotplug events are not available here (no uevent netlink socket or sysfs).", file=sys.stderr)
+        return 1
+    if not as_json:
+        print("Watching for hardware changes, Ctrl+C to stop.", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        monitor.stop()
+    return 0
+
+
+def cmd_sources(args: argparse.Namespace) -> int:
+    from bashium.aptsources import load_sources_index
+
+    index = load_sources_index()
+    if args.check:
+        return 0 if all(index.has_component(c) for c in args.check) else 1
+
+    if args.json:
+        json.dump(index.to_dict(), sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write("\n")
+        return 0
+
+    for component, enabled in index.component_status().items():
+        print(f"{component}: {'enabled' if enabled else 'not enabled'}")
+    for uri, suites in index.repositories.items():
+        for suite, components in suites.items():
+            print(f"{uri} {suite}: {' '.join(sorted(components))}")
+    return 0
+
+
+def cmd_firmware(args: argparse.Namespace) -> int:
+    from bashium.hardware import detect_wifi_devices, take_snapshot
+
+    devices = detect_wifi_devices(take_snapshot([]))
+    if devices is None:
+        # No sysfs inventory: firmware.sh falls back to parsing lspci/lsusb
+        print("Wireless devices cannot be listed without sysfs.", file=sys.stderr)
+        return 2
+    if args.json:
+        json.dump(
+            [{"bus": d.bus, "vendor": d.vendor, "device": d.device, "name": d.name, "package": d.firmware}
+             for d in devices],
+            sys.stdout,
+            indent=2,
+        )
+        sys.stdout.write("\n")
+        return 0
+    # Tab-separated for firmware.sh: package, bus vendor:device, model
+    for d in devices:
+        print(f"{d.firmware}\t{d.bus} {d.vendor}:{d.device}\t{d.name}")
+    return 0
+
+
+def cmd_apt_plan(args: argparse.Namespace) -> int:
+    from bashium.aptplan import collect_packages, execute, simulate
+    from bashium.dpkg import load_dpkg_index
+    from bashium.prefetch import discard, seed_archives
+
+    packages = collect_packages(Path(p) for p in args.scripts)
+    if not args.all:
+        missing = load_dpkg_index().missing(packages)
+        if len(missing) < len(packages):
+            print(f"Already installed ({len(packages) - len(missing)}): "
+                  f"{' '.join(p for p in packages if p not in missing)}")
+        packages = missing
+    plan = simulate(packages)
+    print(plan.summary())
+    if not plan.ok:
+        return plan.returncode or 1
+    if not args.execute or not (plan.install or plan.upgrade):
+        return 0
+
+    if not args.yes:
+        try:
+            answer = input("Proceed with the installation? [y/N] ")
+        except EOFError:
+            answer = ""
+        if answer.strip().lower() not in ("y", "yes"):
+            print("Aborted.")
+            return 1
+    # Packages the GUI downloaded while the module was being picked
+    seeded = seed_archives()
+    returncode = execute(packages)
+    if returncode == 0:
+        discard(seeded)
+    return returncode
+
+
+def cmd_xfce_look(args: argparse.Namespace) -> int:
+    from bashium.xfcelook import install_assets
+
+    home = Path(args.home)
+    if not home.is_dir():
+        print(f"The home directory {home} does not exist.", file=sys.stderr)
+        return 1
+
+    def progress(state, archive):
+        if state == "extracting":
+            print(f"Unzipping {archive.path.name} to {archive.target(home)}", flush=True)
+        elif state == "unchanged" and args.verbose:
+            print(f"Up to date: {archive.path.name}")
+
+    result = install_assets(
+        Path(args.assets),
+        home,
+        jobs=args.jobs,
+        force=args.force,
+        on_progress=progress,
+        only=set(args.only) if args.only else None,
+    )
+    for key, error in result.failed:
+        print(f"Failed: {key}: {error}", file=sys.stderr)
+    print(f"Extracted {len(result.extracted)}, unchanged {len(result.unchanged)}, "
+          f"failed {len(result.failed)}, removed {result.removed} stale files.")
+    return 0 if result.ok else 1
+
+
+def cmd_pack_assets(args: argparse.Namespace) -> int:
+    from bashium.aptplan import format_size
+    from bashium.assetpack import PACK_NAME, build_pack
+    from bashium.xfcelook import find_zip_archives
+
+    assets = Path(args.assets)
+    archives = find_zip_archives(assets)
+    if not archives:
+        print(f"No archives found in {assets}.", file=sys.stderr)
+        return 1
+    output = Path(args.output) if args.output else assets / PACK_NAME
+    stats = build_pack(((a.kind, a.path) for a in archives), output)
+    source_bytes = sum(a.size for a in archives)
+    print(f"Packed {stats['groups']} archives, {stats['files']} files into {output}")
+    print(f"Unique contents: {stats['blobs']} ({stats['stored']} stored, {stats['deflated']} deflated)")
+    print(f"Size: {format_size(stats['bytes'])} (zips: {format_size(source_bytes)})")
+    return 0
+
+
+def cmd_history(args: argparse.Namespace) -> int:
+    from bashium.log import event_log, format_run
+
+    since = time.time() - args.days * 86400 if args.days else None
+    runs = event_log().query_runs(module=args.module, since=since, limit=args.limit)
+    if args.json:
+        json.dump(runs, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write("\n")
+        return 0
+    if not runs:
+        print("No module runs recorded.")
+        return 0
+    for run in runs:
+        print(format_run(run))
+    return 0
+
+
+def cmd_apply(args: argparse.Namespace) -> int:
+    from bashium.applied import AppliedStore
+    from bashium.dpkg import load_dpkg_index
+    from bashium.modules import build_modules
+    from bashium.profile import (
+        ProfileError,
+        apply_profile,
+        format_job,
+        job_report,
+        load_profile,
+        profile_inputs,
+        resolve_modules,
+    )
+    from bashium.scheduler import RUNNING, build_jobs, topological_waves
+
+    try:
+        profile = load_profile(Path(args.profile))
+        hw_info, hw_flags, _ = load_hardware()
+        selected, skipped = resolve_modules(profile, build_modules(BASE_DIR, hw_info, hw_flags))
+    except ProfileError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    report = sys.stderr if args.json else sys.stdout
+    for name, reason in skipped:
+        print(f"Skipping {name}: {reason}", file=report)
+    if not selected:
+        print("Nothing to run.", file=report)
+        return 0
+    try:
+        waves = topological_waves(build_jobs(selected))
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    print(f"Order: {'  →  '.join(' + '.join(wave) for wave in waves)}", file=report, flush=True)
+    if args.dry_run:
+        if not args.force:
+            store, inputs, dpkg = AppliedStore(), profile_inputs(profile), load_dpkg_index()
+            done = [m.name for m in selected if store.satisfied(m, inputs, dpkg)]
+            if done:
+                print(f"Already applied (skipped): {', '.join(done)}", file=report)
+        return 0
+
+    lock = threading.Lock()
+
+    def output(name: str, line: str) -> None:
+        with lock:
+            print(f"[{name}] {line}", file=report, flush=True)
+
+    def update(job) -> None:
+        if job.state != RUNNING:
+            output(job.name, f"--- {format_job(job)}")
+
+    jobs = apply_profile(
+        profile,
+        selected,
+        on_output=None if args.quiet else output,
+        on_update=update,
+        store=AppliedStore(),
+        force=args.force,
+    )
+
+    if args.json:
+        results = [job_report(j) for j in jobs]
+        results += [{"module": n, "state": "skipped", "returncode": None, "seconds": None, "reason": r} for n, r in skipped]
+        json.dump({"ok": all(j.returncode == 0 for j in jobs), "modules": results}, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print("")
+        for job in jobs:
+            print(format_job(job))
+    return 0 if all(j.returncode == 0 for j in jobs) else 1
+
+
+def cmd_applied(args: argparse.Namespace) -> int:
+    from bashium.applied import AppliedStore
+    from bashium.dpkg import load_dpkg_index
+    from bashium.modules import build_modules
+
+    store = AppliedStore()
+    if args.clear:
+        store.clear()
+        return 0
+    if args.forget:
+        store.forget(*args.forget)
+        return 0
+
+    dpkg = load_dpkg_index()
+    rows = []
+    for module in build_modules(BASE_DIR, {}, {}):
+        record = store.records.get(module.name)
+        reason = store.check(module, dpkg=dpkg)
+        rows.append({
+            "module": module.name,
+            "applied": record.get("applied") if record else None,
+            "satisfied": not reason,
+            "reason": reason,
+        })
+    if args.json:
+        json.dump(rows, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return 0
+    for row in rows:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["applied"])) if row["applied"] else "-"
+        print(f"{row['module']:<24} {when:<16}  {'✓ applied' if row['satisfied'] else row['reason']}")
+    return 0
+
+
+def cmd_gui(args: argparse.Namespace) -> int:
+    from bashium.trace import span
+
+    with span("import bashium.gui"):
+        # Pulls in customtkinter and tkinter
+        from bashium.gui import run_gui
+
+    run_gui(BASE_DIR)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="bashium", description="BASHIUM - System Tweaker")
+    parser.set_defaults(func=cmd_gui)
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="write a Chrome trace-event file of startup and subprocess spans (also: BASHIUM_TRACE=FILE)",
+    )
+    sub = parser.add_subparsers(dest="command")
+
+    probe = sub.add_parser("probe", help="detect hardware without starting the GUI")
+    probe.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    probe.add_argument("--no-cache", action="store_true", help="ignore the hardware cache and re-probe")
+    probe.add_argument("--watch", action="store_true", help="keep running and print hardware as it is plugged in or removed")
+    probe.set_defaults(func=cmd_probe)
+
+    sources = sub.add_parser("sources", help="show enabled APT suites and components")
+    sources.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    sources.add_argument(
+        "--check",
+        nargs="+",
+        metavar="COMPONENT",
+        help="exit 0 if all components are enabled, 1 otherwise (no output)",
+    )
+    sources.set_defaults(func=cmd_sources)
+
+    firmware = sub.add_parser("firmware", help="list Wi-Fi devices with their model and firmware package")
+    firmware.add_argument("--json", action="store_true", help="print JSON")
+    firmware.set_defaults(func=cmd_firmware)
+
+    apt_plan = sub.add_parser(
+        "apt-plan",
+        help="install the packages of several scripts in one APT transaction",
+    )
+    apt_plan.add_argument("scripts", nargs="+", metavar="SCRIPT", help="shell scripts calling apt install")
+    apt_plan.add_argument("--execute", action="store_true", help="run the transaction after showing the plan")
+    apt_plan.add_argument("-y", "--yes", action="store_true", help="do not ask for confirmation")
+    apt_plan.add_argument("--all", action="store_true", help="include packages that are already installed")
+    apt_plan.set_defaults(func=cmd_apt_plan)
+
+    xfce_look = sub.add_parser("xfce-look", help="install Xfce themes, icons and wallpapers into a home directory")
+    xfce_look.add_argument("--home", required=True, help="target home directory")
+    xfce_look.add_argument(
+        "--assets",
+        default=str(BASE_DIR / "xfce_look"),
+        help="directory with icons/, themes/ and wallpapers/ archives",
+    )
+    xfce_look.add_argument("-j", "--jobs", type=int, help="parallel extractions (default: CPU count)")
+    xfce_look.add_argument("--force", action="store_true", help="extract even unchanged archives")
+    xfce_look.add_argument("-v", "--verbose", action="store_true", help="also list unchanged archives")
+    xfce_look.add_argument(
+        "--only",
+        action="append",
+        metavar="KEY",
+        help="install only this archive, e.g. themes/Gruvbox-B-MB-Dark.zip (repeatable)",
+    )
+    xfce_look.set_defaults(func=cmd_xfce_look)
+
+    pack_assets = sub.add_parser("pack-assets", help="convert the Xfce Look zip folders into an asset pack")
+    pack_assets.add_argument(
+        "--assets",
+        default=str(BASE_DIR / "xfce_look"),
+        help="directory with icons/, themes/ and wallpapers/ archives",
+    )
+    pack_assets.add_argument("-o", "--output", help="pack file (default: ASSETS/assets.pack)")
+    pack_assets.set_defaults(func=cmd_pack_assets)
+
+    history = sub.add_parser("history", help="show recorded module runs")
+    history.add_argument("-m", "--module", help="only runs of this module")
+    history.add_argument("--days", type=float, help="only runs of the last N days")
+    history.add_argument("-n", "--limit", type=int, default=50, help="at most N runs (default: 50)")
+    history.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    history.set_defaults(func=cmd_history)
+
+    apply = sub.add_parser("apply", help="run the modules of a JSON profile without prompts")
+    apply.add_argument("profile", metavar="PROFILE", help="profile file, e.g. profile.json")
+    apply.add_argument("--dry-run", action="store_true", help="show the run order and exit")
+    apply.add_argument("-q", "--quiet", action="store_true", help="do not print the script output")
+    apply.add_argument("--json", action="store_true", help="print the results as JSON (progress goes to stderr)")
+    apply.add_argument("--force", action="store_true", help="also run modules that are already applied")
+    apply.set_defaults(func=cmd_apply)
+
+    applied = sub.add_parser("applied", help="show which modules are recorded as applied")
+    applied.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    applied.add_argument("--forget", action="append", metavar="MODULE", help="drop the record of a module (repeatable)")
+    applied.add_argument("--clear", action="store_true", help="drop all records")
+    applied.set_defaults(func=cmd_applied)
+
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from bashium.trace import enable, enable_from_env, span
+
+    args = build_parser().parse_args(argv)
+    if args.trace:
+        enable(Path(args.trace))
+    else:
+        enable_from_env()
+    with span(f"bashium {args.command or 'gui'}"):
+        return args.func(args)
@@ -0,0 +1,158 @@
+"""User settings in ~/.config/bashium/config.json.
+
+Settings are kept in memory; updates are merged and written on a debounce
+timer from a background thread, atomically (temp file + os.replace).
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from bashium.log import log_exception
+from bashium.paths import config_dir
+
+CONFIG_VERSION = 1
+# Seconds to wait for further updates before writing
+FLUSH_DELAY = 0.5
+
+DEFAULTS: dict[str, Any] = {
+    "palette_preset": "Neon Cyan",
+    # Tk geometry string, e.g. "1000x700+460+190"
+    "geometry": None,
+    # Module names ticked for "Run selected" when the window was closed
+    "selected_modules": [],
+    # Thumbnail cache of the Xfce Look catalogue; None means ~/.cache/bashium/thumbnails
+    "thumbnail_cache_dir": None,
+    "thumbnail_cache_mb": 64,
+}
+
+
+def _optional_str(value: Any) -> bool:
+    return value is None or isinstance(value, str)
+
+
+# Checks of hand-edited values; a value failing its check is dropped on load,
+# so the default applies
+VALIDATORS: dict[str, Callable[[Any], bool]] = {
+    "palette_preset": lambda v: isinstance(v, str),
+    "geometry": _optional_str,
+    "selected_modules": lambda v: isinstance(v, list) and all(isinstance(n, str) for n in v),
+    "thumbnail_cache_dir": _optional_str,
+    "thumbnail_cache_mb": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool) and v > 0,
+}
+
+
+def validate(settings: dict, source: Path) -> dict:
+    valid = {}
+    for key, value in settings.items():
+        check = VALIDATORS.get(key)
+        if check is not None and not check(value):
+            log_exception(f"Ignoring invalid setting in {source}", ValueError(f"{key}={value!r}"))
+            continue
+        valid[key] = value
+    return valid
+
+
+def _migrate_0(data: dict) -> dict:
+    # Before versioning the file only ever held {"palette_preset": ...}
+    return {k: v for k, v in data.items() if k == "palette_preset"}
+
+
+# version -> upgrade of a version N file to N + 1
+MIGRATIONS: dict[int, Callable[[dict], dict]] = {
+    0: _migrate_0,
+}
+
+
+def migrate(data: dict) -> Optional[dict]:
+    """Settings of a config file upgraded to CONFIG_VERSION; None if written by a newer version."""
+    version = data.get("version", 0)
+    if not isinstance(version, int) or version > CONFIG_VERSION:
+        return None
+    settings = data.get("settings", {}) if version else dict(data)
+    if not isinstance(settings, dict):
+        settings = {}
+    while version < CONFIG_VERSION:
+        settings = MIGRATIONS[version](settings)
+        version += 1
+    return settings
+
+
+class ConfigStore:
+    def __init__(self, path: Optional[Path] = None, delay: float = FLUSH_DELAY):
+        self.path = path or config_dir() / "config.json"
+        self.delay = delay
+        self._lock = threading.Lock()
+        # Held across snapshot and write so an older snapshot never lands last
+        self._write_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._dirty = False
+        # A file from a newer bashium is read but never overwritten
+        self.read_only = False
+        self._settings = self._load()
+
+    def _load(self) -> dict:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            log_exception(f"Ignoring unreadable config {self.path}", e)
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        settings = migrate(data)
+        if settings is None:
+            self.read_only = True
+            settings = data.get("settings", {})
+            if not isinstance(settings, dict):
+                return {}
+        return validate(settings, self.path)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._settings:
+                return self._settings[key]
+        return DEFAULTS.get(key) if default is None else default
+
+    def update(self, **values: Any) -> None:
+        """Merge values and schedule a write; unchanged values do not touch the disk."""
+        with self._lock:
+            changed = {k: v for k, v in values.items() if self._settings.get(k, DEFAULTS.get(k)) != v}
+            if not changed:
+                return
+            self._settings.update(changed)
+            self._dirty = True
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.name = "bashium-config"
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> None:
+        """Write pending changes now (runs on the timer thread, or at exit)."""
+        with self._write_lock:
+            self._write()
+
+    def _write(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty or self.read_only:
+                return
+            data = json.dumps({"version": CONFIG_VERSION, "settings": self._settings}, indent=2, sort_keys=True)
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except Exception as e:
+            log_exception("Failed to save config", e)
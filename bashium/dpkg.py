@@ -0,0 +1,96 @@
+"""Installed-package index built from one scan of the dpkg status file."""
+
+import mmap
+import re
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+from bashium.trace import span
+
+DPKG_STATUS = Path("/var/lib/dpkg/status")
+
+_FIELD_RE = re.compile(rb"^(Package|Status|Version|Provides): ([^\n]*)", re.MULTILINE)
+
+
+class DpkgIndex:
+    def __init__(self, installed: dict[str, str], provides: set[str]):
+        # package name -> installed version
+        self.installed = installed
+        # virtual package names provided by installed packages
+        self.provides = provides
+
+    def is_installed(self, package: str) -> bool:
+        name = package.split(":", 1)[0]
+        return name in self.installed or name in self.provides
+
+    def missing(self, packages: Iterable[str]) -> list[str]:
+        return [p for p in packages if not self.is_installed(p)]
+
+    def count_installed(self, packages: Iterable[str]) -> int:
+        return sum(1 for p in packages if self.is_installed(p))
+
+
+def _is_installed_status(status: bytes) -> bool:
+    # "install ok installed", "hold ok installed", ...
+    parts = status.split()
+    return len(parts) == 3 and parts[2] == b"installed"
+
+
+def parse_status(data) -> DpkgIndex:
+    """Parse dpkg status content (bytes or an mmap) in a single regex pass."""
+    installed: dict[str, str] = {}
+    provides: set[str] = set()
+
+    package: Optional[str] = None
+    fields: dict[bytes, bytes] = {}
+
+    def flush() -> None:
+        if package is not None and _is_installed_status(fields.get(b"Status", b"")):
+            installed[package] = fields.get(b"Version", b"").decode("utf-8", "replace")
+            for item in fields.get(b"Provides", b"").split(b","):
+                name = item.strip().split(b" ", 1)[0]
+                if name:
+                    provides.add(name.decode("utf-8", "replace"))
+
+    for m in _FIELD_RE.finditer(data):
+        key, value = m.group(1), m.group(2).strip()
+        if key == b"Package":
+            flush()
+            package, fields = value.decode("utf-8", "replace"), {}
+        else:
+            fields[key] = value
+    flush()
+    return DpkgIndex(installed, provides)
+
+
+_cache: dict[Path, tuple[tuple[int, int], DpkgIndex]] = {}
+_cache_lock = threading.Lock()
+
+
+def load_dpkg_index(path: Path = DPKG_STATUS) -> DpkgIndex:
+    """Memory-map and parse the status file; reuse the result until its mtime changes."""
+    try:
+        st = path.stat()
+    except OSError:
+        return DpkgIndex({}, set())
+    key = (st.st_mtime_ns, st.st_size)
+
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+    try:
+        with span("load_dpkg_index"), path.open("rb") as f:
+            if st.st_size == 0:
+                index = DpkgIndex({}, set())
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    index = parse_status(mm)
+    except (OSError, ValueError):
+        return DpkgIndex({}, set())
+
+    with _cache_lock:
+        _cache[path] = (key, index)
+    return index
@@ -0,0 +1,1550 @@
+import customtkinter as ctk
+import io
+import queue
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from bashium.applied import INTERACTIVE_INPUTS, AppliedStore, mark_satisfied
+from bashium.catalogue import ThumbnailCache, ThumbnailLoader, archive_title, pil_available
+from bashium.config import ConfigStore
+from bashium.dpkg import load_dpkg_index
+from bashium.hotplug import start_monitor
+from bashium.hwcache import HardwareCache, detect_and_store, hardware_fingerprint, revalidate_in_background
+from bashium.log import event_log, format_run, log_exception
+from bashium.manifests import PROBING_TEXT
+from bashium.modules import ScriptModule, build_modules
+from bashium.prefetch import Prefetcher
+from bashium.runner import PtyRun
+from bashium.scheduler import DONE, FAILED, PENDING, RUNNING, SKIPPED, JobScheduler, build_jobs, topological_waves
+from bashium.search import ModuleIndex
+from bashium.styles import PALETTES, StyleRegistry
+from bashium.trace import instant, span
+from bashium.xfcelook import Archive, find_archives, install_assets, load_manifest
+
+# Konfiguracja CustomTkinter
+ctk.set_appearance_mode("dark")
+ctk.set_default_color_theme("blue")
+
+# Zapisana geometria okna, np. "1000x700+460+190"
+GEOMETRY_RE = re.compile(r"\d+x\d+(\+-?\d+\+-?\d+)?")
+
+
+_fonts: dict[tuple[int, str], ctk.CTkFont] = {}
+
+
+def _font(size: int, weight: str = "normal") -> ctk.CTkFont:
+    """Fonts shared by all cards instead of new CTkFont objects per widget."""
+    key = (size, weight)
+    if key not in _fonts:
+        _fonts[key] = ctk.CTkFont(size=size, weight=weight)
+    return _fonts[key]
+
+
+@dataclass
+class CardState:
+    """Per-module UI state; kept outside the cards because cards are recycled."""
+
+    selected: bool = False
+    # (installed, total) from the dpkg status scan
+    packages: Optional[tuple[int, int]] = None
+    # The same for packages installed only on some answers or hardware
+    optional: Optional[tuple[int, int]] = None
+    # Exit code of the last in-app run
+    returncode: Optional[int] = None
+    # A record in the applied store still matches the module
+    applied: bool = False
+    # The confirm dialog is open; its packages are prefetched meanwhile
+    confirming: bool = False
+    # Progress of the background package download, e.g. "⇣ downloading 40%"
+    prefetch: str = ""
+
+
+class ModuleCard(ctk.CTkFrame):
+    """Nowoczesna karta modułu z animacjami
+
+    Cards are created by ModuleGrid for the visible rows only and re-bound
+    to another module with bind_module() while scrolling.
+    """
+    
+    def __init__(
+        self,
+        master,
+        styles: StyleRegistry,
+        states: dict[str, CardState],
+        on_run_finished: Callable[[ScriptModule, int], None],
+        on_browse: Callable[[ScriptModule], None],
+        on_prefetch: Callable[..., None],
+        **kwargs,
+    ):
+        super().__init__(master, **kwargs)
+        self.module: Optional[ScriptModule] = None
+        self.colors = colors = styles.colors
+        self.states = states
+        self.on_run_finished = on_run_finished
+        self.on_browse = on_browse
+        # Called when the selection or the confirm dialog changes; takes the names of started modules
+        self.on_prefetch = on_prefetch
+        self.size = (0, 0)
+        
+        self.configure(
+            fg_color=colors["card_bg"],
+            corner_radius=12,
+            border_width=2,
+            border_color=colors["border"]
+        )
+        
+        # Padding wewnętrzny
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+        # Size is set by the grid, not by the content
+        self.grid_propagate(False)
+        
+        # Header z nazwą
+        header_frame = ctk.CTkFrame(self, fg_color="transparent")
+        header_frame.grid(row=0, column=0, sticky="ew", padx=20, pady=(15, 5))
+        
+        self.name_label = ctk.CTkLabel(
+            header_frame,
+            text="",
+            font=_font(18, "bold"),
+            text_color=colors["accent"]
+        )
+        self.name_label.pack(side="left")
+        
+        # Status indicator
+        self.status_dot = ctk.CTkLabel(
+            header_frame,
+            text="●",
+            font=_font(16),
+        )
+        self.status_dot.pack(side="left", padx=(10, 0))
+
+        # Queued for "Run selected"
+        self.selected = ctk.BooleanVar(value=False)
+        self.select_box = ctk.CTkCheckBox(
+            header_frame,
+            text="",
+            variable=self.selected,
+            command=self._on_select,
+            width=24,
+        )
+        self.select_box.pack(side="left", padx=(10, 0))
+
+        # Installed package count, filled in by the dpkg status scan
+        self.packages_label = ctk.CTkLabel(
+            header_frame,
+            text="",
+            font=_font(12),
+            text_color=colors["fg"],
+        )
+        self.packages_label.pack(side="right")
+
+        # Exit status of the last in-app run
+        self.result_label = ctk.CTkLabel(
+            header_frame,
+            text="",
+            font=_font(12),
+        )
+        self.result_label.pack(side="right", padx=(0, 10))
+        
+        # Opis
+        self.desc_label = ctk.CTkLabel(
+            self,
+            text="",
+            font=_font(12),
+            text_color=colors["fg"],
+            anchor="w",
+            justify="left",
+            wraplength=500
+        )
+        self.desc_label.grid(row=1, column=0, sticky="nsew", padx=20, pady=(0, 15))
+        
+        # Przycisk RUN
+        self.run_button = ctk.CTkButton(
+            self,
+            command=self._run_with_dialog,
+            font=_font(14, "bold"),
+            fg_color=colors["accent"],
+            hover_color=colors["accent_hover"],
+            corner_radius=8,
+            height=40,
+        )
+        self.run_button.grid(row=2, column=0, sticky="ew", padx=20, pady=(0, 15))
+
+        # Pick individual themes and wallpapers instead of installing everything;
+        # shown only for modules with a catalogue
+        self.browse_button = ctk.CTkButton(
+            self,
+            text="BROWSE CATALOGUE",
+            command=lambda: self.on_browse(self.module),
+            font=_font(12, "bold"),
+            fg_color="transparent",
+            border_width=2,
+            border_color=colors["accent"],
+            hover_color=colors["border"],
+            text_color=colors["fg"],
+            corner_radius=8,
+            height=32,
+        )
+        self.browse_button.grid(row=3, column=0, sticky="ew", padx=20, pady=(0, 15))
+        self.browse_button.grid_remove()
+        
+        # Hover effect
+        self.bind("<Enter>", self._on_hover)
+        self.bind("<Leave>", self._on_leave)
+
+        styles.register("card", self)
+        styles.register("accent-title", self.name_label)
+        styles.register("body", self.packages_label, self.desc_label)
+        styles.register("run-button", self.run_button)
+        styles.register("outline-button", self.browse_button)
+        # Status dot, run button text and last result depend on the module state
+        styles.add_hook(self.apply_colors)
+
+    def apply_colors(self, colors: dict):
+        self.colors = colors
+        if self.module is not None:
+            self._refresh_state()
+
+    def bind_module(self, module: ScriptModule):
+        if module is self.module:
+            return
+        self.module = module
+        self.name_label.configure(text=module.name)
+        if module.manifest is not None and module.manifest.catalogue:
+            self.browse_button.grid()
+        else:
+            self.browse_button.grid_remove()
+        self.refresh()
+
+    def resize(self, width: int, height: int):
+        if (width, height) == self.size:
+            return
+        self.size = (width, height)
+        self.configure(width=width, height=height)
+        self.desc_label.configure(wraplength=max(100, width - 40))
+
+    @property
+    def state(self) -> CardState:
+        return self.states.setdefault(self.module.name, CardState())
+    
+    def _refresh_state(self):
+        enabled = bool(self.module.enabled)
+        self.status_dot.configure(text_color=self.colors["success"] if enabled else self.colors["muted"])
+        self.run_button.configure(
+            text="▶ RUN SCRIPT" if self.module.enabled is not None else PROBING_TEXT.upper(),
+            text_color="#000000" if enabled else "#404040",
+            state="normal" if enabled else "disabled",
+        )
+        state = self.state
+        if not enabled:
+            state.selected = False
+        self.selected.set(state.selected)
+        self.select_box.configure(state="normal" if enabled else "disabled")
+
+        optional = state.optional or (0, 0)
+        if state.packages is None or state.packages[1] + optional[1] == 0:
+            text = state.prefetch
+        elif state.packages[1] and state.packages[0] == state.packages[1]:
+            text = f"✓ all {state.packages[1]} packages installed"
+        elif state.prefetch:
+            text = state.prefetch
+        elif state.packages[1]:
+            text = f"{state.packages[0]}/{state.packages[1]} packages installed"
+        else:
+            # Only one vendor's firmware, say, is ever installed
+            text = f"{optional[0]}/{optional[1]} optional packages installed"
+        self.packages_label.configure(text=text)
+
+        if state.returncode is None:
+            if state.applied:
+                self.result_label.configure(text="✓ already applied", text_color=self.colors["success"])
+            else:
+                self.result_label.configure(text="")
+        elif state.returncode == 0:
+            self.result_label.configure(text="✓ last run OK", text_color=self.colors["success"])
+        else:
+            self.result_label.configure(text=f"✗ exit code {state.returncode}", text_color=self.colors["accent"])
+
+    def refresh(self):
+        """Re-read the module and its state (hardware results, package scan, runs)."""
+        self.desc_label.configure(text=self.module.description)
+        self._refresh_state()
+
+    def _on_select(self):
+        self.state.selected = bool(self.selected.get())
+        self.on_prefetch()
+    
+    def _on_hover(self, event):
+        if self.module is not None and self.module.enabled:
+            self.configure(border_color=self.colors["accent"])
+    
+    def _on_leave(self, event):
+        self.configure(border_color=self.colors["border"])
+    
+    def _launch(self):
+        # The card may show another module by the time the run finishes
+        module = self.module
+        try:
+            RunPanel(self, module, lambda code: self.on_run_finished(module, code))
+        except Exception as e:
+            # No pty available: fall back to an external terminal emulator
+            log_exception("Failed to start in-app runner", e)
+            module.run()
+
+    def _run_with_dialog(self):
+        try:
+            dialog = ctk.CTkToplevel(self)
+            dialog.title("Confirm Execution")
+            dialog.geometry("400x200")
+            dialog.transient(self.master)
+            dialog.bind("<Escape>", lambda _e: dialog.destroy())
+
+            # Download the packages while the user reads the dialog
+            module, state = self.module, self.state
+            state.confirming = True
+            self.on_prefetch()
+
+            def closed(event):
+                if event.widget is dialog:
+                    state.confirming = False
+                    self.on_prefetch()
+
+            dialog.bind("<Destroy>", closed, add="+")
+
+            dialog.update_idletasks()
+            x = (dialog.winfo_screenwidth() // 2) - (400 // 2)
+            y = (dialog.winfo_screenheight() // 2) - (200 // 2)
+            dialog.geometry(f"400x200+{x}+{y}")
+
+            try:
+                ctk.CTkLabel(
+                    dialog,
+                    text=f"Run {self.module.name}?",
+                    font=ctk.CTkFont(size=16, weight="bold")
+                ).pack(pady=(20, 10))
+
+                ctk.CTkLabel(
+                    dialog,
+                    text="The script output will be shown in a BASHIUM window.",
+                    font=ctk.CTkFont(size=12),
+                    text_color="gray"
+                ).pack(pady=(0, 20))
+
+                button_frame = ctk.CTkFrame(dialog, fg_color="transparent")
+                button_frame.pack(pady=10)
+            except Exception as e:
+                log_exception("Failed to build confirm dialog UI", e)
+                ctk.CTkLabel(
+                    dialog,
+                    text="Dialog error. Please close this window and check ~/.local/state/bashium/events.jsonl",
+                    font=ctk.CTkFont(size=13),
+                    wraplength=360,
+                    justify="left",
+                ).pack(pady=20, padx=20)
+                ctk.CTkButton(
+                    dialog,
+                    text="Close",
+                    command=dialog.destroy,
+                    width=120,
+                ).pack(pady=10)
+                return
+
+            def confirm():
+                dialog.destroy()
+                # The script installs now; stop downloading behind its back
+                self.on_prefetch((module.name,))
+
+                try:
+                    self._launch()
+                except Exception as e:
+                    log_exception("Failed to launch script terminal", e)
+                    try:
+                        err = ctk.CTkToplevel(self)
+                        err.title("Execution error")
+                        err.geometry("620x260")
+                        err.transient(self.master)
+                        err.bind("<Escape>", lambda _e: err.destroy())
+
+                        err.update_idletasks()
+                        x = (err.winfo_screenwidth() // 2) - (620 // 2)
+                        y = (err.winfo_screenheight() // 2) - (260 // 2)
+                        err.geometry(f"620x260+{x}+{y}")
+
+                        ctk.CTkLabel(
+                            err,
+                            text="Could not launch the terminal to run the script.",
+                            font=ctk.CTkFont(size=16, weight="bold"),
+                        ).pack(pady=(20, 10), padx=20, anchor="w")
+
+                        textbox = ctk.CTkTextbox(err, height=120)
+                        textbox.pack(fill="both", expand=True, padx=20, pady=(0, 10))
+                        textbox.insert("1.0", str(e))
+                        textbox.configure(state="disabled")
+
+                        ctk.CTkButton(
+                            err,
+                            text="Close",
+                            command=err.destroy,
+                            width=120,
+                        ).pack(pady=(0, 20))
+                    except Exception as dialog_err:
+                        log_exception("Failed to show execution error dialog", dialog_err)
+
+            ctk.CTkButton(
+                button_frame,
+                text="Execute",
+                command=confirm,
+                fg_color=self.colors["success"],
+                hover_color=self.colors["success_hover"],
+                width=120
+            ).pack(side="left", padx=5)
+
+            ctk.CTkButton(
+                button_frame,
+                text="Cancel",
+                command=dialog.destroy,
+                fg_color="gray40",
+                hover_color="gray30",
+                width=120
+            ).pack(side="left", padx=5)
+        except Exception as e:
+            log_exception("Unhandled error in _run_with_dialog", e)
+            return
+
+
+class RunPanel(ctk.CTkToplevel):
+    """Streams a module script running under a pty; keystrokes go to the script."""
+
+    MAX_LINES = 5000
+
+    def __init__(self, master, module: ScriptModule, on_finished: Callable[[int], None]):
+        super().__init__(master)
+        self.module = module
+        self.on_finished = on_finished
+        self.events: queue.Queue = queue.Queue()
+
+        self.title(f"{module.name} - BASHIUM")
+        self.geometry("860x520")
+        self.transient(master.winfo_toplevel())
+
+        self.status_label = ctk.CTkLabel(
+            self,
+            text=f"Running {module.name}… type here to answer prompts (y/n, username).",
+            font=ctk.CTkFont(size=13, weight="bold"),
+            anchor="w",
+        )
+        self.status_label.pack(fill="x", padx=15, pady=(12, 6))
+
+        self.textbox = ctk.CTkTextbox(self, font=ctk.CTkFont(family="monospace", size=12), wrap="char")
+        self.textbox.pack(fill="both", expand=True, padx=15, pady=(0, 10))
+        self.textbox.configure(state="disabled")
+
+        self.close_button = ctk.CTkButton(self, text="Stop", command=self._on_close, width=120)
+        self.close_button.pack(pady=(0, 12))
+
+        self.bind("<Key>", self._on_key)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.textbox.focus_set()
+
+        argv, cwd = module.command()
+        self.run = PtyRun(
+            argv,
+            cwd=cwd,
+            on_output=lambda text: self.events.put(("output", text)),
+            on_exit=lambda code: self.events.put(("exit", code)),
+            name=module.name,
+        )
+        try:
+            self.run.start()
+        except Exception:
+            self.destroy()
+            raise
+        self._drain()
+
+    def _on_key(self, event):
+        if event.keysym in ("Return", "KP_Enter"):
+            self.run.write("\r")
+        elif event.keysym == "BackSpace":
+            self.run.write("\x7f")
+        elif event.char:
+            self.run.write(event.char)
+        return "break"
+
+    def _append(self, text: str):
+        self.textbox.configure(state="normal")
+        self.textbox.insert("end", text)
+        # Keep the widget bounded like the runner's ring buffer
+        lines = int(self.textbox.index("end-1c").split(".")[0])
+        if lines > self.MAX_LINES:
+            self.textbox.delete("1.0", f"{lines - self.MAX_LINES}.0")
+        self.textbox.configure(state="disabled")
+        self.textbox.see("end")
+
+    def _drain(self):
+        chunks = []
+        finished = None
+        try:
+            while True:
+                kind, value = self.events.get_nowait()
+                if kind == "output":
+                    chunks.append(value)
+                else:
+                    finished = value
+        except queue.Empty:
+            pass
+
+        try:
+            if chunks:
+                self._append("".join(chunks))
+            if finished is not None:
+                self._finish(finished)
+                return
+        except Exception as e:
+            log_exception("Failed to update run panel", e)
+        self.after(50, self._drain)
+
+    def _finish(self, returncode: int):
+        if returncode == 0:
+            self.status_label.configure(text=f"{self.module.name} finished successfully.")
+        else:
+            self.status_label.configure(text=f"{self.module.name} failed with exit code {returncode}.")
+        self.close_button.configure(text="Close", command=self.destroy)
+        self.on_finished(returncode)
+
+    def _on_close(self):
+        if self.run.running:
+            self.run.terminate()
+            # The exit event still arrives and is reported to the card
+            self.close_button.configure(text="Stopping…")
+            return
+        self.destroy()
+
+
+class HistoryWindow(ctk.CTkToplevel):
+    """Recorded module runs, newest first; queried off the Tk thread."""
+
+    ALL = "All modules"
+    LIMIT = 500
+
+    def __init__(self, master, modules: list[ScriptModule]):
+        super().__init__(master)
+        self.events: queue.Queue = queue.Queue()
+        self.closed = False
+
+        self.title("Run history - BASHIUM")
+        self.geometry("900x520")
+        self.transient(master.winfo_toplevel())
+
+        top = ctk.CTkFrame(self, fg_color="transparent")
+        top.pack(fill="x", padx=15, pady=(12, 6))
+        self.status_label = ctk.CTkLabel(top, text="Loading…", font=ctk.CTkFont(size=13, weight="bold"), anchor="w")
+        self.status_label.pack(side="left")
+        self.module_var = ctk.StringVar(value=self.ALL)
+        ctk.CTkOptionMenu(
+            top,
+            values=[self.ALL, *(m.name for m in modules)],
+            variable=self.module_var,
+            command=lambda _: self._query(),
+            width=220,
+        ).pack(side="right")
+
+        self.textbox = ctk.CTkTextbox(self, font=ctk.CTkFont(family="monospace", size=12), wrap="none")
+        self.textbox.pack(fill="both", expand=True, padx=15, pady=(0, 12))
+        self.textbox.configure(state="disabled")
+
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self._query()
+        self._drain()
+
+    def _query(self):
+        module = self.module_var.get()
+        module = None if module == self.ALL else module
+        self.status_label.configure(text="Loading…")
+
+        def work():
+            try:
+                runs = event_log().query_runs(module=module, limit=self.LIMIT)
+            except Exception as e:
+                log_exception("Failed to read run history", e)
+                runs = []
+            self.events.put(runs)
+
+        threading.Thread(target=work, name="bashium-history", daemon=True).start()
+
+    def _drain(self):
+        if self.closed:
+            return
+        try:
+            while True:
+                runs = self.events.get_nowait()
+                self.status_label.configure(text=f"Runs: {len(runs)}" if runs else "No module runs recorded.")
+                self.textbox.configure(state="normal")
+                self.textbox.delete("1.0", "end")
+                self.textbox.insert("end", "\n".join(format_run(r) for r in runs))
+                self.textbox.configure(state="disabled")
+        except queue.Empty:
+            pass
+        self.after(50, self._drain)
+
+    def _on_close(self):
+        self.closed = True
+        self.destroy()
+
+
+class ModuleGrid(ctk.CTkFrame):
+    """Two-column module grid that only has cards for the rows in view.
+
+    Scrolling re-binds the existing cards to other modules instead of
+    creating widgets, so thousands of modules cost a screenful of cards.
+    """
+
+    COLUMNS = 2
+    ROW_HEIGHT = 250
+    PAD = 10
+    WHEEL_STEP = 60
+
+    def __init__(self, master, modules: list[ScriptModule], make_card: Callable[[ctk.CTkFrame], ModuleCard]):
+        super().__init__(master, fg_color="transparent")
+        self.modules = modules
+        # Positions in `modules` currently shown (after filtering)
+        self.items: list[int] = list(range(len(modules)))
+        self.make_card = make_card
+        self.cards: list[ModuleCard] = []
+        self.shown: list[ModuleCard] = []
+        self.offset = 0
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self.viewport.pack(side="left", fill="both", expand=True)
+        self.viewport.bind("<Configure>", lambda _e: self._layout())
+
+        # Same approach as CTkScrollableFrame: global wheel bindings filtered by widget path
+        self.bind_all("<MouseWheel>", self._on_wheel, add="+")
+        self.bind_all("<Button-4>", self._on_wheel, add="+")
+        self.bind_all("<Button-5>", self._on_wheel, add="+")
+
+    def set_items(self, items: list[int]):
+        self.items = items
+        self.offset = 0
+        self._layout()
+
+    def refresh_visible(self):
+        for card in self.shown:
+            card.refresh()
+
+    def _content_height(self) -> int:
+        rows = (len(self.items) + self.COLUMNS - 1) // self.COLUMNS
+        return rows * self.ROW_HEIGHT
+
+    def _scroll_to(self, offset: float):
+        view = self.viewport.winfo_height()
+        self.offset = int(max(0, min(offset, self._content_height() - view)))
+        self._layout()
+
+    def _on_scrollbar(self, *args):
+        content = self._content_height()
+        if args[0] == "moveto":
+            self._scroll_to(float(args[1]) * content)
+        elif args[0] == "scroll":
+            step = self.viewport.winfo_height() if args[2] == "pages" else self.WHEEL_STEP
+            self._scroll_to(self.offset + int(args[1]) * step)
+
+    def _on_wheel(self, event):
+        if not str(event.widget).startswith(str(self.viewport)):
+            return
+        if event.num == 4:
+            delta = -1
+        elif event.num == 5:
+            delta = 1
+        else:
+            delta = -1 if event.delta > 0 else 1
+        self._scroll_to(self.offset + delta * self.WHEEL_STEP)
+
+    def _layout(self):
+        width = self.viewport.winfo_width()
+        height = self.viewport.winfo_height()
+        if width <= 1 or height <= 1:
+            return
+
+        content = self._content_height()
+        self.offset = max(0, min(self.offset, content - height))
+        first_row, shift = divmod(self.offset, self.ROW_HEIGHT)
+        pool_rows = height // self.ROW_HEIGHT + 2
+        missing = pool_rows * self.COLUMNS - len(self.cards)
+        if missing > 0:
+            with span("create ModuleCards", count=missing):
+                for _ in range(missing):
+                    self.cards.append(self.make_card(self.viewport))
+
+        col_width = width // self.COLUMNS
+        card_size = (col_width - 2 * self.PAD, self.ROW_HEIGHT - 2 * self.PAD)
+        shown = []
+        for slot, card in enumerate(self.cards):
+            row, col = divmod(slot, self.COLUMNS)
+            pos = (first_row + row) * self.COLUMNS + col
+            if row < pool_rows and pos < len(self.items):
+                card.bind_module(self.modules[self.items[pos]])
+                card.resize(*card_size)
+                card.place(x=col * col_width + self.PAD, y=row * self.ROW_HEIGHT - shift + self.PAD)
+                shown.append(card)
+            else:
+                card.place_forget()
+        self.shown = shown
+
+        if content > 0:
+            self.scrollbar.set(self.offset / content, min(1.0, (self.offset + height) / content))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+
+class JobsPanel(ctk.CTkToplevel):
+    """Progress of several modules run by the scheduler; one job's output is shown at a time."""
+
+    STATE_TEXT = {
+        PENDING: "waiting",
+        RUNNING: "running…",
+        DONE: "✓ done",
+        FAILED: "✗ failed",
+        SKIPPED: "skipped",
+    }
+
+    def __init__(
+        self,
+        master,
+        modules: list[ScriptModule],
+        on_job_finished: Callable,
+        store: Optional[AppliedStore] = None,
+    ):
+        super().__init__(master)
+        self.on_job_finished = on_job_finished
+        self.store = store
+        self.events: queue.Queue = queue.Queue()
+        self.runs: dict[str, PtyRun] = {}
+        self.jobs = build_jobs(modules)
+        self.scheduler = JobScheduler(
+            self.jobs,
+            self._run_job,
+            on_update=lambda job: self.events.put(("state", job.name, None)),
+        )
+        self.current = self.jobs[0].name
+        self.done = False
+
+        self.title("Run selected - BASHIUM")
+        self.geometry("1000x560")
+        self.transient(master.winfo_toplevel())
+
+        waves = topological_waves(self.jobs)
+        plan = "  →  ".join(" + ".join(wave) for wave in waves)
+        self.status_label = ctk.CTkLabel(
+            self,
+            text=f"Order: {plan}",
+            font=ctk.CTkFont(size=13, weight="bold"),
+            anchor="w",
+        )
+        self.status_label.pack(fill="x", padx=15, pady=(12, 6))
+
+        body = ctk.CTkFrame(self, fg_color="transparent")
+        body.pack(fill="both", expand=True, padx=15, pady=(0, 10))
+
+        job_list = ctk.CTkFrame(body, width=220)
+        job_list.pack(side="left", fill="y", padx=(0, 10))
+        self.state_labels = {}
+        for job in self.jobs:
+            row = ctk.CTkFrame(job_list, fg_color="transparent")
+            row.pack(fill="x", padx=8, pady=4)
+            ctk.CTkButton(
+                row,
+                text=job.name,
+                width=120,
+                command=lambda name=job.name: self._show(name),
+            ).pack(side="left")
+            label = ctk.CTkLabel(row, text=self._state_text(job), font=ctk.CTkFont(size=12))
+            label.pack(side="left", padx=(8, 0))
+            self.state_labels[job.name] = label
+
+        self.textbox = ctk.CTkTextbox(body, font=ctk.CTkFont(family="monospace", size=12), wrap="char")
+        self.textbox.pack(side="left", fill="both", expand=True)
+        self.textbox.configure(state="disabled")
+
+        self.close_button = ctk.CTkButton(self, text="Stop", command=self._on_close, width=120)
+        self.close_button.pack(pady=(0, 12))
+
+        self.bind("<Key>", self._on_key)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.textbox.focus_set()
+
+        threading.Thread(target=self._schedule, name="bashium-scheduler", daemon=True).start()
+        self._drain()
+
+    def _schedule(self):
+        try:
+            if self.store is not None:
+                # Satisfied modules count as done without running
+                for job in mark_satisfied(self.jobs, self.store, dpkg=load_dpkg_index()):
+                    self.events.put(("state", job.name, None))
+            self.scheduler.run()
+        except Exception as e:
+            log_exception("Job scheduler failed", e)
+        self.events.put(("done", None, None))
+
+    def _run_job(self, job) -> int:
+        argv, cwd = job.module.command()
+        run = PtyRun(
+            argv,
+            cwd=cwd,
+            on_output=lambda text: self.events.put(("output", job.name, text)),
+            name=job.name,
+        )
+        self.runs[job.name] = run
+        run.start()
+        if self.scheduler.cancelled:
+            run.terminate()
+        return run.wait()
+
+    def _show(self, name: str):
+        self.current = name
+        run = self.runs.get(name)
+        self.textbox.configure(state="normal")
+        self.textbox.delete("1.0", "end")
+        if run is not None:
+            self.textbox.insert("end", run.output.text())
+        self.textbox.configure(state="disabled")
+        self.textbox.see("end")
+
+    def _on_key(self, event):
+        run = self.runs.get(self.current)
+        if run is None:
+            return "break"
+        if event.keysym in ("Return", "KP_Enter"):
+            run.write("\r")
+        elif event.keysym == "BackSpace":
+            run.write("\x7f")
+        elif event.char:
+            run.write(event.char)
+        return "break"
+
+    def _append(self, text: str):
+        self.textbox.configure(state="normal")
+        self.textbox.insert("end", text)
+        lines = int(self.textbox.index("end-1c").split(".")[0])
+        if lines > RunPanel.MAX_LINES:
+            self.textbox.delete("1.0", f"{lines - RunPanel.MAX_LINES}.0")
+        self.textbox.configure(state="disabled")
+        self.textbox.see("end")
+
+    def _drain(self):
+        chunks = []
+        finished = False
+        try:
+            while True:
+                kind, name, value = self.events.get_nowait()
+                if kind == "output":
+                    if name == self.current:
+                        chunks.append(value)
+                elif kind == "state":
+                    self._update_job(name)
+                else:
+                    finished = True
+        except queue.Empty:
+            pass
+
+        try:
+            if chunks:
+                self._append("".join(chunks))
+            if finished:
+                self._finish()
+                return
+        except Exception as e:
+            log_exception("Failed to update jobs panel", e)
+        self.after(50, self._drain)
+
+    def _state_text(self, job) -> str:
+        text = self.STATE_TEXT[job.state]
+        if job.state in (DONE, FAILED) and job.duration is not None:
+            text += f" ({job.duration:.0f}s)"
+        elif job.state in (DONE, SKIPPED) and job.reason:
+            text += f" ({job.reason})"
+        return text
+
+    def _update_job(self, name: str):
+        job = next(j for j in self.jobs if j.name == name)
+        self.state_labels[name].configure(text=self._state_text(job))
+        if job.state == RUNNING and self.current not in self.runs:
+            self._show(name)
+        if job.state in (DONE, FAILED) and job.started is not None:
+            self.on_job_finished(job)
+
+    def _finish(self):
+        failed = [j.name for j in self.jobs if j.state != DONE]
+        if failed:
+            self.status_label.configure(text=f"Finished; not completed: {', '.join(failed)}.")
+        else:
+            self.status_label.configure(text="All selected modules finished successfully.")
+        self.done = True
+        self.close_button.configure(text="Close", command=self.destroy)
+
+    def _on_close(self):
+        if not self.done:
+            # Pending jobs are skipped; finished ones are still reported
+            self.scheduler.cancel()
+            for run in list(self.runs.values()):
+                run.terminate()
+            self.close_button.configure(text="Stopping…")
+            return
+        self.destroy()
+
+
+class CatalogueWindow(ctk.CTkToplevel):
+    """Xfce Look archives as tiles; thumbnails are loaded only for tiles in view."""
+
+    COLUMNS = 3
+    # Tiles created per event-loop turn, so large catalogues open immediately
+    BUILD_BATCH = 24
+
+    def __init__(self, master, assets_dir: Path, colors: dict, cache: Optional[ThumbnailCache] = None):
+        super().__init__(master)
+        self.assets_dir = assets_dir
+        self.home = Path.home()
+        self.colors = colors
+        self.events: queue.Queue = queue.Queue()
+        self.archives = find_archives(assets_dir)
+        self.installed = load_manifest(self.home)
+        self.tiles: list[tuple[Archive, ctk.CTkLabel]] = []
+        self.image_labels: dict[str, ctk.CTkLabel] = {}
+        self.state_labels: dict[str, ctk.CTkLabel] = {}
+        self.selected: dict[str, ctk.BooleanVar] = {}
+        # CTkImage objects must stay referenced while shown
+        self.images: dict[str, ctk.CTkImage] = {}
+        self.installing = False
+        self.closed = False
+        self._visible_pending = False
+        self.loader = None
+        if pil_available():
+            self.loader = ThumbnailLoader(
+                cache or ThumbnailCache(),
+                lambda key, data: self.events.put(("thumb", key, data)),
+            )
+
+        self.title("Xfce Look catalogue - BASHIUM")
+        self.geometry("900x640")
+        self.transient(master.winfo_toplevel())
+
+        top = ctk.CTkFrame(self, fg_color="transparent")
+        top.pack(fill="x", padx=15, pady=(12, 6))
+        self.status_label = ctk.CTkLabel(
+            top,
+            text=f"{len(self.archives)} items. Installs into {self.home}.",
+            font=ctk.CTkFont(size=13, weight="bold"),
+            anchor="w",
+        )
+        self.status_label.pack(side="left")
+        self.install_button = ctk.CTkButton(
+            top,
+            text="Install selected",
+            command=self._install_selected,
+            fg_color=colors["success"],
+            hover_color=colors["success_hover"],
+            text_color="#000000",
+            width=140,
+        )
+        self.install_button.pack(side="right")
+
+        self.scroll = ctk.CTkScrollableFrame(self, fg_color="transparent")
+        self.scroll.pack(fill="both", expand=True, padx=15, pady=(0, 12))
+        for col in range(self.COLUMNS):
+            self.scroll.grid_columnconfigure(col, weight=1)
+        self.canvas = self._hook_scrolling()
+
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self._build_tiles(0)
+        self._drain()
+
+    def _hook_scrolling(self):
+        # CTkScrollableFrame has no scroll event; the canvas reports every view
+        # change (wheel, scrollbar, resize) through yscrollcommand
+        canvas = getattr(self.scroll, "_parent_canvas", None)
+        scrollbar = getattr(self.scroll, "_scrollbar", None)
+        if canvas is None or scrollbar is None:
+            return None
+
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            self._schedule_visible()
+
+        canvas.configure(yscrollcommand=on_scroll)
+        return canvas
+
+    def _build_tiles(self, start: int):
+        no_preview = "…" if self.loader is not None else "No preview (install Pillow)"
+        for index in range(start, min(start + self.BUILD_BATCH, len(self.archives))):
+            archive = self.archives[index]
+            tile = ctk.CTkFrame(self.scroll, fg_color=self.colors["card_bg"], corner_radius=10)
+            tile.grid(row=index // self.COLUMNS, column=index % self.COLUMNS, padx=8, pady=8, sticky="nsew")
+
+            image_label = ctk.CTkLabel(tile, text=no_preview, width=240, height=150)
+            image_label.pack(padx=10, pady=(10, 4))
+            ctk.CTkLabel(
+                tile,
+                text=archive_title(archive),
+                font=ctk.CTkFont(size=13, weight="bold"),
+                text_color=self.colors["accent"],
+            ).pack(padx=10)
+
+            row = ctk.CTkFrame(tile, fg_color="transparent")
+            row.pack(fill="x", padx=10, pady=(4, 10))
+            var = ctk.BooleanVar(value=False)
+            ctk.CTkCheckBox(row, text=archive.kind.rstrip("s"), variable=var).pack(side="left")
+            state_label = ctk.CTkLabel(row, text="", font=ctk.CTkFont(size=12), text_color=self.colors["success"])
+            state_label.pack(side="right")
+
+            self.tiles.append((archive, image_label))
+            self.image_labels[archive.key] = image_label
+            self.state_labels[archive.key] = state_label
+            self.selected[archive.key] = var
+            self._set_installed(archive.key, archive.key in self.installed)
+
+        if len(self.tiles) < len(self.archives):
+            self.after(1, self._build_tiles, len(self.tiles))
+        self._schedule_visible()
+
+    def _set_installed(self, key: str, installed: bool):
+        self.state_labels[key].configure(text="✓ installed" if installed else "")
+
+    def _schedule_visible(self):
+        if not self._visible_pending:
+            self._visible_pending = True
+            self.after_idle(self._request_visible)
+
+    def _request_visible(self):
+        self._visible_pending = False
+        if self.loader is None or not self.tiles:
+            return
+        if self.canvas is None:
+            visible = self.tiles
+        else:
+            # Tiles have equal heights, so rows map linearly onto the scroll fractions
+            top, bottom = self.canvas.yview()
+            rows = (len(self.archives) + self.COLUMNS - 1) // self.COLUMNS
+            first = max(0, int(top * rows))
+            last = min(rows, int(bottom * rows) + 2)  # one extra row of read-ahead
+            visible = self.tiles[first * self.COLUMNS:last * self.COLUMNS]
+        self.loader.request_visible(archive for archive, _label in visible)
+
+    def _show_thumbnail(self, key: str, data):
+        label = self.image_labels[key]
+        if data is None:
+            label.configure(text="No preview")
+            return
+        from PIL import Image
+
+        img = Image.open(io.BytesIO(data))
+        img.load()
+        image = ctk.CTkImage(light_image=img, dark_image=img, size=img.size)
+        self.images[key] = image
+        label.configure(image=image, text="")
+
+    def _install_selected(self):
+        keys = {key for key, var in self.selected.items() if var.get()}
+        if not keys or self.installing:
+            return
+        self.installing = True
+        self.install_button.configure(state="disabled")
+        self.status_label.configure(text=f"Installing {len(keys)} items…")
+        threading.Thread(
+            target=self._install_worker,
+            args=(keys,),
+            name="bashium-catalogue-install",
+            daemon=True,
+        ).start()
+
+    def _install_worker(self, keys: set[str]):
+        try:
+            result = install_assets(
+                self.assets_dir,
+                self.home,
+                only=keys,
+                on_progress=lambda state, archive: self.events.put(("progress", archive.key, state)),
+            )
+        except Exception as e:
+            log_exception("Catalogue install failed", e)
+            result = None
+        self.events.put(("installed", None, result))
+
+    def _drain(self):
+        if self.closed:
+            return
+        try:
+            while True:
+                kind, key, value = self.events.get_nowait()
+                try:
+                    if kind == "thumb":
+                        self._show_thumbnail(key, value)
+                    elif kind == "progress":
+                        if value in ("extracted", "unchanged"):
+                            self._set_installed(key, True)
+                    else:
+                        self._install_finished(value)
+                except Exception as e:
+                    log_exception("Failed to update catalogue", e)
+        except queue.Empty:
+            pass
+        self.after(50, self._drain)
+
+    def _install_finished(self, result):
+        self.installing = False
+        self.install_button.configure(state="normal")
+        if result is None:
+            self.status_label.configure(text="Installation failed, see ~/.local/state/bashium/events.jsonl")
+        elif result.ok:
+            self.status_label.configure(
+                text=f"Installed {len(result.extracted)}, already up to date {len(result.unchanged)}."
+            )
+        else:
+            self.status_label.configure(text=f"Failed: {', '.join(k for k, _ in result.failed)}")
+
+    def _on_close(self):
+        self.closed = True
+        if self.loader is not None:
+            self.loader.shutdown()
+        self.destroy()
+
+
+class BashiumApp:
+    PALETTES = PALETTES
+    
+    def __init__(self, root: ctk.CTk, modules: list[ScriptModule], hw_info: dict, config: Optional[ConfigStore] = None):
+        self.root = root
+        self.modules = modules
+        self.hw_info = hw_info
+        self.config = config or ConfigStore()
+        self.applied = AppliedStore()
+        self.prefetcher = Prefetcher(lambda name: self.post(self._apply_prefetch, name))
+        # "Run selected" ticks from the last session
+        self.card_states: dict[str, CardState] = {
+            name: CardState(selected=True) for name in self.config.get("selected_modules")
+        }
+        self.module_index = ModuleIndex(modules)
+        self.hw_value_labels = {}
+        saved_palette = self.config.get("palette_preset")
+        if saved_palette not in self.PALETTES:
+            saved_palette = "Neon Cyan"
+        self.styles = StyleRegistry(self.PALETTES[saved_palette])
+        # (callable, args) posted by worker threads, run on the Tk thread
+        self.ui_queue: queue.Queue = queue.Queue()
+        
+        with span("setup_window"):
+            self.setup_window()
+        with span("setup_ui"):
+            self.setup_ui()
+        
+        # Zastosuj zapisany motyw
+        self.palette_var.set(saved_palette)
+        self._apply_palette()
+
+        self._drain_ui_queue()
+        # Ticks restored from the last session prefetch too, once the window is up
+        self.root.after_idle(self.update_prefetch)
+    
+    def setup_window(self):
+        self.root.title("BASHIUM - System Tweaker")
+        self.root.geometry("1000x700")
+        self.root.minsize(900, 600)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        geometry = self.config.get("geometry")
+        if isinstance(geometry, str) and GEOMETRY_RE.fullmatch(geometry):
+            self.root.geometry(geometry)
+            return
+
+        # Centrowanie okna
+        self.root.update_idletasks()
+        x = (self.root.winfo_screenwidth() // 2) - (1000 // 2)
+        y = (self.root.winfo_screenheight() // 2) - (700 // 2)
+        self.root.geometry(f"1000x700+{x}+{y}")
+    
+    def setup_ui(self):
+        # Main container
+        main_frame = ctk.CTkFrame(self.root, fg_color="transparent")
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        # Header
+        header_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        header_frame.pack(fill="x", pady=(0, 20))
+        
+        self.title_label = ctk.CTkLabel(
+            header_frame,
+            text="⚡ BASHIUM",
+            font=ctk.CTkFont(size=32, weight="bold"),
+        )
+        self.title_label.pack(side="left")
+        
+        self.subtitle_label = ctk.CTkLabel(
+            header_frame,
+            text="System Tweaker & Configuration Tool",
+            font=ctk.CTkFont(size=14),
+        )
+        self.subtitle_label.pack(side="left", padx=(15, 0))
+        self.styles.register("title", self.title_label)
+        self.styles.register("subtitle", self.subtitle_label)
+        
+        # Theme selector
+        self.palette_var = ctk.StringVar()
+        theme_menu = ctk.CTkOptionMenu(
+            header_frame,
+            values=list(self.PALETTES.keys()),
+            variable=self.palette_var,
+            command=lambda _: self._on_palette_selected(),
+            font=ctk.CTkFont(size=12),
+            width=150
+        )
+        theme_menu.pack(side="right")
+
+        self.run_selected_button = ctk.CTkButton(
+            header_frame,
+            text="▶ RUN SELECTED",
+            command=self._run_selected,
+            font=ctk.CTkFont(size=12, weight="bold"),
+            width=150,
+        )
+        self.run_selected_button.pack(side="right", padx=(0, 10))
+
+        self.history_button = ctk.CTkButton(
+            header_frame,
+            text="HISTORY",
+            command=self._open_history,
+            font=ctk.CTkFont(size=12, weight="bold"),
+            width=100,
+        )
+        self.history_button.pack(side="right", padx=(0, 10))
+        
+        # Hardware info panel
+        self.hw_panel = ctk.CTkFrame(main_frame, corner_radius=12)
+        self.hw_panel.pack(fill="x", pady=(0, 20))
+        
+        self.hw_title = ctk.CTkLabel(
+            self.hw_panel,
+            text="🖥️ Hardware Detection",
+            font=ctk.CTkFont(size=16, weight="bold"),
+        )
+        self.hw_title.pack(anchor="w", padx=20, pady=(15, 10))
+        self.styles.register("title", self.hw_title)
+        
+        # Grid dla info o hardware
+        info_grid = ctk.CTkFrame(self.hw_panel, fg_color="transparent")
+        info_grid.pack(fill="x", padx=20, pady=(0, 15))
+        
+        hw_items = [
+            ("Wi-Fi", "wifi_text"),
+            ("Bluetooth", "bt_text"),
+            ("NVIDIA", "nvidia_text"),
+            ("Repository", "nonfree_text"),
+            ("USB Devices", "usb_text"),
+        ]
+        
+        self.hw_labels = []
+        for i, (label, key) in enumerate(hw_items):
+            row = i // 2
+            col = i % 2
+            
+            item_frame = ctk.CTkFrame(info_grid, fg_color="transparent")
+            item_frame.grid(row=row, column=col, sticky="w", padx=15, pady=5)
+            
+            label_widget = ctk.CTkLabel(
+                item_frame,
+                text=f"{label}:",
+                font=ctk.CTkFont(size=12, weight="bold"),
+            )
+            label_widget.pack(side="left")
+            
+            value_widget = ctk.CTkLabel(
+                item_frame,
+                text=self.hw_info.get(key, PROBING_TEXT),
+                font=ctk.CTkFont(size=12),
+            )
+            value_widget.pack(side="left", padx=(5, 0))
+            
+            self.hw_labels.append((label_widget, value_widget))
+            self.styles.register("body", label_widget)
+            self.styles.register("subtitle", value_widget)
+            self.hw_value_labels[key] = value_widget
+        
+        # Type-to-filter over name, description and category
+        self.search_var = ctk.StringVar()
+        self.search_entry = ctk.CTkEntry(
+            main_frame,
+            textvariable=self.search_var,
+            placeholder_text="Search modules…",
+            font=ctk.CTkFont(size=13),
+            height=34,
+        )
+        self.search_entry.pack(fill="x", padx=10, pady=(0, 10))
+        self.search_entry.bind("<KeyRelease>", lambda _e: self._on_search())
+
+        # Siatka modułów (2 kolumny); karty tylko dla widocznych wierszy
+        self.module_grid = ModuleGrid(main_frame, self.modules, self._make_card)
+        self.module_grid.pack(fill="both", expand=True)
+
+    def _make_card(self, master) -> ModuleCard:
+        return ModuleCard(
+            master, self.styles, self.card_states, self.record_result, self._open_catalogue, self.update_prefetch
+        )
+
+    def _open_catalogue(self, module: ScriptModule):
+        cache_root = self.config.get("thumbnail_cache_dir")
+        cache = ThumbnailCache(
+            Path(cache_root).expanduser() if cache_root else None,
+            int(self.config.get("thumbnail_cache_mb")) * 1024 * 1024,
+        )
+        try:
+            CatalogueWindow(self.root, module.entry_script.parent, self.styles.colors, cache)
+        except Exception as e:
+            log_exception("Failed to open catalogue", e)
+
+    def _on_search(self):
+        self.module_grid.set_items(self.module_index.search(self.search_var.get()))
+
+    def _run_selected(self):
+        selected = [
+            module for module in self.modules
+            if module.enabled and self.card_states.get(module.name, CardState()).selected
+        ]
+        if not selected:
+            return
+        self._save_selection()
+        self.update_prefetch(m.name for m in selected)
+
+        try:
+            JobsPanel(
+                self.root,
+                selected,
+                lambda job: self.record_result(job.module, job.returncode),
+                self.applied,
+            )
+        except Exception as e:
+            log_exception("Failed to start selected modules", e)
+
+    def update_prefetch(self, started: Iterable[str] = ()):
+        """Prefetch the packages of selected modules and open confirm dialogs, except `started`."""
+        started = set(started)
+        wanted = {}
+        for module in self.modules:
+            state = self.card_states.get(module.name)
+            if (
+                module.prefetch and module.enabled and module.name not in started
+                and state is not None and (state.selected or state.confirming)
+            ):
+                wanted[module.name] = module.packages
+        self.prefetcher.update(wanted)
+
+    def _apply_prefetch(self, name: str):
+        status = self.prefetcher.status(name)
+        state = self.card_states.setdefault(name, CardState())
+        text = status.text() if status is not None else ""
+        if text != state.prefetch:
+            state.prefetch = text
+            self.module_grid.refresh_visible()
+
+    def _open_history(self):
+        try:
+            HistoryWindow(self.root, self.modules)
+        except Exception as e:
+            log_exception("Failed to open run history", e)
+
+    def _save_selection(self):
+        names = {m.name for m in self.modules}
+        self.config.update(
+            selected_modules=sorted(n for n, s in self.card_states.items() if s.selected and n in names)
+        )
+
+    def _on_close(self):
+        self.prefetcher.close()
+        try:
+            self._save_selection()
+            self.config.update(geometry=self.root.geometry())
+            self.config.flush()
+        except Exception as e:
+            log_exception("Failed to save settings", e)
+        self.root.destroy()
+
+    def post(self, fn, *args):
+        """Schedule fn(*args) on the Tk thread; safe to call from any thread."""
+        self.ui_queue.put((fn, args))
+
+    def _drain_ui_queue(self):
+        try:
+            while True:
+                fn, args = self.ui_queue.get_nowait()
+                try:
+                    fn(*args)
+                except Exception as e:
+                    log_exception("Failed to apply background update", e)
+        except queue.Empty:
+            pass
+        self.root.after(50, self._drain_ui_queue)
+
+    def apply_package_status(self, status: dict, applied: set):
+        for name, (packages, optional) in status.items():
+            state = self.card_states.setdefault(name, CardState())
+            state.packages, state.optional = packages, optional
+            state.applied = name in applied
+        self.module_grid.refresh_visible()
+
+    def record_result(self, module: ScriptModule, returncode: int):
+        """Exit code of an in-app run; the module may have installed packages and is recorded if it succeeded."""
+        state = self.card_states.setdefault(module.name, CardState())
+        state.returncode = returncode
+        self.module_grid.refresh_visible()
+        # The dpkg status file is read off the Tk thread
+        threading.Thread(
+            target=_run_result_worker,
+            args=(self, module, returncode),
+            name="bashium-dpkg",
+            daemon=True,
+        ).start()
+
+    def _apply_run_result(self, name: str, packages: tuple, optional: tuple, applied: bool):
+        state = self.card_states.setdefault(name, CardState())
+        state.packages, state.optional = packages, optional
+        state.applied = applied
+        self.module_grid.refresh_visible()
+
+    def apply_hardware(self, hw_update: dict, flag_update: dict):
+        self.hw_info.update(hw_update)
+        for key, text in hw_update.items():
+            label = self.hw_value_labels.get(key)
+            if label is not None:
+                label.configure(text=text)
+
+        changed = False
+        for position, module in enumerate(self.modules):
+            if module.apply_hardware(self.hw_info, flag_update):
+                self.module_index.update(position)
+                changed = True
+        if changed:
+            self.module_grid.refresh_visible()
+
+    def _get_current_colors(self) -> dict:
+        palette_name = self.palette_var.get()
+        return self.PALETTES.get(palette_name, self.PALETTES["Neon Cyan"])
+    
+    def _apply_palette(self):
+        # Ustaw tryb appearance
+        if "Light" in self.palette_var.get():
+            ctk.set_appearance_mode("light")
+        else:
+            ctk.set_appearance_mode("dark")
+
+        # Jedno przejście po zarejestrowanych widżetach, bez przeszukiwania drzewa
+        with span("apply_palette", widgets=len(self.styles)):
+            self.styles.apply(self._get_current_colors())
+
+    def _on_palette_selected(self):
+        self._apply_palette()
+        # Zapis w tle (ConfigStore), nie w wątku UI
+        self.config.update(palette_preset=self.palette_var.get())
+
+
+def _detect_hardware_worker(
+    cache: HardwareCache, fingerprint: str, on_result: Callable[[dict, dict], None]
+) -> None:
+    try:
+        detect_and_store(cache, fingerprint, on_result)
+    except Exception as e:
+        log_exception("Hardware detection failed", e)
+
+
+def _package_counts(index, module: ScriptModule) -> tuple[tuple[int, int], tuple[int, int]]:
+    """(installed, total) of the required and of the optional packages."""
+    required, optional = module.required_packages, module.optional_packages
+    return (
+        (index.count_installed(required), len(required)),
+        (index.count_installed(optional), len(optional)),
+    )
+
+
+def _run_result_worker(app: BashiumApp, module: ScriptModule, returncode: int) -> None:
+    try:
+        index = load_dpkg_index()
+        if returncode == 0:
+            app.applied.record(module, INTERACTIVE_INPUTS, index)
+        applied = app.applied.satisfied(module, dpkg=index)
+        app.post(app._apply_run_result, module.name, *_package_counts(index, module), applied)
+    except Exception as e:
+        log_exception("Failed to record the run", e)
+
+
+def _package_status_worker(app: BashiumApp, modules: list[ScriptModule]) -> None:
+    try:
+        index = load_dpkg_index()
+        status = {}
+        applied = set()
+        with span("package status", modules=len(modules)):
+            for module in modules:
+                status[module.name] = _package_counts(index, module)
+                if app.applied.satisfied(module, dpkg=index):
+                    applied.add(module.name)
+        app.post(app.apply_package_status, status, applied)
+    except Exception as e:
+        log_exception("Package status scan failed", e)
+
+
+def run_gui(base_dir: Path) -> None:
+    cache = HardwareCache()
+    with span("hardware cache"):
+        fingerprint = hardware_fingerprint()
+        cached = cache.load(fingerprint)
+    if cached is not None:
+        hw_info, hw_flags = cached
+    else:
+        # Cold start: show the window right away with placeholders
+        hw_info, hw_flags = {}, {}
+
+    with span("build_modules"):
+        modules = build_modules(base_dir, hw_info, hw_flags)
+
+    with span("create root window"):
+        root = ctk.CTk()
+    with span("BashiumApp"):
+        app = BashiumApp(root, modules, hw_info=dict(hw_info))
+
+    # Plugged and unplugged devices update the hardware panel, the cards and the cache
+    monitor = start_monitor(
+        lambda hw_update, flag_update: app.post(app.apply_hardware, hw_update, flag_update),
+        initial=(hw_info, hw_flags),
+        cache=cache,
+    )
+
+    def detected(hw_update: dict, flag_update: dict) -> None:
+        if monitor is not None:
+            # Hotplug only reports what differs from these
+            monitor.note(hw_update, flag_update)
+        app.post(app.apply_hardware, hw_update, flag_update)
+
+    # Tk is only touched from the main loop; workers go through app.post()
+    if cached is None:
+        threading.Thread(
+            target=_detect_hardware_worker,
+            args=(cache, fingerprint, detected),
+            name="bashium-detect",
+            daemon=True,
+        ).start()
+    else:
+        # Cached panel first; the detectors run again only if the machine
+        # changed since the fingerprint was taken
+        revalidate_in_background(cache, fingerprint, cached, detected)
+    threading.Thread(
+        target=_package_status_worker,
+        args=(app, modules),
+        name="bashium-dpkg",
+        daemon=True,
+    ).start()
+
+    instant("mainloop")
+    # First turn of the event loop after the window is mapped and drawn
+    root.after_idle(instant, "first idle")
+    root.mainloop()
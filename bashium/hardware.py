@@ -0,0 +1,363 @@
+import os
+import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Mapping, Optional, Union
+
+from bashium.aptsources import load_sources_index
+from bashium.hwids import device_name
+from bashium.sysfs import (
+    PCI_CLASS_BLUETOOTH,
+    PCI_CLASS_DISPLAY,
+    PCI_CLASS_NETWORK_OTHER,
+    SYSFS_ROOT,
+    USB_CLASS_VENDOR_SPECIFIC,
+    USB_CLASS_WIRELESS,
+    USB_IFACE_BLUETOOTH,
+    Inventory,
+    read_inventory,
+)
+from bashium.trace import spawn_span, span
+
+PROBE_TIMEOUT = 5.0
+
+NVIDIA_PCI_VENDOR = "10de"
+
+WIFI_VENDOR_IDS = {
+    "8086": "Intel",
+    "14e4": "Broadcom",
+    "10ec": "Realtek",
+    "0bda": "Realtek",
+    "168c": "Atheros/Qualcomm",
+    "0cf3": "Atheros/Qualcomm",
+    "14c3": "MediaTek",
+    "0e8d": "MediaTek",
+    "148f": "Ralink",
+}
+
+# Debian package with the firmware for each Wi-Fi vendor (as installed by firmware.sh)
+WIFI_FIRMWARE = {
+    "Intel": "firmware-iwlwifi",
+    "Broadcom": "firmware-brcm80211",
+    "Realtek": "firmware-realtek",
+    "Atheros/Qualcomm": "firmware-atheros",
+    "MediaTek": "firmware-mediatek",
+    "Ralink": "firmware-ralink",
+}
+
+
+@dataclass(frozen=True)
+class Probe:
+    name: str
+    argv: tuple[str, ...]
+    timeout: float = PROBE_TIMEOUT
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    # None when the command is missing, failed to start or timed out
+    returncode: Optional[int]
+    stdout: str = ""
+
+
+# Every distinct external command the detectors need, run at most once per snapshot.
+# `lspci -nn` is a superset of plain `lspci` (names plus [vendor:device] ids).
+PROBES: dict[str, Probe] = {
+    p.name: p
+    for p in (
+        Probe("lspci", ("lspci", "-nn")),
+        Probe("lsusb", ("lsusb",)),
+        Probe("rfkill", ("rfkill", "list")),
+    )
+}
+
+# Probes whose information is read from sysfs when it is available
+SYSFS_COVERED_PROBES = frozenset({"lspci", "lsusb", "rfkill"})
+
+
+def run_probe(probe: Probe) -> ProbeResult:
+    try:
+        with spawn_span(probe.argv):
+            proc = subprocess.run(
+                list(probe.argv),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                timeout=probe.timeout,
+                check=False,
+            )
+    except Exception:
+        return ProbeResult(None)
+    return ProbeResult(proc.returncode, proc.stdout)
+
+
+class HardwareSnapshot:
+    """Results of one concurrent probe run, shared by all detectors.
+
+    Results may still be pending futures; a lookup blocks only on the probe it
+    needs, so detectors can finish as soon as their own inputs are ready.
+    """
+
+    def __init__(
+        self,
+        results: Mapping[str, Union[ProbeResult, "Future[ProbeResult]"]],
+        inventory: Optional[Inventory] = None,
+    ):
+        self.results = results
+        # Detectors use the sysfs inventory when present and only parse
+        # command output as a fallback
+        self.inventory = inventory
+
+    def result(self, name: str) -> Optional[ProbeResult]:
+        result = self.results.get(name)
+        if isinstance(result, Future):
+            return result.result()
+        return result
+
+    def output(self, name: str) -> str:
+        # Same contract as the old `_safe_check_output`: empty on any failure
+        result = self.result(name)
+        if result is None or result.returncode != 0:
+            return ""
+        return result.stdout
+
+    def succeeded(self, name: str) -> bool:
+        result = self.result(name)
+        return result is not None and result.returncode == 0
+
+    def wait(self) -> "HardwareSnapshot":
+        for name in self.results:
+            self.result(name)
+        return self
+
+
+def start_snapshot(names: Optional[Iterable[str]] = None, sysfs: Path = SYSFS_ROOT) -> HardwareSnapshot:
+    """Start all probes concurrently and return without waiting for them."""
+    with span("read_inventory"):
+        inventory = read_inventory(sysfs)
+    wanted = dict.fromkeys(names if names is not None else PROBES)
+    if inventory is not None:
+        wanted = {n: None for n in wanted if n not in SYSFS_COVERED_PROBES}
+
+    probes = [PROBES[n] for n in wanted]
+    if not probes:
+        return HardwareSnapshot({}, inventory)
+
+    pool = ThreadPoolExecutor(max_workers=len(probes), thread_name_prefix="bashium-probe")
+    results = {p.name: pool.submit(run_probe, p) for p in probes}
+    # Workers exit on their own once the submitted probes are done
+    pool.shutdown(wait=False)
+    return HardwareSnapshot(results, inventory)
+
+
+def take_snapshot(names: Optional[Iterable[str]] = None, sysfs: Path = SYSFS_ROOT) -> HardwareSnapshot:
+    return start_snapshot(names, sysfs).wait()
+
+
+def detect_nvidia_gpu(snapshot: Optional[HardwareSnapshot] = None) -> bool:
+    snapshot = snapshot or take_snapshot(["lspci"])
+    inventory = snapshot.inventory
+    if inventory is not None:
+        return any(
+            d.vendor == NVIDIA_PCI_VENDOR and d.base_class == PCI_CLASS_DISPLAY
+            for d in inventory.pci or ()
+        )
+
+    return "nvidia" in snapshot.output("lspci").lower()
+
+
+def detect_bluetooth_controller(snapshot: Optional[HardwareSnapshot] = None) -> bool:
+    snapshot = snapshot or take_snapshot(["rfkill", "lspci", "lsusb"])
+    inventory = snapshot.inventory
+    if inventory is not None:
+        return (
+            "bluetooth" in inventory.rfkill_types
+            or inventory.bluetooth_hci
+            or any(d.class_subclass == PCI_CLASS_BLUETOOTH for d in inventory.pci or ())
+            or any(USB_IFACE_BLUETOOTH in d.interfaces for d in inventory.usb or ())
+        )
+
+    for name in ("rfkill", "lspci", "lsusb"):
+        if "bluetooth" in snapshot.output(name).lower():
+            return True
+
+    try:
+        entries = os.listdir("/sys/class/bluetooth")
+        return any(e.startswith("hci") for e in entries)
+    except Exception:
+        return False
+
+
+def usb_wifi_adapters(inventory: Inventory) -> list[tuple[str, str, str]]:
+    """(bus, vendor, device) of USB devices of a Wi-Fi vendor that look like a Wi-Fi adapter.
+
+    A dongle whose driver is missing (often the firmware package is what
+    brings it up) has no wireless interface yet, so it is recognised by
+    its interfaces: vendor-specific, or wireless controller but not the
+    Bluetooth one.
+    """
+    found = []
+    for d in inventory.usb or ():
+        if d.vendor not in WIFI_VENDOR_IDS:
+            continue
+        if any(
+            iface[0] == USB_CLASS_VENDOR_SPECIFIC or (iface[0] == USB_CLASS_WIRELESS and iface != USB_IFACE_BLUETOOTH)
+            for iface in d.interfaces
+        ):
+            found.append(("usb", d.vendor, d.product))
+    return found
+
+
+def detect_wifi_vendors(snapshot: Optional[HardwareSnapshot] = None) -> set[str]:
+    snapshot = snapshot or take_snapshot(["lspci", "lsusb"])
+    inventory = snapshot.inventory
+    if inventory is not None:
+        # Only real wireless hardware counts: PCI network controllers,
+        # devices backing a wireless interface and USB Wi-Fi adapters
+        ids = [d.vendor for d in inventory.pci or () if d.class_subclass == PCI_CLASS_NETWORK_OTHER]
+        ids.extend(inventory.wireless_vendors)
+        ids.extend(vendor for _bus, vendor, _device in usb_wifi_adapters(inventory))
+        return {WIFI_VENDOR_IDS[v] for v in ids if v in WIFI_VENDOR_IDS}
+
+    hw = "\n".join([snapshot.output("lspci"), snapshot.output("lsusb")]).lower()
+
+    vendors: set[str] = set()
+    if not hw.strip():
+        return vendors
+
+    if any(x in hw for x in ["network controller", "wireless", "wi-fi", "802.11"]):
+        if any(x in hw for x in ["intel", "8086:"]):
+            vendors.add("Intel")
+        if any(x in hw for x in ["broadcom", "bcm", "14e4:"]):
+            vendors.add("Broadcom")
+        if any(x in hw for x in ["realtek", "rtl", "10ec:", "0bda:"]):
+            vendors.add("Realtek")
+        if any(x in hw for x in ["atheros", "qualcomm", "168c:", "0cf3:"]):
+            vendors.add("Atheros/Qualcomm")
+        if any(x in hw for x in ["mediatek", "mediatk", "mtk", "14c3:", "0e8d:"]):
+            vendors.add("MediaTek")
+        if any(x in hw for x in ["ralink", "148f:"]):
+            vendors.add("Ralink")
+
+    return vendors
+
+
+@dataclass(frozen=True)
+class WifiDevice:
+    bus: str
+    vendor: str
+    device: str
+
+    @property
+    def vendor_name(self) -> Optional[str]:
+        return WIFI_VENDOR_IDS.get(self.vendor)
+
+    @property
+    def firmware(self) -> Optional[str]:
+        return WIFI_FIRMWARE.get(self.vendor_name or "")
+
+    @property
+    def name(self) -> str:
+        """Model from pci.ids/usb.ids, e.g. "Intel Corporation Wi-Fi 6 AX200"."""
+        name = device_name(self.bus, self.vendor, self.device)
+        return name or f"{self.vendor_name} [{self.vendor}:{self.device}]"
+
+
+def detect_wifi_devices(snapshot: Optional[HardwareSnapshot] = None) -> Optional[list[WifiDevice]]:
+    """Wi-Fi hardware of the known vendors; None when sysfs is not available."""
+    snapshot = snapshot or take_snapshot([])
+    inventory = snapshot.inventory
+    if inventory is None:
+        return None
+    found = [("pci", d.vendor, d.device) for d in inventory.pci or () if d.class_subclass == PCI_CLASS_NETWORK_OTHER]
+    found.extend(inventory.wireless_devices)
+    found.extend(usb_wifi_adapters(inventory))
+    return [WifiDevice(*ids) for ids in dict.fromkeys(found) if ids[1] in WIFI_VENDOR_IDS]
+
+
+def detect_usb_devices_summary(snapshot: Optional[HardwareSnapshot] = None) -> str:
+    snapshot = snapshot or take_snapshot(["lsusb"])
+    inventory = snapshot.inventory
+    if inventory is not None:
+        if inventory.usb is None:
+            return "USB: unknown"
+        return f"USB: {len(inventory.usb)} device(s)"
+
+    out = snapshot.output("lsusb").strip()
+    if not out:
+        return "USB: unknown"
+    lines = [ln for ln in out.splitlines() if ln.strip()]
+    return f"USB: {len(lines)} device(s)"
+
+
+def has_nonfree_enabled() -> bool:
+    # Exact component match on enabled entries; commented-out lines and
+    # non-free-firmware alone do not count
+    return load_sources_index().has_component("non-free")
+
+
+def _wifi_result(snapshot: HardwareSnapshot) -> tuple[dict, dict]:
+    wifi_vendors = detect_wifi_vendors(snapshot)
+    devices = detect_wifi_devices(snapshot) if wifi_vendors else None
+    if not wifi_vendors:
+        wifi_desc = "None detected"
+    elif devices:
+        wifi_desc = "Detected: " + ", ".join(sorted({d.name for d in devices}))
+    else:
+        wifi_desc = "Detected: " + ", ".join(sorted(wifi_vendors))
+    return {"wifi_text": wifi_desc}, {"wifi": bool(wifi_vendors)}
+
+
+def _nvidia_result(snapshot: HardwareSnapshot) -> tuple[dict, dict]:
+    detected = detect_nvidia_gpu(snapshot)
+    text = "Detected" if detected else "Not detected"
+    if detected and snapshot.inventory is not None:
+        names = sorted({
+            device_name("pci", d.vendor, d.device) or ""
+            for d in snapshot.inventory.pci or ()
+            if d.vendor == NVIDIA_PCI_VENDOR and d.base_class == PCI_CLASS_DISPLAY
+        } - {""})
+        if names:
+            text = "Detected: " + ", ".join(names)
+    return {"nvidia_text": text}, {"nvidia": detected}
+
+
+def _flag_result(key: str, predicate: str, detected: bool) -> tuple[dict, dict]:
+    return {key: "Detected" if detected else "Not detected"}, {predicate: detected}
+
+
+# Hardware predicates a module manifest can require, as set by HW_DETECTORS
+HW_PREDICATES = ("wifi", "bluetooth", "nvidia")
+
+HW_DETECTORS = {
+    # name -> function(snapshot) returning (hw_info update, hw_flags update)
+    "wifi": _wifi_result,
+    "bt": lambda snap: _flag_result("bt_text", "bluetooth", detect_bluetooth_controller(snap)),
+    "nvidia": _nvidia_result,
+    "nonfree": lambda snap: ({"nonfree_text": "Enabled" if has_nonfree_enabled() else "Not enabled"}, {}),
+    "usb": lambda snap: ({"usb_text": detect_usb_devices_summary(snap)}, {}),
+}
+
+
+def detect_hardware(on_result: Optional[Callable[[dict, dict], None]] = None) -> tuple[dict, dict]:
+    """Probe the machine and return (hw_info, hw_flags).
+
+    `on_result` is called from worker threads as each detector finishes.
+    """
+    # Run every probe command once, concurrently, and share the results
+    snapshot = start_snapshot()
+    hw_info: dict = {}
+    hw_flags: dict = {}
+    with span("detect_hardware"), ThreadPoolExecutor(
+        max_workers=len(HW_DETECTORS), thread_name_prefix="bashium-detect"
+    ) as pool:
+        futures = [pool.submit(fn, snapshot) for fn in HW_DETECTORS.values()]
+        for future in as_completed(futures):
+            hw_update, flag_update = future.result()
+            hw_info.update(hw_update)
+            hw_flags.update(flag_update)
+            if on_result is not None:
+                on_result(hw_update, flag_update)
+    return hw_info, hw_flags
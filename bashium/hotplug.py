@@ -0,0 +1,229 @@
+"""Hotplug monitor: re-run the affected detectors when devices come and go.
+
+Listens on the kernel uevent netlink socket, so nothing is polled and no
+command is started: after a burst of events settles, the sysfs inventory is
+read again and only the detectors of the subsystems that changed are run.
+sysfs does not report device changes through inotify, so there is no
+fallback; without netlink the monitor does not start.
+
+Any datagram socket can stand in for the netlink socket, which is how
+synthetic events are injected (see format_uevent()).
+"""
+
+import os
+import select
+import socket
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from bashium.hardware import HW_DETECTORS, HardwareSnapshot
+from bashium.hwcache import HardwareCache, changed_results, fingerprint_dirs, hardware_fingerprint
+from bashium.log import log_exception
+from bashium.sysfs import SYSFS_ROOT, read_inventory
+from bashium.trace import span
+
+NETLINK_KOBJECT_UEVENT = 15
+# Multicast group of the kernel's own messages (udevd re-broadcasts on group 2)
+KERNEL_GROUP = 1
+RECV_SIZE = 64 * 1024
+
+# Wait this long after the last event before re-reading sysfs: plugging in one
+# dongle produces a burst of usb, net, rfkill and bluetooth events
+SETTLE_DELAY = 0.3
+
+ACTIONS = frozenset({"add", "remove", "bind", "unbind", "move"})
+
+# Which HW_DETECTORS entries depend on devices of each subsystem
+SUBSYSTEM_DETECTORS = {
+    "pci": ("wifi", "bt", "nvidia"),
+    "usb": ("usb", "bt", "wifi"),
+    "net": ("wifi",),
+    "bluetooth": ("bt",),
+    "rfkill": ("bt",),
+}
+
+
+@dataclass(frozen=True)
+class Uevent:
+    action: str
+    devpath: str
+    subsystem: str
+    env: dict[str, str] = field(default_factory=dict, compare=False)
+
+
+def parse_uevent(data: bytes) -> Optional[Uevent]:
+    """A kernel uevent ("action@devpath\\0KEY=value\\0..."); None for anything else."""
+    parts = data.split(b"\0")
+    header = parts[0].decode("utf-8", "replace")
+    if "@" not in header:
+        # udevd's "libudev" messages and other non-kernel datagrams
+        return None
+    action, devpath = header.split("@", 1)
+    env = {}
+    for part in parts[1:]:
+        key, sep, value = part.decode("utf-8", "replace").partition("=")
+        if sep:
+            env[key] = value
+    return Uevent(env.get("ACTION", action), env.get("DEVPATH", devpath), env.get("SUBSYSTEM", ""), env)
+
+
+def format_uevent(action: str, devpath: str, subsystem: str, **env: str) -> bytes:
+    """Encode an event the way the kernel sends it, e.g. for injecting it in tests."""
+    fields = {"ACTION": action, "DEVPATH": devpath, "SUBSYSTEM": subsystem, **env}
+    return b"\0".join([f"{action}@{devpath}".encode()] + [f"{k}={v}".encode() for k, v in fields.items()]) + b"\0"
+
+
+def affected_detectors(event: Uevent) -> set[str]:
+    if event.action not in ACTIONS:
+        return set()
+    if event.subsystem == "usb" and event.env.get("DEVTYPE") not in (None, "usb_device", "usb_interface"):
+        return set()
+    return set(SUBSYSTEM_DETECTORS.get(event.subsystem, ()))
+
+
+def open_uevent_socket() -> socket.socket:
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM | socket.SOCK_CLOEXEC, NETLINK_KOBJECT_UEVENT)
+    try:
+        sock.bind((0, KERNEL_GROUP))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+class HotplugMonitor:
+    """Background thread turning uevents into detector updates.
+
+    `on_change(hw_update, flag_update)` is called from the monitor thread with
+    the results of the re-run detectors that differ from what is known, i.e.
+    `initial` plus everything passed to note() or reported since. With a
+    `cache`, the changes are written to the hardware cache as well.
+    """
+
+    def __init__(
+        self,
+        on_change: Callable[[dict, dict], None],
+        source: Optional[socket.socket] = None,
+        sysfs: Path = SYSFS_ROOT,
+        settle: float = SETTLE_DELAY,
+        initial: Optional[tuple[dict, dict]] = None,
+        cache: Optional[HardwareCache] = None,
+    ):
+        self.on_change = on_change
+        self.source = source
+        self.sysfs = sysfs
+        self.settle = settle
+        self.cache = cache
+        # (hw_info, hw_flags) as last reported by any detector run
+        self.known: tuple[dict, dict] = (dict(initial[0]), dict(initial[1])) if initial else ({}, {})
+        self._known_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "HotplugMonitor":
+        if self.source is None:
+            self.source = open_uevent_socket()
+        # Written to by stop() to wake the thread out of select()
+        self._stop_r, self._stop_w = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="bashium-hotplug", daemon=True)
+        self._thread.start()
+        return self
+
+    def note(self, hw_update: dict, flag_update: dict) -> None:
+        """Results found outside the monitor (startup detection), so they are not reported again."""
+        with self._known_lock:
+            self.known[0].update(hw_update)
+            self.known[1].update(flag_update)
+
+    def stop(self, timeout: Optional[float] = 2.0) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            os.write(self._stop_w, b"x")
+        except OSError:
+            pass
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        try:
+            while True:
+                pending = self._wait_for_events()
+                if pending is None:
+                    return
+                self.refresh(pending)
+        except Exception as e:
+            log_exception("Hotplug monitor failed", e)
+        finally:
+            for fd in (self._stop_r, self._stop_w):
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+            if self.source is not None:
+                self.source.close()
+
+    def _wait_for_events(self) -> Optional[set[str]]:
+        """Block until relevant events arrived and then settled; None when stopped."""
+        pending: set[str] = set()
+        while True:
+            # Blocks without a timeout until the first relevant event
+            timeout = self.settle if pending else None
+            ready, _, _ = select.select([self.source, self._stop_r], [], [], timeout)
+            if self._stop_r in ready:
+                return None
+            if not ready:
+                return pending
+            try:
+                data = self.source.recv(RECV_SIZE)
+            except OSError:
+                # ENOBUFS after a large burst: some events were lost, re-check everything
+                pending.update(*SUBSYSTEM_DETECTORS.values())
+                continue
+            event = parse_uevent(data)
+            if event is not None:
+                pending |= affected_detectors(event)
+
+    def refresh(self, detectors: set[str]) -> tuple[dict, dict]:
+        """Re-read sysfs and run `detectors`; report and return what changed."""
+        inventory = read_inventory(self.sysfs)
+        if inventory is None:
+            return {}, {}
+        snapshot = HardwareSnapshot({}, inventory)
+        hw_changed: dict = {}
+        flags_changed: dict = {}
+        with span("hotplug", detectors=sorted(detectors)):
+            for name in sorted(detectors):
+                result = HW_DETECTORS[name](snapshot)
+                with self._known_lock:
+                    hw_update, flag_update = changed_results(self.known, result)
+                    self.known[0].update(hw_update)
+                    self.known[1].update(flag_update)
+                hw_changed.update(hw_update)
+                flags_changed.update(flag_update)
+        if hw_changed or flags_changed:
+            if self.cache is not None:
+                # The fingerprint does not always move on hotplug; keep the
+                # next warm start from showing the old devices. The key is
+                # taken from the tree that was read, not from the host's.
+                fingerprint = hardware_fingerprint(fingerprint_dirs(self.sysfs))
+                self.cache.update(fingerprint, hw_changed, flags_changed)
+            self.on_change(hw_changed, flags_changed)
+        return hw_changed, flags_changed
+
+
+def start_monitor(
+    on_change: Callable[[dict, dict], None],
+    sysfs: Path = SYSFS_ROOT,
+    initial: Optional[tuple[dict, dict]] = None,
+    cache: Optional[HardwareCache] = None,
+) -> Optional[HotplugMonitor]:
+    """Start monitoring, or return None when uevents or the sysfs inventory are unavailable."""
+    if read_inventory(sysfs) is None:
+        # Detection relies on lspci/lsusb here, which the monitor does not run
+        return None
+    try:
+        return HotplugMonitor(on_change, sysfs=sysfs, initial=initial, cache=cache).start()
+    except OSError as e:
+        log_exception("Hotplug monitor unavailable", e)
+        return None
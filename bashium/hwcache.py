@@ -0,0 +1,162 @@
+"""On-disk cache of the hardware panel and hardware flags, keyed by a cheap fingerprint."""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from bashium.aptsources import APT_SOURCES_DIR, source_files
+from bashium.hardware import detect_hardware
+from bashium.log import log_exception
+from bashium.paths import config_dir
+from bashium.sysfs import SYSFS_ROOT
+
+CACHE_VERSION = 3
+
+BOOT_ID_PATH = Path("/proc/sys/kernel/random/boot_id")
+
+
+def fingerprint_dirs(sysfs: Path = SYSFS_ROOT) -> tuple[Path, ...]:
+    return (sysfs / "bus" / "pci" / "devices", sysfs / "bus" / "usb" / "devices")
+
+
+FINGERPRINT_DIRS = fingerprint_dirs()
+
+
+def _stat_token(path: Path) -> str:
+    try:
+        return str(path.stat().st_mtime_ns)
+    except OSError:
+        return "-"
+
+
+def hardware_fingerprint(
+    dirs: Iterable[Path] = FINGERPRINT_DIRS,
+    boot_id_path: Path = BOOT_ID_PATH,
+    apt_files: Optional[Iterable[Path]] = None,
+) -> str:
+    """Hash of boot id, bus directory state and APT sources mtimes (stat calls only)."""
+    h = hashlib.sha256()
+    try:
+        h.update(boot_id_path.read_bytes())
+    except OSError:
+        h.update(b"-")
+
+    for d in dirs:
+        h.update(f"\0{d}\0{_stat_token(d)}\0".encode())
+        # sysfs does not bump directory mtimes reliably on hotplug, so the
+        # entry names are part of the key as well
+        try:
+            h.update("\0".join(sorted(os.listdir(d))).encode())
+        except OSError:
+            pass
+
+    for f in apt_files if apt_files is not None else [APT_SOURCES_DIR, *source_files()]:
+        h.update(f"\0{f}\0{_stat_token(f)}".encode())
+    return h.hexdigest()
+
+
+class HardwareCache:
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or config_dir() / "hwcache.json"
+
+    def load(self, fingerprint: str) -> Optional[tuple[dict, dict]]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception:
+            return None
+        if data.get("version") != CACHE_VERSION or data.get("fingerprint") != fingerprint:
+            return None
+        hw_info = data.get("hw_info")
+        hw_flags = data.get("hw_flags")
+        if not isinstance(hw_info, dict) or not isinstance(hw_flags, dict):
+            return None
+        return hw_info, hw_flags
+
+    def update(self, fingerprint: str, hw_update: dict, flag_update: dict) -> None:
+        """Merge partial results into the stored ones (whatever their fingerprint) and re-key them."""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception:
+            return
+        hw_info, hw_flags = data.get("hw_info"), data.get("hw_flags")
+        if data.get("version") != CACHE_VERSION or not isinstance(hw_info, dict) or not isinstance(hw_flags, dict):
+            # A partial panel would be worse than a cold start
+            return
+        self.store(fingerprint, {**hw_info, **hw_update}, {**hw_flags, **flag_update})
+
+    def store(self, fingerprint: str, hw_info: dict, hw_flags: dict) -> None:
+        data = {
+            "version": CACHE_VERSION,
+            "fingerprint": fingerprint,
+            "hw_info": hw_info,
+            "hw_flags": hw_flags,
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except Exception:
+            pass
+
+
+def detect_and_store(
+    cache: HardwareCache,
+    fingerprint: str,
+    on_result: Optional[Callable[[dict, dict], None]] = None,
+) -> tuple[dict, dict]:
+    hw_info, hw_flags = detect_hardware(on_result)
+    cache.store(fingerprint, hw_info, hw_flags)
+    return hw_info, hw_flags
+
+
+def changed_results(old: tuple[dict, dict], new: tuple[dict, dict]) -> tuple[dict, dict]:
+    """The entries of `new` (hw_info, hw_flags) that differ from `old`."""
+    return (
+        {k: v for k, v in new[0].items() if old[0].get(k) != v},
+        {k: v for k, v in new[1].items() if old[1].get(k) != v},
+    )
+
+
+def _revalidate(
+    cache: HardwareCache,
+    fingerprint: str,
+    cached: tuple[dict, dict],
+    on_change: Optional[Callable[[dict, dict], None]],
+) -> None:
+    # Only a machine that changed while the window was coming up is probed
+    # again; later changes reach the panel through the hotplug monitor
+    try:
+        current = hardware_fingerprint()
+        if current == fingerprint:
+            return
+        fresh = detect_hardware()
+        cache.store(current, *fresh)
+        hw_changed, flags_changed = changed_results(cached, fresh)
+        if (hw_changed or flags_changed) and on_change is not None:
+            on_change(hw_changed, flags_changed)
+    except Exception as e:
+        log_exception("Hardware cache revalidation failed", e)
+
+
+def revalidate_in_background(
+    cache: HardwareCache,
+    fingerprint: str,
+    cached: tuple[dict, dict],
+    on_change: Optional[Callable[[dict, dict], None]] = None,
+) -> threading.Thread:
+    """Re-detect if the fingerprint no longer matches `fingerprint`, the key `cached` was loaded with.
+
+    `on_change(hw_update, flag_update)` gets what differs from `cached`.
+    """
+    thread = threading.Thread(
+        target=_revalidate,
+        args=(cache, fingerprint, cached, on_change),
+        name="bashium-hwcache",
+        daemon=True,
+    )
+    thread.start()
+    return thread
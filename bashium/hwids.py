@@ -0,0 +1,220 @@
+"""Vendor and device names from pci.ids/usb.ids through a compiled, memory-mapped index.
+
+The text databases are several megabytes. They are compiled once into
+~/.cache/bashium/<name>.bin, which is rebuilt when the source file changes.
+Lookups binary-search the mapped tables, so a name costs a few page reads
+instead of a parse of the text file or an lspci run.
+
+Index layout (little endian):
+    header   magic, source mtime_ns, source size, vendor count, device count
+    vendors  (vendor id, name offset) sorted by id
+    devices  (vendor id << 16 | device id, name offset) sorted by key
+    strings  NUL-terminated UTF-8 names
+"""
+
+import gzip
+import mmap
+import os
+import re
+import struct
+import threading
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from bashium.paths import cache_dir
+from bashium.trace import span
+
+MAGIC = b"BSHIDS1\0"
+HEADER = struct.Struct("<8sQQII")
+ENTRY = struct.Struct("<II")
+
+SEARCH_DIRS = (
+    Path("/usr/share/misc"),
+    Path("/usr/share/hwdata"),
+    Path("/usr/share"),
+    Path("/var/lib/usbutils"),
+)
+
+_VENDOR_RE = re.compile(r"([0-9a-fA-F]{4})\s+(.+)")
+
+
+def find_source(name: str, dirs=SEARCH_DIRS) -> Optional[Path]:
+    """The first pci.ids/usb.ids (or .gz) in the usual locations."""
+    for directory in dirs:
+        for candidate in (directory / name, directory / f"{name}.gz"):
+            if candidate.is_file():
+                return candidate
+    return None
+
+
+def parse_ids(lines) -> Iterator[tuple[int, Optional[int], str]]:
+    """(vendor, None, name) and (vendor, device, name) entries of an ids file.
+
+    Subsystem lines are skipped; the vendor list ends at the first other
+    top-level section (device classes, HID usages, ...).
+    """
+    vendor: Optional[int] = None
+    for line in lines:
+        if not line or line[0] == "#" or not line.strip():
+            continue
+        if line[0] != "\t":
+            m = _VENDOR_RE.fullmatch(line.rstrip("\n"))
+            if m is None:
+                return
+            vendor = int(m.group(1), 16)
+            yield vendor, None, m.group(2).strip()
+        elif line[1:2] != "\t" and vendor is not None:
+            m = _VENDOR_RE.fullmatch(line[1:].rstrip("\n"))
+            if m is not None:
+                yield vendor, int(m.group(1), 16), m.group(2).strip()
+
+
+def compile_ids(source: Path, output: Path) -> None:
+    st = source.stat()
+    opener = gzip.open if source.name.endswith(".gz") else open
+    vendors: dict[int, str] = {}
+    devices: dict[int, str] = {}
+    with span("compile_ids", source=str(source)), opener(source, "rt", encoding="utf-8", errors="replace") as f:
+        for vendor, device, name in parse_ids(f):
+            if device is None:
+                vendors.setdefault(vendor, name)
+            else:
+                devices.setdefault(vendor << 16 | device, name)
+
+    strings = bytearray()
+    offsets: dict[str, int] = {}
+
+    def intern(name: str) -> int:
+        offset = offsets.get(name)
+        if offset is None:
+            offset = offsets[name] = len(strings)
+            strings.extend(name.encode("utf-8") + b"\0")
+        return offset
+
+    parts = [HEADER.pack(MAGIC, st.st_mtime_ns, st.st_size, len(vendors), len(devices))]
+    parts.extend(ENTRY.pack(k, intern(vendors[k])) for k in sorted(vendors))
+    parts.extend(ENTRY.pack(k, intern(devices[k])) for k in sorted(devices))
+    parts.append(bytes(strings))
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(f".{output.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(b"".join(parts))
+    os.replace(tmp, output)
+
+
+class IdIndex:
+    """A compiled index, mapped read-only."""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            self._map.close()
+            raise ValueError(f"{path}: truncated")
+        magic, self.source_mtime, self.source_size, self._vendors, self._devices = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path}: not an id index")
+        self._vendor_base = HEADER.size
+        self._device_base = self._vendor_base + self._vendors * ENTRY.size
+        self._strings = self._device_base + self._devices * ENTRY.size
+        if self._strings > len(self._map):
+            self._map.close()
+            raise ValueError(f"{path}: truncated")
+
+    def matches(self, source: Path) -> bool:
+        try:
+            st = source.stat()
+        except OSError:
+            return False
+        return (st.st_mtime_ns, st.st_size) == (self.source_mtime, self.source_size)
+
+    def _search(self, base: int, count: int, key: int) -> Optional[str]:
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k, offset = ENTRY.unpack_from(self._map, base + mid * ENTRY.size)
+            if k < key:
+                lo = mid + 1
+            elif k > key:
+                hi = mid
+            else:
+                start = self._strings + offset
+                return self._map[start:self._map.find(b"\0", start)].decode("utf-8", "replace")
+        return None
+
+    def vendor(self, vendor: Union[int, str]) -> Optional[str]:
+        return self._search(self._vendor_base, self._vendors, _id(vendor))
+
+    def device(self, vendor: Union[int, str], device: Union[int, str]) -> Optional[str]:
+        return self._search(self._device_base, self._devices, _id(vendor) << 16 | _id(device))
+
+    def name(self, vendor: Union[int, str], device: Union[int, str]) -> Optional[str]:
+        """Vendor and device name as lspci prints them; None if the vendor is unknown."""
+        vendor_name = self.vendor(vendor)
+        if vendor_name is None:
+            return None
+        device_name = self.device(vendor, device)
+        return f"{vendor_name} {device_name}" if device_name else vendor_name
+
+    def close(self) -> None:
+        self._map.close()
+
+
+def _id(value: Union[int, str]) -> int:
+    if isinstance(value, int):
+        return value
+    value = value.lower()
+    try:
+        return int(value[2:] if value.startswith("0x") else value, 16)
+    except ValueError:
+        # Matches nothing
+        return -1
+
+
+_indexes: dict[str, IdIndex] = {}
+_lock = threading.Lock()
+
+
+def load_index(name: str, source: Optional[Path] = None, cache: Optional[Path] = None) -> Optional[IdIndex]:
+    """Index of `name` ("pci.ids" or "usb.ids"), compiled first if missing or stale.
+
+    None when the system has no such database.
+    """
+    source = source or find_source(name)
+    if source is None:
+        return None
+    path = cache or cache_dir() / f"{name}.bin"
+    with _lock:
+        index = _indexes.get(str(path))
+        if index is not None and index.matches(source):
+            return index
+        try:
+            index = IdIndex(path)
+            if not index.matches(source):
+                index.close()
+                index = None
+        except (OSError, ValueError):
+            index = None
+        if index is None:
+            try:
+                compile_ids(source, path)
+                index = IdIndex(path)
+            except (OSError, ValueError):
+                return None
+        _indexes[str(path)] = index
+        return index
+
+
+def pci_index() -> Optional[IdIndex]:
+    return load_index("pci.ids")
+
+
+def usb_index() -> Optional[IdIndex]:
+    return load_index("usb.ids")
+
+
+def device_name(bus: str, vendor: str, device: str) -> Optional[str]:
+    """Readable name of a "pci" or "usb" device, or None without a database entry."""
+    index = pci_index() if bus == "pci" else usb_index() if bus == "usb" else None
+    return index.name(vendor, device) if index is not None else None
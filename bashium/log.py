@@ -0,0 +1,308 @@
+"""Structured event log: exceptions and module runs as JSON lines.
+
+Records are queued and written in batches by one background thread to
+~/.local/state/bashium/events.jsonl. When that file reaches MAX_BYTES it is
+gzip-compressed into a segment, and index.json records each segment's time
+range and the modules it mentions, so history queries only open the
+segments that can match.
+"""
+
+import atexit
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Iterator, Optional
+
+from bashium.paths import state_dir
+
+MAX_BYTES = 1024 * 1024
+KEEP_SEGMENTS = 20
+# Records arriving within this window are written together
+BATCH_DELAY = 0.2
+INDEX_VERSION = 1
+
+CURRENT = "events.jsonl"
+INDEX = "index.json"
+SEGMENT_PREFIX = "events-"
+SEGMENT_SUFFIX = ".jsonl.gz"
+
+
+def read_events(path: Path) -> Iterator[dict]:
+    """Records of a current or compressed log file; damaged lines are skipped."""
+    opener = gzip.open if path.name.endswith(".gz") else open
+    try:
+        with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict):
+                    yield record
+    except (OSError, EOFError):
+        return
+
+
+def summarize(records: Iterator[dict]) -> dict:
+    """Index entry of one segment: time range and run counts per module."""
+    first = last = None
+    modules: dict[str, int] = {}
+    for record in records:
+        ts = record.get("ts")
+        if isinstance(ts, (int, float)):
+            first = ts if first is None else min(first, ts)
+            last = ts if last is None else max(last, ts)
+        if record.get("event") == "run":
+            name = str(record.get("module"))
+            modules[name] = modules.get(name, 0) + 1
+    return {"first": first, "last": last, "modules": modules}
+
+
+class EventLog:
+    def __init__(self, root: Optional[Path] = None, max_bytes: int = MAX_BYTES, keep: int = KEEP_SEGMENTS):
+        self.root = root or state_dir()
+        self.path = self.root / CURRENT
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        # Writer-thread state
+        self._fd: Optional[int] = None
+        self._size = 0
+
+    def write(self, event: str, **fields) -> None:
+        self._queue.put({"ts": time.time(), "event": event, **fields})
+        self._ensure_writer()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until everything queued so far is on disk."""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _ensure_writer(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._run, name="bashium-log", daemon=True)
+                thread.start()
+                self._thread = thread
+
+    def _run(self) -> None:
+        while True:
+            batch: list[dict] = []
+            waiters: list[threading.Event] = []
+            item = self._queue.get()
+            deadline = time.monotonic() + BATCH_DELAY
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                remaining = deadline - time.monotonic()
+                try:
+                    if waiters or remaining <= 0:
+                        # A flush request writes right away
+                        item = self._queue.get_nowait()
+                    else:
+                        item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except Exception:
+                    # Nowhere left to report it; drop the batch
+                    self._close()
+            for waiter in waiters:
+                waiter.set()
+
+    def _open(self) -> int:
+        if self._fd is not None:
+            try:
+                # Another process rotated the file away: follow it
+                if os.fstat(self._fd).st_ino == os.stat(self.path).st_ino:
+                    return self._fd
+            except OSError:
+                pass
+            self._close()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC, 0o600)
+        self._size = os.fstat(self._fd).st_size
+        return self._fd
+
+    def _close(self) -> None:
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+    def _write_batch(self, batch: list[dict]) -> None:
+        data = "".join(json.dumps(r, default=str, separators=(",", ":")) + "\n" for r in batch).encode("utf-8")
+        fd = self._open()
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        self._size += len(data)
+        if self._size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        self._close()
+        now = time.time()
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(now)) + f"{int(now * 1000) % 1000:03d}"
+        name = f"{SEGMENT_PREFIX}{stamp}-{os.getpid()}{SEGMENT_SUFFIX}"
+        raw = self.root / f".{name}.raw"
+        try:
+            os.replace(self.path, raw)
+        except OSError:
+            return
+        tmp = self.root / f".{name}.tmp"
+        with open(raw, "rb") as src, gzip.open(tmp, "wb") as dst:
+            while chunk := src.read(1024 * 1024):
+                dst.write(chunk)
+        os.replace(tmp, self.root / name)
+        entry = summarize(read_events(raw))
+        raw.unlink()
+
+        index = self.load_index()
+        index[name] = entry
+        for old in sorted(index)[:-self.keep]:
+            try:
+                (self.root / old).unlink()
+            except OSError:
+                pass
+            del index[old]
+        self._save_index(index)
+
+    def load_index(self) -> dict[str, dict]:
+        try:
+            data = json.loads((self.root / INDEX).read_text(encoding="utf-8"))
+        except Exception:
+            data = {}
+        segments = data.get("segments") if data.get("version") == INDEX_VERSION else None
+        index = segments if isinstance(segments, dict) else {}
+        # Segments written by a process that died before updating the index
+        try:
+            for name in os.listdir(self.root):
+                if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX) and name not in index:
+                    index[name] = None
+        except OSError:
+            pass
+        return index
+
+    def _save_index(self, index: dict) -> None:
+        path = self.root / INDEX
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        segments = {k: v for k, v in index.items() if v is not None}
+        tmp.write_text(json.dumps({"version": INDEX_VERSION, "segments": segments}), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def query_runs(
+        self,
+        module: Optional[str] = None,
+        since: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> list[dict]:
+        """Run records, newest first, optionally for one module and/or after a timestamp."""
+        self.flush()
+
+        def matching(path: Path) -> list[dict]:
+            runs = [
+                r for r in read_events(path)
+                if r.get("event") == "run"
+                and (module is None or r.get("module") == module)
+                and (since is None or r.get("ts", 0) >= since)
+            ]
+            runs.reverse()
+            return runs
+
+        results = matching(self.path)
+        for name, entry in sorted(self.load_index().items(), reverse=True):
+            if limit is not None and len(results) >= limit:
+                break
+            if entry is not None:
+                if module is not None and module not in entry.get("modules", {}):
+                    continue
+                if since is not None and (entry.get("last") or 0) < since:
+                    # Segments are in time order: nothing older can match
+                    break
+            results.extend(matching(self.root / name))
+        results.sort(key=lambda r: r.get("ts", 0), reverse=True)
+        return results[:limit] if limit is not None else results
+
+
+_log: Optional[EventLog] = None
+_log_lock = threading.Lock()
+
+
+def event_log() -> EventLog:
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = EventLog()
+    return _log
+
+
+def _forget_after_fork() -> None:
+    # The writer thread does not survive fork(); a child starts its own
+    global _log, _log_lock
+    _log = None
+    _log_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_after_fork)
+atexit.register(lambda: _log is not None and _log.flush())
+
+
+def log_exception(context: str, exc: BaseException) -> None:
+    try:
+        event_log().write(
+            "exception",
+            context=context,
+            error=f"{type(exc).__name__}: {exc}",
+            traceback="".join(traceback.format_exception(type(exc), exc, exc.__traceback__)),
+        )
+    except Exception:
+        return
+
+
+def format_run(run: dict) -> str:
+    """One line of `bashium history`."""
+    from bashium.aptplan import format_size
+
+    start = run.get("start") or run.get("ts") or 0
+    duration = (run.get("end") or start) - start
+    code = run.get("returncode")
+    status = "OK" if code == 0 else f"exit {code}"
+    when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start))
+    return (f"{when}  {str(run.get('module')):<24} {status:<9} {duration:7.1f}s  "
+            f"{format_size(run.get('output_bytes') or 0):>9}  {' '.join(run.get('argv') or [])}")
+
+
+def log_run(module: str, argv: list[str], start: float, end: float, returncode: Optional[int], output_bytes: int) -> None:
+    """One module script execution, for `bashium history`."""
+    try:
+        event_log().write(
+            "run",
+            module=module,
+            argv=argv,
+            start=start,
+            end=end,
+            returncode=returncode,
+            output_bytes=output_bytes,
+        )
+    except Exception:
+        return
@@ -0,0 +1,240 @@
+"""Discovery of declarative module manifests (`*.module.json`) with a cached index."""
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+from bashium.hardware import HW_PREDICATES
+from bashium.log import log_exception
+from bashium.paths import cache_dir
+from bashium.trace import span
+
+MANIFEST_SUFFIX = ".module.json"
+INDEX_VERSION = 1
+
+# Extra module directories, separated like PATH
+MODULE_PATH_ENV = "BASHIUM_MODULE_PATH"
+
+PROBING_TEXT = "probing…"
+
+
+class ManifestError(ValueError):
+    pass
+
+
+class _Defaults(dict):
+    def __missing__(self, key):
+        return "Unknown"
+
+
+@dataclass(frozen=True)
+class ModuleManifest:
+    name: str
+    script: Path
+    description: str
+    category: str = ""
+    # Key of the hardware flag that must be set for the module to be enabled
+    hardware: Optional[str] = None
+    # Shown instead of `description` when the hardware is not present
+    description_missing: Optional[str] = None
+    # None means "derive from the apt install lines of the scripts"
+    packages: Optional[tuple[str, ...]] = None
+    depends: tuple[str, ...] = ()
+    # Whether the module takes the dpkg lock; None means "if it installs packages"
+    apt: Optional[bool] = None
+    # Offer a browsable catalogue of the archives next to the script (Xfce Look)
+    catalogue: bool = False
+    # Files and directories the module changes; a change invalidates its applied record
+    watch: tuple[Path, ...] = ()
+    # Download the packages in the background while the module is selected
+    prefetch: bool = False
+    order: int = 100
+    source: Optional[Path] = None
+
+    def describe(self, hw_info: dict, detected: Optional[bool] = True) -> str:
+        if self.hardware and detected is None:
+            return f"Detecting hardware ({PROBING_TEXT})"
+        text = self.description
+        if self.hardware and not detected and self.description_missing is not None:
+            text = self.description_missing
+        # Descriptions may reference hardware panel values, e.g. "{wifi_text}"
+        return text.format_map(_Defaults(hw_info))
+
+
+def _str_list(data: dict, key: str) -> tuple[str, ...]:
+    value = data.get(key, [])
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ManifestError(f"'{key}' must be a list of strings")
+    return tuple(value)
+
+
+def manifest_from_dict(data: dict, source: Path) -> ModuleManifest:
+    for key in ("name", "description", "script"):
+        if not isinstance(data.get(key), str) or not data[key]:
+            raise ManifestError(f"{source}: missing '{key}'")
+
+    description_missing = data.get("description_missing")
+    if description_missing is not None and not isinstance(description_missing, str):
+        raise ManifestError(f"{source}: 'description_missing' must be a string")
+    for key, text in (("description", data["description"]), ("description_missing", description_missing)):
+        if text is None:
+            continue
+        # describe() fills in hardware panel values; bad braces would fail there, at startup
+        try:
+            text.format_map(_Defaults())
+        except (ValueError, IndexError, KeyError, AttributeError, TypeError) as e:
+            raise ManifestError(f"{source}: invalid placeholder in '{key}': {e} (write literal braces as {{{{ }}}})")
+
+    hardware = data.get("hardware")
+    if hardware is not None and hardware not in HW_PREDICATES:
+        raise ManifestError(f"{source}: unknown hardware predicate '{hardware}'")
+
+    try:
+        packages = _str_list(data, "packages") if "packages" in data else None
+        depends = _str_list(data, "depends")
+        watch = _str_list(data, "watch")
+    except ManifestError as e:
+        raise ManifestError(f"{source}: {e}")
+
+    apt = data.get("apt")
+    if apt is not None and not isinstance(apt, bool):
+        raise ManifestError(f"{source}: 'apt' must be true or false")
+
+    return ModuleManifest(
+        name=data["name"],
+        script=(source.parent / data["script"]).resolve(),
+        description=data["description"],
+        category=str(data.get("category", "")),
+        hardware=hardware,
+        description_missing=description_missing,
+        packages=packages,
+        depends=depends,
+        apt=apt,
+        catalogue=bool(data.get("catalogue", False)),
+        # Relative paths are relative to the manifest, e.g. the archive folders
+        watch=tuple(source.parent / Path(w).expanduser() for w in watch),
+        prefetch=bool(data.get("prefetch", False)),
+        order=int(data.get("order", 100)),
+        source=source,
+    )
+
+
+def module_dirs(base_dir: Path) -> list[Path]:
+    """Top-level directories of the checkout plus BASHIUM_MODULE_PATH entries."""
+    dirs = []
+    try:
+        dirs.extend(
+            base_dir / name
+            for name in sorted(os.listdir(base_dir))
+            if not name.startswith((".", "_")) and (base_dir / name).is_dir()
+        )
+    except OSError:
+        pass
+    for extra in os.environ.get(MODULE_PATH_ENV, "").split(os.pathsep):
+        if extra:
+            dirs.append(Path(extra).expanduser())
+    return list(dict.fromkeys(d.resolve() for d in dirs))
+
+
+class ManifestIndex:
+    """Parsed manifests per directory, reused while the directory mtime is unchanged.
+
+    Manifest files inside an unchanged directory are only stat()ed, and
+    re-parsed when their own mtime moved (in-place edits).
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or cache_dir() / "modules.json"
+        self.dirs: dict[str, dict] = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception:
+            return
+        if data.get("version") == INDEX_VERSION and isinstance(data.get("dirs"), dict):
+            self.dirs = data["dirs"]
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"version": INDEX_VERSION, "dirs": self.dirs}), encoding="utf-8")
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except Exception:
+            pass
+
+    def _read_manifest(self, path: Path) -> Optional[dict]:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            manifest_from_dict(data, path)
+            return data
+        except Exception as e:
+            log_exception(f"Invalid module manifest {path}", e)
+            return None
+
+    def _scan_dir(self, directory: Path) -> dict[str, dict]:
+        try:
+            dir_mtime = directory.stat().st_mtime_ns
+        except OSError:
+            if self.dirs.pop(str(directory), None) is not None:
+                self.dirty = True
+            return {}
+
+        entry = self.dirs.get(str(directory))
+        if entry is not None and entry.get("mtime") == dir_mtime:
+            names = list(entry["files"])
+        else:
+            try:
+                names = sorted(n for n in os.listdir(directory) if n.endswith(MANIFEST_SUFFIX))
+            except OSError:
+                names = []
+            entry = {"mtime": dir_mtime, "files": {n: f for n, f in (entry or {}).get("files", {}).items() if n in names}}
+            self.dirs[str(directory)] = entry
+            self.dirty = True
+
+        files = entry["files"]
+        for name in names:
+            path = directory / name
+            try:
+                mtime = path.stat().st_mtime_ns
+            except OSError:
+                files.pop(name, None)
+                self.dirty = True
+                continue
+            cached = files.get(name)
+            if cached is None or cached.get("mtime") != mtime:
+                files[name] = {"mtime": mtime, "data": self._read_manifest(path)}
+                self.dirty = True
+        return files
+
+    def manifests(self, dirs: Iterable[Path]) -> list[ModuleManifest]:
+        found: dict[str, ModuleManifest] = {}
+        for directory in dirs:
+            for name, cached in self._scan_dir(directory).items():
+                if cached.get("data") is None:
+                    continue
+                try:
+                    manifest = manifest_from_dict(cached["data"], directory / name)
+                except ManifestError as e:
+                    # Cached by a version with fewer checks
+                    log_exception(f"Invalid module manifest {directory / name}", e)
+                    continue
+                # First directory wins, so BASHIUM_MODULE_PATH cannot shadow built-ins
+                found.setdefault(manifest.name, manifest)
+        return sorted(found.values(), key=lambda m: (m.order, m.name))
+
+
+def discover_manifests(base_dir: Path, index_path: Optional[Path] = None) -> list[ModuleManifest]:
+    with span("discover_manifests"):
+        index = ManifestIndex(index_path)
+        manifests = index.manifests(module_dirs(base_dir))
+        index.save()
+    return manifests
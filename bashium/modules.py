@@ -0,0 +1,186 @@
+import re
+import shlex
+import shutil
+import subprocess
+from functools import cached_property
+from pathlib import Path
+from typing import Optional
+
+from bashium.aptplan import collect_packages, conditional_packages
+from bashium.manifests import ModuleManifest, discover_manifests
+from bashium.trace import spawn_span
+
+# Sibling scripts referenced from an entry script, e.g. "./firmware.sh" or "(codecs.sh)"
+_SCRIPT_REF_RE = re.compile(r"(?<![\w/.-])(?:\./)?([\w.-]+\.sh)\b")
+
+
+class ScriptModule:
+    def __init__(
+        self,
+        name: str,
+        script_path: Path,
+        description: str,
+        enabled: Optional[bool] = True,
+        manifest: Optional[ModuleManifest] = None,
+    ):
+        self.name = name
+        self.script_path = script_path
+        self.description = description
+        # None while hardware detection for this module is still running
+        self.enabled = enabled
+        self.manifest = manifest
+
+    @classmethod
+    def from_manifest(cls, manifest: ModuleManifest, hw_info: dict, hw_flags: dict) -> "ScriptModule":
+        enabled: Optional[bool] = True
+        if manifest.hardware:
+            flag = hw_flags.get(manifest.hardware)
+            enabled = None if flag is None else bool(flag)
+        return cls(manifest.name, manifest.script, manifest.describe(hw_info, enabled), enabled, manifest)
+
+    @property
+    def hardware(self) -> Optional[str]:
+        return self.manifest.hardware if self.manifest else None
+
+    @property
+    def category(self) -> str:
+        return self.manifest.category if self.manifest else ""
+
+    @property
+    def depends(self) -> tuple[str, ...]:
+        return self.manifest.depends if self.manifest else ()
+
+    def apply_hardware(self, hw_info: dict, hw_flags: dict) -> bool:
+        """Update enabled state and description; True if this module depends on the flags."""
+        if not self.hardware or self.hardware not in hw_flags:
+            return False
+        self.enabled = bool(hw_flags[self.hardware])
+        self.description = self.manifest.describe(hw_info, self.enabled)
+        return True
+
+    @property
+    def entry_script(self) -> Path:
+        return self.script_path / "install.sh" if self.script_path.is_dir() else self.script_path
+
+    @cached_property
+    def scripts(self) -> list[Path]:
+        """The entry script and the sibling scripts it runs."""
+        entry = self.entry_script
+        try:
+            text = entry.read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            return []
+        scripts = [entry]
+        for name in dict.fromkeys(_SCRIPT_REF_RE.findall(text)):
+            sibling = entry.parent / name
+            if sibling != entry and sibling.is_file():
+                scripts.append(sibling)
+        return scripts
+
+    @cached_property
+    def packages(self) -> list[str]:
+        """APT packages installed by the entry script and the sibling scripts it runs."""
+        if self.manifest is not None and self.manifest.packages is not None:
+            return list(self.manifest.packages)
+        return collect_packages(self.scripts)
+
+    @cached_property
+    def optional_packages(self) -> list[str]:
+        """Packages installed only on some answers or hardware, e.g. one vendor's firmware."""
+        if self.manifest is not None and self.manifest.packages is not None:
+            return []
+        optional = conditional_packages(self.scripts)
+        return [p for p in self.packages if p in optional]
+
+    @property
+    def required_packages(self) -> list[str]:
+        optional = set(self.optional_packages)
+        return [p for p in self.packages if p not in optional]
+
+    @property
+    def prefetch(self) -> bool:
+        return bool(self.manifest and self.manifest.prefetch and self.packages)
+
+    @property
+    def uses_apt(self) -> bool:
+        """True if running the module needs the dpkg lock."""
+        if self.manifest is not None and self.manifest.apt is not None:
+            return self.manifest.apt
+        return bool(self.packages)
+
+    def command(self) -> tuple[list[str], Path]:
+        """argv and working directory for running the module in-app."""
+        entry = self.entry_script
+        return ["bash", f"./{entry.name}"], entry.parent
+
+    def _build_shell_command(self) -> str:
+        if self.script_path.is_dir():
+            script_dir = shlex.quote(str(self.script_path))
+            return f"cd {script_dir} && ./install.sh; exec bash"
+
+        script_dir = shlex.quote(str(self.script_path.parent))
+        script_name = shlex.quote(str(self.script_path.name))
+        return f"cd {script_dir} && bash ./{script_name}; exec bash"
+
+    def _find_terminal(self) -> tuple[list[str] | None, str]:
+        shell_cmd = self._build_shell_command()
+        human_cmd = f"bash -lc {shlex.quote(shell_cmd)}"
+
+        candidates = [
+            "x-terminal-emulator",
+            "gnome-terminal",
+            "kgx",
+            "konsole",
+            "xfce4-terminal",
+            "mate-terminal",
+            "tilix",
+            "alacritty",
+            "kitty",
+            "lxterminal",
+            "xterm",
+        ]
+
+        term = None
+        for c in candidates:
+            if shutil.which(c):
+                term = c
+                break
+
+        if term is None:
+            return None, human_cmd
+
+        # Terminal-specific invocation
+        if term in {"gnome-terminal", "mate-terminal"}:
+            return [term, "--", "bash", "-lc", shell_cmd], human_cmd
+        if term == "kgx":
+            return [term, "--", "bash", "-lc", shell_cmd], human_cmd
+        if term == "konsole":
+            return [term, "-e", "bash", "-lc", shell_cmd], human_cmd
+        if term == "xfce4-terminal":
+            return [term, "--command", f"bash -lc {shlex.quote(shell_cmd)}"], human_cmd
+        if term == "tilix":
+            return [term, "-e", f"bash -lc {shlex.quote(shell_cmd)}"], human_cmd
+        if term in {"alacritty", "kitty", "lxterminal", "xterm", "x-terminal-emulator"}:
+            return [term, "-e", "bash", "-lc", shell_cmd], human_cmd
+
+        return [term, "-e", "bash", "-lc", shell_cmd], human_cmd
+
+    def run(self) -> None:
+        argv, human_cmd = self._find_terminal()
+        if argv is None:
+            raise RuntimeError(
+                "No supported terminal emulator found. "
+                "Install one of: gnome-terminal, konsole, xfce4-terminal, xterm. "
+                f"You can run this manually: {human_cmd}"
+            )
+
+        try:
+            with spawn_span(argv):
+                subprocess.Popen(argv)
+        except Exception as e:
+            raise RuntimeError(f"Failed to launch terminal: {e}. Command: {' '.join(argv)}")
+
+
+def build_modules(base_dir: Path, hw_info: dict, hw_flags: dict) -> list[ScriptModule]:
+    """Modules from the discovered manifests; hardware modules stay pending until their flag is known."""
+    return [ScriptModule.from_manifest(m, hw_info, hw_flags) for m in discover_manifests(base_dir)]
@@ -0,0 +1,280 @@
+"""Download the packages of selected modules while the user is still deciding.
+
+Ticking a card, or opening its confirm dialog, queues the module's packages
+for `apt-get --download-only` into ~/.cache/bashium/archives. `apt-plan
+--execute` copies the downloaded files into APT's own cache right before it
+installs, so the install mostly unpacks. Packages shared by several modules
+are downloaded once; unticking a module cancels its download.
+
+apt-get runs as the user: nothing is installed, so the dpkg lock is skipped
+and APT keeps its package cache in memory.
+"""
+
+import os
+import re
+import signal
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Mapping, Optional, Sequence
+
+from bashium.aptplan import APT_GET, apt_env
+from bashium.log import log_exception
+from bashium.paths import cache_dir
+from bashium.trace import spawn_span
+
+QUEUED = "queued"
+DOWNLOADING = "downloading"
+DONE = "done"
+FAILED = "failed"
+
+APT_ARCHIVES = Path("/var/cache/apt/archives")
+
+# Downloaded files nobody installed are removed after a week
+MAX_AGE = 7 * 86400
+
+# "dlstatus:<item>:<percent>:<message>" from APT::Status-Fd
+_DLSTATUS_RE = re.compile(r"dlstatus:\d+:([\d.]+):")
+
+
+def archives_dir() -> Path:
+    return cache_dir() / "archives"
+
+
+def download_command(
+    packages: Sequence[str], archives: Path, apt_get: str = APT_GET, options: Sequence[str] = ()
+) -> list[str]:
+    return [
+        apt_get,
+        "install",
+        "--download-only",
+        "-y",
+        "-q",
+        "-o", f"Dir::Cache::archives={archives}",
+        # Nothing is unpacked, so the dpkg lock (and with it root) is not needed
+        "-o", "Debug::NoLocking=1",
+        # Machine-readable progress lines on stdout
+        "-o", "APT::Status-Fd=1",
+        *options,
+        *packages,
+    ]
+
+
+@dataclass
+class PrefetchStatus:
+    state: str = QUEUED
+    percent: float = 0.0
+    error: str = ""
+
+    def text(self) -> str:
+        if self.state == DOWNLOADING:
+            return f"⇣ downloading {self.percent:.0f}%"
+        if self.state == DONE:
+            return "⇣ downloaded"
+        if self.state == FAILED:
+            return "⇣ download failed"
+        return "⇣ download queued"
+
+
+class Prefetcher:
+    """One background apt-get at a time for the packages of the wanted modules.
+
+    `on_change(name)` is called from the worker thread whenever the status of
+    module `name` changes, including when it is no longer wanted.
+    """
+
+    def __init__(
+        self,
+        on_change: Optional[Callable[[str], None]] = None,
+        archives: Optional[Path] = None,
+        apt_get: str = APT_GET,
+        options: Sequence[str] = (),
+    ):
+        self.on_change = on_change or (lambda name: None)
+        self.archives = archives or archives_dir()
+        self.apt_get = apt_get
+        # Extra apt-get options, e.g. another Dir::Etc::sourcelist
+        self.options = tuple(options)
+        # module name -> packages, in the order the modules were wanted
+        self._wanted: dict[str, tuple[str, ...]] = {}
+        self._status: dict[str, PrefetchStatus] = {}
+        # Packages downloaded (or already installed) in this session
+        self._done: set[str] = set()
+        self._current: Optional[str] = None
+        self._proc: Optional[subprocess.Popen] = None
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def status(self, name: str) -> Optional[PrefetchStatus]:
+        with self._cond:
+            return self._status.get(name)
+
+    def update(self, wanted: Mapping[str, Sequence[str]]) -> None:
+        """Download the packages of `wanted` (module name -> packages); drop everything else."""
+        changed = []
+        with self._cond:
+            if self._closed:
+                return
+            old = self._wanted
+            self._wanted = {name: tuple(packages) for name, packages in wanted.items() if packages}
+            for name in old.keys() - self._wanted.keys():
+                del self._status[name]
+                changed.append(name)
+            for name, packages in self._wanted.items():
+                if name not in self._status:
+                    done = self._done.issuperset(packages)
+                    self._status[name] = PrefetchStatus(DONE if done else QUEUED, 100.0 if done else 0.0)
+                    changed.append(name)
+            if self._current is not None and self._current not in self._wanted:
+                self._kill()
+            if self._thread is None and any(s.state == QUEUED for s in self._status.values()):
+                self._thread = threading.Thread(target=self._run, name="bashium-prefetch", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        for name in changed:
+            self.on_change(name)
+
+    def cancel(self) -> None:
+        self.update({})
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._kill()
+            self._cond.notify()
+
+    def _kill(self) -> None:
+        if self._proc is not None and self._proc.poll() is None:
+            try:
+                os.killpg(self._proc.pid, signal.SIGTERM)
+            except OSError:
+                pass
+
+    def _next(self) -> Optional[tuple[str, tuple[str, ...]]]:
+        for name, packages in self._wanted.items():
+            if self._status[name].state == QUEUED:
+                return name, tuple(p for p in packages if p not in self._done)
+        return None
+
+    def _run(self) -> None:
+        prune(self.archives)
+        while True:
+            with self._cond:
+                while not self._closed and (job := self._next()) is None:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                name, packages = job
+                status = self._status[name] = PrefetchStatus(DOWNLOADING)
+                self._current = name
+            self.on_change(name)
+
+            try:
+                error = self._download(name, packages) if packages else ""
+            except Exception as e:
+                log_exception(f"Prefetch for {name} failed", e)
+                error = str(e)
+
+            with self._cond:
+                self._current = None
+                self._proc = None
+                if self._status.get(name) is not status:
+                    # Cancelled, or dropped and wanted again (queued afresh)
+                    continue
+                if error:
+                    status.state, status.error = FAILED, error
+                else:
+                    status.state, status.percent = DONE, 100.0
+                    self._done.update(packages)
+            self.on_change(name)
+
+    def _download(self, name: str, packages: tuple[str, ...]) -> str:
+        """Run apt-get for one module; returns an error message, empty on success."""
+        (self.archives / "partial").mkdir(parents=True, exist_ok=True)
+        argv = download_command(packages, self.archives, self.apt_get, self.options)
+        with spawn_span(argv):
+            proc = subprocess.Popen(
+                argv,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                env=apt_env(),
+                start_new_session=True,
+            )
+            with self._cond:
+                self._proc = proc
+                if self._closed or name not in self._wanted:
+                    self._kill()
+
+            errors = []
+            shown = 0
+            for line in proc.stdout:
+                m = _DLSTATUS_RE.match(line)
+                if m:
+                    with self._cond:
+                        status = self._status.get(name)
+                        if status is None:
+                            continue
+                        status.percent = min(float(m.group(1)), 100.0)
+                    # One update per whole percent is plenty for the card
+                    if int(status.percent) != shown:
+                        shown = int(status.percent)
+                        self.on_change(name)
+                elif line.startswith("E: "):
+                    errors.append(line[3:].strip())
+            proc.stdout.close()
+            returncode = proc.wait()
+        if returncode == 0:
+            return ""
+        return errors[-1] if errors else f"{self.apt_get} exited with status {returncode}"
+
+
+def prefetched_files(archives: Optional[Path] = None) -> list[Path]:
+    try:
+        return sorted((archives or archives_dir()).glob("*.deb"))
+    except OSError:
+        return []
+
+
+def prune(archives: Path, max_age: float = MAX_AGE) -> None:
+    cutoff = time.time() - max_age
+    for path in prefetched_files(archives):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+
+def seed_archives(archives: Optional[Path] = None, target: Path = APT_ARCHIVES) -> list[Path]:
+    """Copy the downloaded files into APT's cache; returns the files copied.
+
+    APT checks the size and hashes of cached files against the package lists,
+    so a stale or foreign file is downloaded again rather than installed.
+    """
+    files = prefetched_files(archives)
+    if not files:
+        return []
+    argv = ["cp", "--no-clobber", "--preserve=timestamps", "-t", str(target), *map(str, files)]
+    if os.geteuid() != 0:
+        argv.insert(0, "sudo")
+    try:
+        with spawn_span(argv):
+            ok = subprocess.run(argv, check=False).returncode == 0
+    except Exception as e:
+        log_exception("Failed to copy prefetched packages", e)
+        return []
+    return files if ok else []
+
+
+def discard(files: Sequence[Path]) -> None:
+    """Remove prefetched files once APT has installed them from its own cache."""
+    for path in files:
+        try:
+            path.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,281 @@
+"""Unattended runs of a module selection described by a JSON profile (`bashium apply`).
+
+The module scripts read their answers from the environment when
+BASHIUM_UNATTENDED is set: y/n questions from the BASHIUM_ANSWERS file
+(tab-separated answer and glob pattern, first match wins) or
+BASHIUM_DEFAULT_ANSWER, and usernames from BASHIUM_USERNAME. A question
+without an answer makes the script exit with NO_ANSWER_EXIT instead of
+waiting for a keyboard.
+"""
+
+import codecs
+import json
+import os
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from bashium.applied import AppliedStore, inputs_digest, mark_satisfied
+from bashium.dpkg import load_dpkg_index
+from bashium.log import log_run
+from bashium.runner import AnsiStripper
+from bashium.scheduler import MAX_PARALLEL, Job, JobScheduler, build_jobs
+from bashium.trace import spawn_span
+
+UNATTENDED_ENV = "BASHIUM_UNATTENDED"
+ANSWERS_ENV = "BASHIUM_ANSWERS"
+DEFAULT_ANSWER_ENV = "BASHIUM_DEFAULT_ANSWER"
+USERNAME_ENV = "BASHIUM_USERNAME"
+
+# Exit code of a script that reached a prompt it has no answer for
+NO_ANSWER_EXIT = 3
+
+_ANSWERS = {"y": "y", "yes": "y", "n": "n", "no": "n"}
+
+
+class ProfileError(ValueError):
+    pass
+
+
+@dataclass
+class Profile:
+    modules: tuple[str, ...]
+    username: Optional[str] = None
+    # (glob pattern, "y" or "n") in profile order; matched against the question text
+    answers: tuple[tuple[str, str], ...] = ()
+    default_answer: Optional[str] = None
+    env: dict[str, str] = field(default_factory=dict)
+    # Seconds before a module is stopped; None waits forever
+    timeout: Optional[float] = None
+    parallel: int = MAX_PARALLEL
+    source: Optional[Path] = None
+
+
+def _answer(value, where: str) -> str:
+    if isinstance(value, bool):
+        return "y" if value else "n"
+    if isinstance(value, str) and value.strip().lower() in _ANSWERS:
+        return _ANSWERS[value.strip().lower()]
+    raise ProfileError(f"{where} must be y/n, yes/no or true/false")
+
+
+def profile_from_dict(data: dict, source: Optional[Path] = None) -> Profile:
+    where = source or "profile"
+    if not isinstance(data, dict):
+        raise ProfileError(f"{where}: expected a JSON object")
+
+    modules = data.get("modules")
+    if not isinstance(modules, list) or not modules or not all(isinstance(m, str) and m for m in modules):
+        raise ProfileError(f"{where}: 'modules' must be a non-empty list of module names")
+
+    username = data.get("username")
+    if username is not None and (not isinstance(username, str) or not username):
+        raise ProfileError(f"{where}: 'username' must be a string")
+
+    answers = data.get("answers", {})
+    if not isinstance(answers, dict) or not all(isinstance(k, str) and k for k in answers):
+        raise ProfileError(f"{where}: 'answers' must map question patterns to y/n")
+    for pattern in answers:
+        if "\t" in pattern or "\n" in pattern:
+            raise ProfileError(f"{where}: answer pattern {pattern!r} contains a tab or newline")
+
+    env = data.get("env", {})
+    if not isinstance(env, dict) or not all(isinstance(k, str) and isinstance(v, str) for k, v in env.items()):
+        raise ProfileError(f"{where}: 'env' must map variable names to strings")
+
+    timeout = data.get("timeout")
+    if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0):
+        raise ProfileError(f"{where}: 'timeout' must be a positive number of seconds")
+
+    parallel = data.get("parallel", MAX_PARALLEL)
+    if isinstance(parallel, bool) or not isinstance(parallel, int) or parallel < 1:
+        raise ProfileError(f"{where}: 'parallel' must be a positive integer")
+
+    default = data.get("default_answer")
+    return Profile(
+        modules=tuple(dict.fromkeys(modules)),
+        username=username,
+        answers=tuple((p, _answer(a, f"{where}: answer for {p!r}")) for p, a in answers.items()),
+        default_answer=None if default is None else _answer(default, f"{where}: 'default_answer'"),
+        env=dict(env),
+        timeout=timeout,
+        parallel=parallel,
+        source=source,
+    )
+
+
+def load_profile(path: Path) -> Profile:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except OSError as e:
+        raise ProfileError(f"Cannot read {path}: {e.strerror or e}")
+    except ValueError as e:
+        raise ProfileError(f"{path}: invalid JSON: {e}")
+    return profile_from_dict(data, path)
+
+
+def resolve_modules(profile: Profile, modules: Iterable) -> tuple[list, list[tuple[str, str]]]:
+    """Modules named by the profile, and (name, reason) for those that will not run.
+
+    Names match case-insensitively. A module whose hardware is not present
+    is skipped rather than failed.
+    """
+    by_name = {m.name.lower(): m for m in modules}
+    unknown = [n for n in profile.modules if n.lower() not in by_name]
+    if unknown:
+        raise ProfileError(
+            f"Unknown module(s): {', '.join(unknown)}. "
+            f"Available: {', '.join(m.name for m in by_name.values())}"
+        )
+    selected, skipped = [], []
+    for name in profile.modules:
+        module = by_name[name.lower()]
+        if module.enabled is False:
+            skipped.append((module.name, f"no {module.hardware} hardware"))
+        else:
+            selected.append(module)
+    return selected, skipped
+
+
+def write_answers(profile: Profile, path: Path) -> None:
+    """The BASHIUM_ANSWERS file read by `preset_answer` in lib/unattended.sh."""
+    path.write_text("".join(f"{answer}\t{pattern}\n" for pattern, answer in profile.answers), encoding="utf-8")
+
+
+def unattended_env(profile: Profile, answers_path: Optional[Path] = None) -> dict[str, str]:
+    """Environment for the scripts; profile values override the caller's BASHIUM_* variables."""
+    env = {**os.environ, "DEBIAN_FRONTEND": "noninteractive", **profile.env, UNATTENDED_ENV: "1"}
+    if answers_path is not None and profile.answers:
+        env[ANSWERS_ENV] = str(answers_path)
+    if profile.default_answer is not None:
+        env[DEFAULT_ANSWER_ENV] = profile.default_answer
+    if profile.username is not None:
+        env[USERNAME_ENV] = profile.username
+    return env
+
+
+def run_unattended(
+    name: str,
+    argv: list[str],
+    cwd: Optional[Path],
+    env: dict[str, str],
+    on_output: Optional[Callable[[str, str], None]] = None,
+    timeout: Optional[float] = None,
+) -> int:
+    """Run one script with no terminal on stdin; `on_output(name, line)` gets each output line."""
+    started = time.time()
+    with spawn_span(argv):
+        proc = subprocess.Popen(
+            argv,
+            cwd=cwd,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    timer = None
+    if timeout is not None:
+        timer = threading.Timer(timeout, _kill_group, args=(proc,))
+        timer.daemon = True
+        timer.start()
+
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    stripper = AnsiStripper()
+    output_bytes = 0
+    pending = ""
+    try:
+        while data := proc.stdout.read1(65536):
+            output_bytes += len(data)
+            pending += stripper.feed(decoder.decode(data))
+            *lines, pending = pending.split("\n")
+            if on_output is not None:
+                for line in lines:
+                    on_output(name, line)
+        pending += stripper.feed(decoder.decode(b"", final=True), final=True)
+        if pending and on_output is not None:
+            on_output(name, pending)
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+        if timer is not None:
+            timer.cancel()
+    log_run(name, argv, started, time.time(), returncode, output_bytes)
+    return returncode
+
+
+def _kill_group(proc: subprocess.Popen) -> None:
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+    except OSError:
+        pass
+
+
+def profile_inputs(profile: Profile) -> Optional[str]:
+    """Digest of everything in the profile that can change what a script does."""
+    return inputs_digest({
+        "answers": profile.answers,
+        "default_answer": profile.default_answer,
+        "username": profile.username,
+        "env": profile.env,
+    })
+
+
+def apply_profile(
+    profile: Profile,
+    modules: list,
+    on_output: Optional[Callable[[str, str], None]] = None,
+    on_update: Optional[Callable[[Job], None]] = None,
+    store: Optional[AppliedStore] = None,
+    force: bool = False,
+) -> list[Job]:
+    """Run `modules` in dependency order without prompting and return their jobs.
+
+    With a `store`, modules already applied with the same profile inputs are
+    marked done without running (unless `force`), and successful runs are
+    recorded.
+    """
+    jobs = build_jobs(modules)
+    inputs = profile_inputs(profile)
+    if store is not None and not force:
+        mark_satisfied(jobs, store, inputs, load_dpkg_index())
+    with tempfile.TemporaryDirectory(prefix="bashium-apply-") as tmp:
+        answers_path = Path(tmp) / "answers.tsv"
+        write_answers(profile, answers_path)
+        # Readable by scripts that re-exec themselves under sudo
+        os.chmod(tmp, 0o755)
+        env = unattended_env(profile, answers_path)
+
+        def run_job(job: Job) -> int:
+            argv, cwd = job.module.command()
+            code = run_unattended(job.name, argv, cwd, env, on_output, profile.timeout)
+            if code == 0 and store is not None:
+                store.record(job.module, inputs, load_dpkg_index())
+            return code
+
+        JobScheduler(jobs, run_job, on_update=on_update, max_parallel=profile.parallel).run()
+    return jobs
+
+
+def job_report(job: Job) -> dict:
+    return {
+        "module": job.name,
+        "state": job.state,
+        "returncode": job.returncode,
+        "seconds": None if job.duration is None else round(job.duration, 3),
+        "reason": job.reason,
+    }
+
+
+def format_job(job: Job) -> str:
+    """One line of the `bashium apply` summary."""
+    duration = "" if job.duration is None else f"{job.duration:7.1f}s"
+    reason = job.reason
+    if job.returncode == NO_ANSWER_EXIT:
+        reason = f"{reason}: a prompt had no answer"
+    return f"{job.name:<24} {job.state:<8} {duration:>8}  {reason}".rstrip()
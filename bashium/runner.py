@@ -0,0 +1,223 @@
+"""Run module scripts under a pseudo-terminal and stream their output."""
+
+import codecs
+import errno
+import os
+import pty
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Optional
+
+from bashium.log import log_run
+from bashium.trace import spawn_span
+
+OUTPUT_LIMIT = 256 * 1024
+
+# CSI/OSC escape sequences (colors, `clear`, cursor movement)
+_ANSI_RE = re.compile(r"\x1b\[[0-?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)|\x1b[()][A-Za-z0-9]|\x1b[=>]")
+
+
+# An escape sequence cut off at the end of a read
+_PARTIAL_ANSI_RE = re.compile(r"\x1b(?:\[[0-?]*[ -/]*|\][^\x07\x1b]*\x1b?|[()])?\Z")
+# Longer fragments are not escape sequences worth waiting for
+PARTIAL_LIMIT = 256
+
+
+def strip_ansi(text: str) -> str:
+    return _ANSI_RE.sub("", text).replace("\r\n", "\n").replace("\r", "")
+
+
+class AnsiStripper:
+    """strip_ansi() for a stream read in chunks; a sequence split between reads is held back."""
+
+    def __init__(self):
+        self.pending = ""
+
+    def feed(self, text: str, final: bool = False) -> str:
+        text = self.pending + text
+        self.pending = ""
+        if not final:
+            m = _PARTIAL_ANSI_RE.search(text)
+            if m is not None and len(text) - m.start() <= PARTIAL_LIMIT:
+                text, self.pending = text[:m.start()], text[m.start():]
+        return strip_ansi(text)
+
+
+class RingBuffer:
+    """Keeps at most `limit` characters of the most recent output."""
+
+    def __init__(self, limit: int = OUTPUT_LIMIT):
+        self.limit = limit
+        self.chunks: deque[str] = deque()
+        self.size = 0
+        # Total characters ever written, including dropped ones
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def append(self, text: str) -> None:
+        if not text:
+            return
+        with self._lock:
+            self.total += len(text)
+            if len(text) >= self.limit:
+                self.chunks.clear()
+                text = text[-self.limit:]
+                self.size = 0
+            self.chunks.append(text)
+            self.size += len(text)
+            while self.size > self.limit:
+                head = self.chunks.popleft()
+                excess = self.size - self.limit
+                if len(head) > excess:
+                    self.chunks.appendleft(head[excess:])
+                    self.size -= excess
+                else:
+                    self.size -= len(head)
+
+    def text(self) -> str:
+        with self._lock:
+            return "".join(self.chunks)
+
+
+# Exec'd in the child after setsid(): makes the pty (stdin) its controlling
+# terminal, so sudo and `read` prompts work as in a real terminal, then runs
+# the script. A preexec_fn would do the same between fork and exec, which is
+# not safe with the GUI's threads running.
+_CTTY_WRAPPER = """\
+import fcntl, os, sys, termios
+fcntl.ioctl(0, termios.TIOCSCTTY, 0)
+try:
+    os.execvp(sys.argv[1], sys.argv[1:])
+except OSError as e:
+    print(f"{sys.argv[1]}: {e.strerror}", file=sys.stderr)
+    os._exit(127)
+"""
+
+
+def tty_command(argv: list[str]) -> list[str]:
+    """`argv` run with the pty on stdin as its controlling terminal."""
+    return [sys.executable, "-c", _CTTY_WRAPPER, *argv]
+
+
+class PtyRun:
+    """One script execution. Callbacks are invoked from the reader thread.
+
+    With a `name`, the run is recorded in the event log when it exits.
+    """
+
+    def __init__(
+        self,
+        argv: list[str],
+        cwd: Optional[Path] = None,
+        env: Optional[dict[str, str]] = None,
+        on_output: Optional[Callable[[str], None]] = None,
+        on_exit: Optional[Callable[[int], None]] = None,
+        limit: int = OUTPUT_LIMIT,
+        name: Optional[str] = None,
+    ):
+        self.argv = argv
+        self.name = name
+        self.cwd = cwd
+        self.env = {**os.environ, "TERM": "xterm", **(env or {})}
+        self.on_output = on_output
+        self.on_exit = on_exit
+        self.output = RingBuffer(limit)
+        self.returncode: Optional[int] = None
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        # Raw bytes read from the pty, before decoding and ANSI stripping
+        self.output_bytes = 0
+        self.proc: Optional[subprocess.Popen] = None
+        self._master: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "PtyRun":
+        master, slave = pty.openpty()
+        self.started = time.time()
+        try:
+            with spawn_span(self.argv):
+                self.proc = subprocess.Popen(
+                    tty_command(self.argv),
+                    cwd=self.cwd,
+                    env=self.env,
+                    stdin=slave,
+                    stdout=slave,
+                    stderr=slave,
+                    start_new_session=True,
+                )
+        except Exception:
+            os.close(master)
+            raise
+        finally:
+            os.close(slave)
+
+        self._master = master
+        self._thread = threading.Thread(target=self._pump, name="bashium-pty", daemon=True)
+        self._thread.start()
+        return self
+
+    def _pump(self) -> None:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        stripper = AnsiStripper()
+        while True:
+            try:
+                data = os.read(self._master, 4096)
+            except OSError as e:
+                # EIO: the child closed the slave side
+                if e.errno != errno.EINTR:
+                    break
+                continue
+            if not data:
+                break
+            self.output_bytes += len(data)
+            self._emit(stripper.feed(decoder.decode(data)))
+        self._emit(stripper.feed(decoder.decode(b"", final=True), final=True))
+
+        self.returncode = self.proc.wait()
+        self.finished = time.time()
+        try:
+            os.close(self._master)
+        except OSError:
+            pass
+        if self.name is not None:
+            log_run(self.name, self.argv, self.started, self.finished, self.returncode, self.output_bytes)
+        if self.on_exit is not None:
+            self.on_exit(self.returncode)
+
+    def _emit(self, text: str) -> None:
+        if not text:
+            return
+        self.output.append(text)
+        if self.on_output is not None:
+            self.on_output(text)
+
+    def write(self, data: str) -> None:
+        """Send keystrokes to the script (answers to y/n and username prompts)."""
+        if self._master is None or self.returncode is not None:
+            return
+        try:
+            os.write(self._master, data.encode("utf-8"))
+        except OSError:
+            pass
+
+    def terminate(self) -> None:
+        if self.proc is not None and self.returncode is None:
+            try:
+                os.killpg(self.proc.pid, signal.SIGTERM)
+            except OSError:
+                pass
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.returncode
+
+    @property
+    def running(self) -> bool:
+        return self.proc is not None and self.returncode is None
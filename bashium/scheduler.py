@@ -0,0 +1,192 @@
+"""Run several modules in one go, ordered by their manifest dependencies."""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+# Held by every job that installs packages; dpkg allows one writer at a time
+DPKG_LOCK = "dpkg"
+
+MAX_PARALLEL = 4
+
+
+@dataclass
+class Job:
+    name: str
+    module: Any
+    # Names of selected jobs that must finish successfully first
+    deps: tuple[str, ...] = ()
+    # Jobs sharing a lock never run at the same time
+    locks: frozenset[str] = frozenset()
+    state: str = PENDING
+    returncode: Optional[int] = None
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    reason: str = ""
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started is None:
+            return None
+        return (self.finished or time.monotonic()) - self.started
+
+
+def build_jobs(modules: Iterable[Any]) -> list[Job]:
+    """Jobs for the selected modules; dependencies on unselected modules are ignored."""
+    modules = list(modules)
+    selected = {m.name for m in modules}
+    return [
+        Job(
+            name=m.name,
+            module=m,
+            deps=tuple(d for d in m.depends if d in selected and d != m.name),
+            locks=frozenset({DPKG_LOCK}) if m.uses_apt else frozenset(),
+        )
+        for m in modules
+    ]
+
+
+def topological_waves(jobs: list[Job]) -> list[list[str]]:
+    """Group jobs into waves whose dependencies are all in earlier waves."""
+    remaining = {j.name: set(j.deps) for j in jobs}
+    order = [j.name for j in jobs]
+    waves = []
+    done: set[str] = set()
+    while remaining:
+        wave = [n for n in order if n in remaining and remaining[n] <= done]
+        if not wave:
+            raise ValueError(f"Dependency cycle between modules: {', '.join(sorted(remaining))}")
+        for n in wave:
+            del remaining[n]
+        done.update(wave)
+        waves.append(wave)
+    return waves
+
+
+class JobScheduler:
+    """Starts each job as soon as its dependencies and locks allow.
+
+    `run_job` is called on a worker thread and returns the exit code;
+    `on_update` is called (from scheduler threads) whenever a job changes state.
+    """
+
+    def __init__(
+        self,
+        jobs: list[Job],
+        run_job: Callable[[Job], int],
+        on_update: Optional[Callable[[Job], None]] = None,
+        max_parallel: int = MAX_PARALLEL,
+    ):
+        topological_waves(jobs)  # reject cycles up front
+        self.jobs = jobs
+        self.run_job = run_job
+        self.on_update = on_update
+        self.max_parallel = max(1, max_parallel)
+        self.cancelled = False
+        self._cond = threading.Condition()
+        self._held: set[str] = set()
+        self._running = 0
+
+    def _notify(self, job: Job) -> None:
+        if self.on_update is not None:
+            self.on_update(job)
+
+    def _by_name(self) -> dict[str, Job]:
+        return {j.name: j for j in self.jobs}
+
+    def _skip_blocked(self) -> list[Job]:
+        by_name = self._by_name()
+        skipped = []
+        changed = True
+        while changed:
+            changed = False
+            for job in self.jobs:
+                if job.state != PENDING:
+                    continue
+                if self.cancelled:
+                    job.state, job.reason = SKIPPED, "cancelled"
+                else:
+                    failed = [d for d in job.deps if by_name[d].state in (FAILED, SKIPPED)]
+                    if not failed:
+                        continue
+                    job.state, job.reason = SKIPPED, f"dependency failed: {', '.join(failed)}"
+                skipped.append(job)
+                changed = True
+        return skipped
+
+    def _ready(self) -> list[Job]:
+        by_name = self._by_name()
+        ready = []
+        held = set(self._held)
+        for job in self.jobs:
+            if self._running + len(ready) >= self.max_parallel:
+                break
+            if job.state != PENDING or job.locks & held:
+                continue
+            if all(by_name[d].state == DONE for d in job.deps):
+                ready.append(job)
+                held |= job.locks
+        return ready
+
+    def _worker(self, job: Job) -> None:
+        try:
+            code = self.run_job(job)
+            reason = ""
+        except Exception as e:
+            code, reason = -1, str(e)
+
+        with self._cond:
+            job.returncode = code
+            job.finished = time.monotonic()
+            job.state = DONE if code == 0 else FAILED
+            job.reason = reason or ("" if code == 0 else f"exit code {code}")
+            self._held -= job.locks
+            self._running -= 1
+            self._cond.notify_all()
+        self._notify(job)
+
+    def run(self) -> list[Job]:
+        """Run all jobs and block until every one is finished or skipped."""
+        while True:
+            with self._cond:
+                skipped = self._skip_blocked()
+                ready = self._ready()
+                for job in ready:
+                    job.state = RUNNING
+                    job.started = time.monotonic()
+                    self._held |= job.locks
+                    self._running += 1
+                pending = any(j.state == PENDING for j in self.jobs)
+                if not ready and not skipped:
+                    if not pending and self._running == 0:
+                        break
+                    self._cond.wait()
+
+            for job in skipped + ready:
+                self._notify(job)
+            for job in ready:
+                threading.Thread(
+                    target=self._worker,
+                    args=(job,),
+                    name=f"bashium-job-{job.name}",
+                    daemon=True,
+                ).start()
+        return self.jobs
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.run, name="bashium-scheduler", daemon=True)
+        thread.start()
+        return thread
+
+    def cancel(self) -> None:
+        """Skip jobs that have not started; running jobs are left to the caller."""
+        with self._cond:
+            self.cancelled = True
+            self._cond.notify_all()
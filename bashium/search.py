@@ -0,0 +1,56 @@
+"""In-memory type-to-filter index over module name, description and category."""
+
+from typing import Any, Sequence
+
+
+class ModuleIndex:
+    """Case-insensitive substring search; every query word must match.
+
+    Results keep the module order, with name matches ranked first. Typing
+    more characters only re-checks the previous result set.
+    """
+
+    def __init__(self, modules: Sequence[Any]):
+        self.modules = modules
+        self._names: list[str] = []
+        self._texts: list[str] = []
+        for module in modules:
+            name, text = self._fields(module)
+            self._names.append(name)
+            self._texts.append(text)
+        self._last_query: list[str] = []
+        self._last_result: list[int] = list(range(len(modules)))
+
+    @staticmethod
+    def _fields(module: Any) -> tuple[str, str]:
+        name = module.name.casefold()
+        text = " ".join((name, module.description.casefold(), (module.category or "").casefold()))
+        return name, text
+
+    def update(self, position: int) -> None:
+        """Re-index one module after its description changed (hardware results)."""
+        self._names[position], self._texts[position] = self._fields(self.modules[position])
+        self._last_query = []
+
+    def _matches(self, words: list[str], candidates: Sequence[int]) -> list[int]:
+        texts = self._texts
+        return [i for i in candidates if all(w in texts[i] for w in words)]
+
+    def search(self, query: str) -> list[int]:
+        """Positions of the matching modules."""
+        words = query.casefold().split()
+        if not words:
+            self._last_query, self._last_result = [], list(range(len(self.modules)))
+            return self._last_result
+
+        # Narrowing the previous query ("fir" -> "firm") cannot add matches
+        prev = self._last_query
+        narrowing = bool(prev) and len(words) >= len(prev) and all(
+            w.startswith(p) for w, p in zip(words, prev)
+        )
+        candidates = self._last_result if narrowing else range(len(self.modules))
+        matched = self._matches(words, candidates)
+
+        self._last_query, self._last_result = words, matched
+        names = self._names
+        return sorted(matched, key=lambda i: not any(w in names[i] for w in words))
@@ -0,0 +1,120 @@
+"""Style roles: widgets are registered under a role when created, and a palette
+switch reconfigures each role's widgets in one pass.
+
+No customtkinter import here; anything with a ``configure(**kwargs)`` method
+can be registered.
+"""
+
+from typing import Any, Callable
+
+# Theme presets selectable in the header, HTML-like HEX colours
+PALETTES: dict[str, dict[str, str]] = {
+    "Gruvbox Dark": {
+        "bg": "#282828",
+        "fg": "#ebdbb2",
+        "fg_secondary": "#bdae93",
+        "accent": "#fabd2f",
+        "accent_hover": "#d79921",
+        "card_bg": "#3c3836",
+        "border": "#504945",
+        "muted": "#7c6f64",
+        "success": "#b8bb26",
+        "success_hover": "#98971a",
+    },
+    "Gruvbox Light": {
+        "bg": "#fbf1c7",
+        "fg": "#3c3836",
+        "fg_secondary": "#665c54",
+        "accent": "#d79921",
+        "accent_hover": "#b57614",
+        "card_bg": "#f2e5bc",
+        "border": "#d5c4a1",
+        "muted": "#7c6f64",
+        "success": "#98971a",
+        "success_hover": "#79740e",
+    },
+    "Tokyo Night": {
+        "bg": "#1a1b26",
+        "fg": "#c0caf5",
+        "fg_secondary": "#9aa5ce",
+        "accent": "#7aa2f7",
+        "accent_hover": "#5a82d7",
+        "card_bg": "#24283b",
+        "border": "#414868",
+        "muted": "#565f89",
+        "success": "#9ece6a",
+        "success_hover": "#7ea84a",
+    },
+    "Cyberpunk": {
+        "bg": "#0b0f1a",
+        "fg": "#e6e6e6",
+        "fg_secondary": "#b0b0b0",
+        "accent": "#ff2a6d",
+        "accent_hover": "#df0a4d",
+        "card_bg": "#1b1f36",
+        "border": "#2b2f46",
+        "muted": "#6b6f86",
+        "success": "#05ffa1",
+        "success_hover": "#00df81",
+    },
+    "Neon Cyan": {
+        "bg": "#07161b",
+        "fg": "#d7f9ff",
+        "fg_secondary": "#a0c9d1",
+        "accent": "#00f5ff",
+        "accent_hover": "#00d5df",
+        "card_bg": "#0b2a33",
+        "border": "#1b3a43",
+        "muted": "#5b7a83",
+        "success": "#00ff9f",
+        "success_hover": "#00df7f",
+    },
+}
+
+# Role -> widget options for a palette (the dicts in BashiumApp.PALETTES)
+ROLES: dict[str, Callable[[dict], dict]] = {
+    "title": lambda c: {"text_color": c["fg"]},
+    "subtitle": lambda c: {"text_color": c["fg_secondary"]},
+    "accent-title": lambda c: {"text_color": c["accent"]},
+    "body": lambda c: {"text_color": c["fg"]},
+    "card": lambda c: {"fg_color": c["card_bg"], "border_color": c["border"]},
+    "run-button": lambda c: {"fg_color": c["accent"], "hover_color": c["accent_hover"]},
+    "outline-button": lambda c: {"border_color": c["accent"], "hover_color": c["border"], "text_color": c["fg"]},
+}
+
+
+class StyleRegistry:
+    """Widgets grouped by style role, plus hooks for colours that depend on state.
+
+    Colours such as the status dot (enabled/disabled) or the last run result
+    are not a fixed role; their owner registers a hook that is called with
+    the new palette instead.
+    """
+
+    def __init__(self, colors: dict, roles: dict[str, Callable[[dict], dict]] = ROLES):
+        # The palette new widgets should be created with
+        self.colors = colors
+        self.roles = roles
+        self._widgets: dict[str, list[Any]] = {role: [] for role in roles}
+        self._hooks: list[Callable[[dict], None]] = []
+
+    def register(self, role: str, *widgets: Any) -> None:
+        self._widgets[role].extend(widgets)
+
+    def add_hook(self, hook: Callable[[dict], None]) -> None:
+        self._hooks.append(hook)
+
+    def apply(self, colors: dict) -> None:
+        """Reconfigure every registered widget for `colors`; options are computed once per role."""
+        self.colors = colors
+        for role, widgets in self._widgets.items():
+            if not widgets:
+                continue
+            options = self.roles[role](colors)
+            for widget in widgets:
+                widget.configure(**options)
+        for hook in self._hooks:
+            hook(colors)
+
+    def __len__(self) -> int:
+        return sum(len(w) for w in self._widgets.values())
@@ -0,0 +1,193 @@
+"""Process-free hardware inventory read straight from sysfs."""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+# Points every default at another tree, e.g. the benchmark fixtures
+SYSFS_ENV = "BASHIUM_SYSFS"
+SYSFS_ROOT = Path(os.environ.get(SYSFS_ENV) or "/sys")
+
+PCI_CLASS_DISPLAY = 0x03
+PCI_CLASS_NETWORK_OTHER = 0x0280  # what lspci reports as "Network controller" (Wi-Fi)
+PCI_CLASS_BLUETOOTH = 0x0D11
+USB_IFACE_BLUETOOTH = (0xE0, 0x01, 0x01)  # Wireless Controller / RF / Bluetooth
+USB_CLASS_WIRELESS = 0xE0
+USB_CLASS_VENDOR_SPECIFIC = 0xFF
+
+
+@dataclass(frozen=True)
+class PciDevice:
+    slot: str
+    vendor: str
+    device: str
+    pci_class: int
+
+    @property
+    def base_class(self) -> int:
+        return self.pci_class >> 16
+
+    @property
+    def class_subclass(self) -> int:
+        return self.pci_class >> 8
+
+
+@dataclass(frozen=True)
+class UsbDevice:
+    name: str
+    vendor: str
+    product: str
+    # (class, subclass, protocol) for every interface of the active configuration
+    interfaces: tuple[tuple[int, int, int], ...] = ()
+
+
+@dataclass(frozen=True)
+class Inventory:
+    # None when the corresponding bus is not exposed in sysfs
+    pci: Optional[tuple[PciDevice, ...]]
+    usb: Optional[tuple[UsbDevice, ...]]
+    wireless_vendors: tuple[str, ...]
+    rfkill_types: frozenset[str]
+    bluetooth_hci: bool
+    # (bus, vendor, device) of the hardware behind each wireless interface
+    wireless_devices: tuple[tuple[str, str, str], ...] = ()
+
+
+def _read_attr(path: Path) -> str:
+    try:
+        return path.read_text(encoding="ascii", errors="replace").strip()
+    except OSError:
+        return ""
+
+
+def _hex_id(value: str) -> str:
+    value = value.lower()
+    return value[2:] if value.startswith("0x") else value
+
+
+def _hex_int(value: str) -> int:
+    try:
+        return int(value, 16)
+    except ValueError:
+        return -1
+
+
+def _list_dir(path: Path) -> Optional[list[str]]:
+    try:
+        return sorted(os.listdir(path))
+    except OSError:
+        return None
+
+
+def read_pci_devices(sysfs: Path = SYSFS_ROOT) -> Optional[tuple[PciDevice, ...]]:
+    base = sysfs / "bus" / "pci" / "devices"
+    entries = _list_dir(base)
+    if entries is None:
+        return None
+
+    devices = []
+    for slot in entries:
+        d = base / slot
+        devices.append(
+            PciDevice(
+                slot=slot,
+                vendor=_hex_id(_read_attr(d / "vendor")),
+                device=_hex_id(_read_attr(d / "device")),
+                pci_class=_hex_int(_read_attr(d / "class")),
+            )
+        )
+    return tuple(devices)
+
+
+def read_usb_devices(sysfs: Path = SYSFS_ROOT) -> Optional[tuple[UsbDevice, ...]]:
+    base = sysfs / "bus" / "usb" / "devices"
+    entries = _list_dir(base)
+    if entries is None:
+        return None
+
+    interfaces: dict[str, list[tuple[int, int, int]]] = {}
+    names = []
+    for name in entries:
+        if ":" in name:
+            # Interface entries look like "1-1:1.0" and belong to device "1-1"
+            d = base / name
+            interfaces.setdefault(name.split(":", 1)[0], []).append(
+                (
+                    _hex_int(_read_attr(d / "bInterfaceClass")),
+                    _hex_int(_read_attr(d / "bInterfaceSubClass")),
+                    _hex_int(_read_attr(d / "bInterfaceProtocol")),
+                )
+            )
+        else:
+            names.append(name)
+
+    return tuple(
+        UsbDevice(
+            name=name,
+            vendor=_hex_id(_read_attr(base / name / "idVendor")),
+            product=_hex_id(_read_attr(base / name / "idProduct")),
+            interfaces=tuple(interfaces.get(name, ())),
+        )
+        for name in names
+    )
+
+
+def _device_ids(device_dir: Path) -> tuple[str, str, str]:
+    # PCI/SDIO devices expose `vendor`, USB devices `idVendor` one level above the interface
+    for candidate in (device_dir, device_dir.parent):
+        vendor = _read_attr(candidate / "vendor")
+        if vendor:
+            try:
+                bus = os.path.basename(os.readlink(candidate / "subsystem"))
+            except OSError:
+                bus = "pci"
+            return bus, _hex_id(vendor), _hex_id(_read_attr(candidate / "device"))
+        vendor = _read_attr(candidate / "idVendor")
+        if vendor:
+            return "usb", _hex_id(vendor), _hex_id(_read_attr(candidate / "idProduct"))
+    return "", "", ""
+
+
+def read_wireless_devices(sysfs: Path = SYSFS_ROOT) -> tuple[tuple[str, str, str], ...]:
+    base = sysfs / "class" / "net"
+    devices = []
+    for iface in _list_dir(base) or []:
+        if not (base / iface / "wireless").exists():
+            continue
+        device_dir = base / iface / "device"
+        if not device_dir.exists():
+            continue
+        ids = _device_ids(device_dir.resolve())
+        if ids[1] and ids not in devices:
+            devices.append(ids)
+    return tuple(devices)
+
+
+def read_wireless_vendors(sysfs: Path = SYSFS_ROOT) -> tuple[str, ...]:
+    return tuple(vendor for _bus, vendor, _device in read_wireless_devices(sysfs))
+
+
+def read_rfkill_types(sysfs: Path = SYSFS_ROOT) -> frozenset[str]:
+    base = sysfs / "class" / "rfkill"
+    types = (_read_attr(base / name / "type") for name in _list_dir(base) or [])
+    return frozenset(t for t in types if t)
+
+
+def read_inventory(sysfs: Path = SYSFS_ROOT) -> Optional[Inventory]:
+    """Return the sysfs inventory, or None when sysfs exposes neither PCI nor USB."""
+    pci = read_pci_devices(sysfs)
+    usb = read_usb_devices(sysfs)
+    if pci is None and usb is None:
+        return None
+
+    hci = _list_dir(sysfs / "class" / "bluetooth") or []
+    wireless = read_wireless_devices(sysfs)
+    return Inventory(
+        pci=pci,
+        usb=usb,
+        wireless_vendors=tuple(vendor for _bus, vendor, _device in wireless),
+        rfkill_types=read_rfkill_types(sysfs),
+        bluetooth_hci=any(e.startswith("hci") for e in hci),
+        wireless_devices=wireless,
+    )
@@ -0,0 +1,148 @@
+"""Startup and hot-path spans in Chrome trace-event format.
+
+Enabled with BASHIUM_TRACE=/path/trace.json or `bashium --trace FILE`; open
+the file in ui.perfetto.dev or chrome://tracing. When tracing is off,
+span() returns one shared do-nothing context manager.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+ENV_VAR = "BASHIUM_TRACE"
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    def __init__(self, path: Path):
+        self.path = path
+        self.pid = os.getpid()
+        self.events: list[dict] = []
+        self._threads: dict[int, str] = {}
+        self._lock = threading.Lock()
+        # Wall-clock anchor, so traces of several processes line up
+        self._origin_us = time.time_ns() // 1000 - time.perf_counter_ns() // 1000
+
+    def now(self) -> int:
+        return self._origin_us + time.perf_counter_ns() // 1000
+
+    def _add(self, event: dict) -> None:
+        tid = threading.get_native_id()
+        event["pid"] = self.pid
+        event["tid"] = tid
+        with self._lock:
+            if tid not in self._threads:
+                self._threads[tid] = threading.current_thread().name
+            self.events.append(event)
+
+    def complete(self, name: str, cat: str, start: int, end: int, args: dict) -> None:
+        event = {"name": name, "cat": cat, "ph": "X", "ts": start, "dur": end - start}
+        if args:
+            event["args"] = args
+        self._add(event)
+
+    def instant(self, name: str, cat: str = "bashium") -> None:
+        self._add({"name": name, "cat": cat, "ph": "i", "s": "t", "ts": self.now()})
+
+    def write(self) -> None:
+        with self._lock:
+            meta = [
+                {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+                for tid, name in self._threads.items()
+            ]
+            data = {"traceEvents": meta + self.events, "displayTimeUnit": "ms"}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer: Tracer, name: str, cat: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = self.tracer.now()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.complete(self.name, self.cat, self.start, self.tracer.now(), self.args)
+        return False
+
+
+_tracer: Optional[Tracer] = None
+
+
+def span(name: str, cat: str = "bashium", **args):
+    """`with span("setup_ui"):` records one complete event while tracing is on."""
+    if _tracer is None:
+        return NULL_SPAN
+    return _Span(_tracer, name, cat, args)
+
+
+def instant(name: str, cat: str = "bashium") -> None:
+    if _tracer is not None:
+        _tracer.instant(name, cat)
+
+
+def spawn_span(argv):
+    """Span around starting an external command."""
+    if _tracer is None:
+        return NULL_SPAN
+    return _Span(_tracer, f"spawn {os.path.basename(str(argv[0]))}", "subprocess", {"argv": [str(a) for a in argv]})
+
+
+def enable(path: Path) -> Tracer:
+    """Start recording; the file is written at exit (and by flush())."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(path)
+        atexit.register(_tracer.write)
+    return _tracer
+
+
+def enable_from_env() -> Optional[Tracer]:
+    path = os.environ.get(ENV_VAR)
+    if not path:
+        return None
+    return enable(Path(path))
+
+
+def flush() -> None:
+    if _tracer is not None:
+        _tracer.write()
+
+
+def _forget_after_fork() -> None:
+    # A forked worker must not overwrite the parent's trace file at exit
+    global _tracer
+    _tracer = None
+
+
+os.register_at_fork(after_in_child=_forget_after_fork)
@@ -0,0 +1,339 @@
+"""Incremental, parallel installer for the Xfce Look themes, icons and wallpapers."""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import stat
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from bashium.assetpack import FILE, PACK_NAME, AssetPack, PackError, ensure_dir, extract_group, open_pack
+from bashium.log import log_exception
+
+# Asset folder -> target folder in the user's home (~/.icons, ~/.themes, ~/.wallpapers)
+ASSET_DIRS = ("icons", "themes", "wallpapers")
+
+MANIFEST_VERSION = 1
+
+_CHUNK = 1024 * 1024
+# Plain os.open(): no buffering layer or isatty() probe for each of the ~7000 files
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC
+
+
+@dataclass(frozen=True)
+class Archive:
+    # The zip file, or the asset pack holding the archive's contents
+    path: Path
+    kind: str
+    name: str
+    size: int = 0
+    mtime: int = 0
+    # Content digest known up front for pack groups; zips are hashed when their stat changes
+    digest: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.kind}/{self.name}"
+
+    @property
+    def in_pack(self) -> bool:
+        return self.digest is not None
+
+    def target(self, home: Path) -> Path:
+        return home / f".{self.kind}"
+
+
+@dataclass
+class InstallResult:
+    extracted: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    failed: list[tuple[str, str]] = field(default_factory=list)
+    # Files of a previous version of an archive that the new version no longer ships
+    removed: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+
+def find_zip_archives(assets_dir: Path) -> list[Archive]:
+    archives = []
+    for kind in ASSET_DIRS:
+        try:
+            names = sorted(os.listdir(assets_dir / kind))
+        except OSError:
+            continue
+        for name in names:
+            path = assets_dir / kind / name
+            if not name.endswith(".zip"):
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                archives.append(Archive(path, kind, name, st.st_size, st.st_mtime_ns))
+    return archives
+
+
+def pack_archives(pack: AssetPack) -> list[Archive]:
+    archives = []
+    for group in pack.groups.values():
+        size = sum(pack.blobs[e[4]].size for e in group.entries if e[1] == FILE)
+        archives.append(Archive(pack.path, group.kind, group.name, size, 0, group.digest))
+    return archives
+
+
+def find_archives(assets_dir: Path) -> list[Archive]:
+    """Archives to install: from the asset pack when it is newer than every zip, else the zips."""
+    zips = find_zip_archives(assets_dir)
+    pack_path = assets_dir / PACK_NAME
+    try:
+        pack_mtime = pack_path.stat().st_mtime_ns
+    except OSError:
+        return zips
+    if any(a.mtime > pack_mtime for a in zips):
+        # A zip was updated after the pack was built; `pack-assets` rebuilds it
+        return zips
+    try:
+        return pack_archives(open_pack(pack_path))
+    except (OSError, PackError, KeyError) as e:
+        log_exception(f"Ignoring asset pack {pack_path}", e)
+        return zips
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def manifest_path(home: Path) -> Path:
+    # Lives in the target home, so it follows the installed files, not the user running the script
+    return home / ".cache" / "bashium" / "xfce_look.json"
+
+
+def load_manifest(home: Path) -> dict:
+    try:
+        data = json.loads(manifest_path(home).read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+    if data.get("version") != MANIFEST_VERSION or not isinstance(data.get("archives"), dict):
+        return {}
+    return data["archives"]
+
+
+def save_manifest(home: Path, archives: dict) -> None:
+    path = manifest_path(home)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({"version": MANIFEST_VERSION, "archives": archives}), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _member_path(dest: Path, name: str) -> Path:
+    parts = [p for p in name.replace("\\", "/").split("/") if p not in ("", ".")]
+    if not parts or ".." in parts:
+        raise ValueError(f"Unsafe path in archive: {name!r}")
+    return dest.joinpath(*parts)
+
+
+def extract_archive(archive: str, dest: str) -> list[str]:
+    """Extract like `unzip -o` (modes, mtimes, symlinks); return the files written, relative to dest.
+
+    Module-level so it can run in a worker process.
+    """
+    dest_path = Path(dest)
+    written: list[str] = []
+    dirs: list[tuple[Path, int, float]] = []
+    made: set[Path] = set()
+
+    with zipfile.ZipFile(archive) as zf:
+        for info in zf.infolist():
+            target = _member_path(dest_path, info.filename)
+            mode = info.external_attr >> 16
+            mtime = time.mktime(info.date_time + (0, 0, -1))
+
+            if info.is_dir():
+                ensure_dir(target, made)
+                dirs.append((target, mode & 0o7777, mtime))
+                continue
+
+            ensure_dir(target.parent, made)
+            # Never write through a symlink left by an earlier version
+            if target.is_symlink() or (stat.S_ISLNK(mode) and target.exists()):
+                target.unlink()
+
+            if stat.S_ISLNK(mode):
+                os.symlink(zf.read(info).decode("utf-8"), target)
+            else:
+                perm = mode & 0o7777 or 0o644
+                try:
+                    fd = os.open(target, _WRITE_FLAGS, perm)
+                except PermissionError:
+                    # Read-only file from a previous extraction
+                    target.unlink()
+                    fd = os.open(target, _WRITE_FLAGS, perm)
+                try:
+                    with zf.open(info) as src:
+                        while chunk := src.read(_CHUNK):
+                            os.write(fd, chunk)
+                    # An existing file keeps its old mode through O_TRUNC
+                    os.fchmod(fd, perm)
+                    os.utime(fd, (mtime, mtime))
+                finally:
+                    os.close(fd)
+            written.append(target.relative_to(dest_path).as_posix())
+
+    # Applied last: writing the contents would move the mtime, and a
+    # read-only directory would block its own contents
+    for path, dmode, mtime in reversed(dirs):
+        if dmode:
+            os.chmod(path, dmode)
+        os.utime(path, (mtime, mtime))
+    return written
+
+
+def extract(archive: Archive, dest: str) -> list[str]:
+    if archive.in_pack:
+        return extract_group(str(archive.path), archive.key, dest)
+    return extract_archive(str(archive.path), dest)
+
+
+def _is_installed(entry: dict, archive: Archive, home: Path) -> bool:
+    roots = {f.split("/", 1)[0] for f in entry.get("files", [])}
+    target = archive.target(home)
+    return all(os.path.lexists(target / r) for r in roots)
+
+
+def _remove_stale(target: Path, old: list[str], new: list[str]) -> int:
+    removed = 0
+    for rel in set(old) - set(new):
+        path = target / rel
+        try:
+            if path.is_symlink() or path.is_file():
+                path.unlink()
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def install_assets(
+    assets_dir: Path,
+    home: Path,
+    jobs: Optional[int] = None,
+    force: bool = False,
+    on_progress: Optional[Callable[[str, Archive], None]] = None,
+    only: Optional[set[str]] = None,
+) -> InstallResult:
+    """Extract changed archives in parallel; archives already installed are skipped.
+
+    A zip is unchanged when its size and mtime match the manifest, or, if
+    those moved, its SHA-256 does; a pack group when its content digest does. `on_progress(state, archive)` is called
+    with "unchanged", "extracting", "extracted" or "failed". `only` limits the
+    run to the given archive keys (e.g. "themes/Gruvbox-B-MB-Dark.zip").
+    """
+    progress = on_progress or (lambda state, archive: None)
+    manifest = load_manifest(home)
+    new_manifest = dict(manifest)
+    result = InstallResult()
+
+    todo: list[tuple[Archive, str]] = []
+    for archive in find_archives(assets_dir):
+        if only is not None and archive.key not in only:
+            continue
+        entry = manifest.get(archive.key)
+        installed = entry is not None and not force and _is_installed(entry, archive, home)
+        if archive.in_pack:
+            digest = archive.digest
+        elif installed and entry.get("size") == archive.size and entry.get("mtime") == archive.mtime:
+            digest = entry.get("sha256")
+        else:
+            try:
+                digest = file_digest(archive.path)
+            except OSError as e:
+                result.failed.append((archive.key, str(e)))
+                progress("failed", archive)
+                continue
+
+        if installed and entry.get("sha256") == digest:
+            if entry.get("size") != archive.size or entry.get("mtime") != archive.mtime:
+                new_manifest[archive.key] = {**entry, "size": archive.size, "mtime": archive.mtime}
+            result.unchanged.append(archive.key)
+            progress("unchanged", archive)
+            continue
+        todo.append((archive, digest))
+
+    if todo:
+        for kind in {a.kind for a, _ in todo}:
+            (home / f".{kind}").mkdir(parents=True, exist_ok=True)
+
+    def finished(archive: Archive, digest: str, files: list[str]) -> None:
+        old = manifest.get(archive.key, {}).get("files", [])
+        result.removed += _remove_stale(archive.target(home), old, files)
+        new_manifest[archive.key] = {
+            "sha256": digest,
+            "size": archive.size,
+            "mtime": archive.mtime,
+            "files": files,
+        }
+        result.extracted.append(archive.key)
+        progress("extracted", archive)
+
+    def failed(archive: Archive, exc: BaseException) -> None:
+        new_manifest.pop(archive.key, None)
+        result.failed.append((archive.key, str(exc)))
+        progress("failed", archive)
+
+    # Largest archives first so the pool is not left waiting on one big theme
+    todo.sort(key=lambda item: item[0].size, reverse=True)
+    workers = min(jobs or os.cpu_count() or 1, len(todo))
+
+    pool = None
+    if workers > 1:
+        try:
+            # Forking a process with live threads (the GUI's) can copy a held
+            # lock into the child; workers come from a fork server instead
+            pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("forkserver")
+            )
+        except (OSError, NotImplementedError, ValueError):
+            # No semaphores (e.g. missing /dev/shm) or no fork server: extract serially
+            pool = None
+
+    if pool is None:
+        for archive, digest in todo:
+            progress("extracting", archive)
+            try:
+                files = extract(archive, str(archive.target(home)))
+            except Exception as e:
+                failed(archive, e)
+            else:
+                finished(archive, digest, files)
+    else:
+        with pool:
+            futures = {}
+            for archive, digest in todo:
+                progress("extracting", archive)
+                future = pool.submit(extract, archive, str(archive.target(home)))
+                futures[future] = (archive, digest)
+            for future in as_completed(futures):
+                archive, digest = futures[future]
+                try:
+                    files = future.result()
+                except Exception as e:
+                    failed(archive, e)
+                else:
+                    finished(archive, digest, files)
+
+    if new_manifest != manifest:
+        save_manifest(home, new_manifest)
+    return result
@@ -0,0 +1,64 @@
+"""Measure the theme switch latency against the number of module cards.
+
+    python3 benchmarks/bench_palette.py [--cards 8,50,200,1000] [--repeat N]
+
+Needs customtkinter and a display (e.g. `xvfb-run`). The cards are real
+ModuleCards bound to the repository's modules; each switch is a
+StyleRegistry.apply() followed by update_idletasks(), so the redraw is included.
+"""
+
+import argparse
+import itertools
+import statistics
+import sys
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+
+import customtkinter as ctk  # noqa: E402
+
+from bashium.gui import BashiumApp, CardState, ModuleCard  # noqa: E402
+from bashium.modules import build_modules  # noqa: E402
+from bashium.styles import StyleRegistry  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", default="8,50,200,1000", help="comma-separated card counts")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    modules = build_modules(REPO, {}, {})
+    palettes = list(BashiumApp.PALETTES.values())
+    root = ctk.CTk()
+    root.withdraw()
+
+    for count in (int(c) for c in args.cards.split(",")):
+        styles = StyleRegistry(palettes[0])
+        states: dict[str, CardState] = {}
+        frame = ctk.CTkFrame(root)
+        for module in itertools.islice(itertools.cycle(modules), count):
+            card = ModuleCard(frame, styles, states, lambda module, code: None)
+            card.bind_module(module)
+        root.update_idletasks()
+
+        times = []
+        for colors in itertools.islice(itertools.cycle(palettes[1:] + palettes[:1]), args.repeat):
+            start = time.perf_counter()
+            styles.apply(colors)
+            root.update_idletasks()
+            times.append(time.perf_counter() - start)
+        print(
+            f"{count:>5} cards  {len(styles):>6} widgets  "
+            f"median {statistics.median(times) * 1000:8.1f} ms  max {max(times) * 1000:8.1f} ms"
+        )
+        frame.destroy()
+
+    root.destroy()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
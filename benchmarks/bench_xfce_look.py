@@ -0,0 +1,96 @@
+"""Compare the Xfce Look shell unzip loop with the Python installer.
+
+    python3 benchmarks/bench_xfce_look.py [--repeat N] [--jobs N]
+
+Each run extracts into a fresh temporary home; "warm" re-runs the Python
+installer on a home it has already populated. The "pack" cases install from
+an asset pack built from the zips in a temporary directory.
+"""
+
+import argparse
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+
+from bashium.assetpack import PACK_NAME, build_pack  # noqa: E402
+from bashium.xfcelook import ASSET_DIRS, find_zip_archives, install_assets  # noqa: E402
+
+ASSETS = REPO / "xfce_look"
+
+
+def shell_loop(home: Path) -> None:
+    # The loop from xfce_look/install.sh before the Python installer
+    for kind in ASSET_DIRS:
+        for archive in sorted((ASSETS / kind).glob("*.zip")):
+            subprocess.run(
+                ["unzip", "-o", "-q", str(archive), "-d", str(home / f".{kind}")],
+                check=True,
+            )
+
+
+def timed(fn, repeat: int, fresh: bool) -> list[float]:
+    times = []
+    for _ in range(repeat):
+        home = Path(tempfile.mkdtemp(prefix="bashium-bench-"))
+        try:
+            if not fresh:
+                fn(home)
+            start = time.perf_counter()
+            fn(home)
+            times.append(time.perf_counter() - start)
+        finally:
+            shutil.rmtree(home, ignore_errors=True)
+    return times
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", type=int, help="worker processes for the Python installer")
+    args = parser.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="bashium-bench-assets-"))
+    zips_dir, pack_dir = work / "zips", work / "pack"
+    zips_dir.mkdir()
+    pack_dir.mkdir()
+    for kind in ASSET_DIRS:
+        # Without a pack next to them, the zips are used
+        (zips_dir / kind).symlink_to(ASSETS / kind)
+    build_pack(((a.kind, a.path) for a in find_zip_archives(ASSETS)), pack_dir / PACK_NAME)
+
+    def installer(assets: Path):
+        def run(home: Path) -> None:
+            result = install_assets(assets, home, jobs=args.jobs)
+            if not result.ok:
+                raise RuntimeError(result.failed)
+        return run
+
+    cases = [
+        ("python zips cold", installer(zips_dir), True),
+        ("python zips warm", installer(zips_dir), False),
+        ("python pack cold", installer(pack_dir), True),
+        ("python pack warm", installer(pack_dir), False),
+    ]
+    if shutil.which("unzip"):
+        cases.insert(0, ("shell unzip loop", shell_loop, True))
+    else:
+        print("unzip not found, skipping the shell loop", file=sys.stderr)
+
+    try:
+        for name, fn, fresh in cases:
+            times = timed(fn, args.repeat, fresh)
+            print(f"{name:<18} median {statistics.median(times) * 1000:8.1f} ms  min {min(times) * 1000:8.1f} ms")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
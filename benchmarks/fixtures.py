@@ -0,0 +1,197 @@
+"""Fake hardware and system files for the benchmark suite.
+
+Everything is created under one temporary directory: a sysfs tree, stub
+`lspci`/`lsusb`/`rfkill` and terminal binaries, APT sources, an Xfce Look
+asset folder and XDG directories, so the benchmarks never touch the host.
+The tests in tests/ use the same fixtures.
+"""
+
+import os
+import stat
+import subprocess
+import zipfile
+from pathlib import Path
+
+# A laptop with an NVIDIA GPU, an Intel Wi-Fi card and a USB Bluetooth dongle
+PCI_DEVICES = (
+    ("0000:00:00.0", "0x8086", "0x9b61", "0x060000"),
+    ("0000:00:02.0", "0x8086", "0x9b41", "0x030000"),
+    ("0000:01:00.0", "0x10de", "0x1f95", "0x030200"),
+    ("0000:02:00.0", "0x8086", "0x2723", "0x028000"),
+    ("0000:03:00.0", "0x10ec", "0x8168", "0x020000"),
+)
+USB_DEVICES = (
+    # name, idVendor, idProduct, interfaces (class, subclass, protocol)
+    ("1-1", "0x0bda", "0x8771", (("e0", "01", "01"),)),
+    ("1-2", "0x046d", "0xc52b", (("03", "01", "02"),)),
+    ("1-3", "0x0781", "0x5581", (("08", "06", "50"),)),
+)
+
+LSPCI_OUTPUT = """\
+00:00.0 Host bridge [0600]: Intel Corporation Device [8086:9b61]
+00:02.0 VGA compatible controller [0300]: Intel Corporation UHD Graphics [8086:9b41]
+01:00.0 3D controller [0302]: NVIDIA Corporation TU117M [10de:1f95]
+02:00.0 Network controller [0280]: Intel Corporation Wi-Fi 6 AX200 [8086:2723]
+03:00.0 Ethernet controller [0200]: Realtek Semiconductor RTL8111 [10ec:8168]
+"""
+LSUSB_OUTPUT = """\
+Bus 001 Device 002: ID 0bda:8771 Realtek Semiconductor Corp. Bluetooth Radio
+Bus 001 Device 003: ID 046d:c52b Logitech, Inc. Unifying Receiver
+Bus 001 Device 004: ID 0781:5581 SanDisk Corp. Ultra
+"""
+RFKILL_OUTPUT = """\
+0: phy0: Wireless LAN
+\tSoft blocked: no
+\tHard blocked: no
+1: hci0: Bluetooth
+\tSoft blocked: no
+\tHard blocked: no
+"""
+
+SOURCES_LIST = """\
+deb http://deb.debian.org/debian bookworm main contrib non-free non-free-firmware
+deb http://security.debian.org/debian-security bookworm-security main contrib
+# deb http://deb.debian.org/debian bookworm-backports main
+"""
+DEB822_SOURCES = """\
+Types: deb deb-src
+URIs: http://deb.debian.org/debian
+Suites: bookworm-updates
+Components: main contrib non-free-firmware
+"""
+
+
+def _write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def make_sysfs(root: Path) -> Path:
+    pci = root / "bus" / "pci" / "devices"
+    for slot, vendor, device, cls in PCI_DEVICES:
+        for name, value in (("vendor", vendor), ("device", device), ("class", cls)):
+            _write(pci / slot / name, value + "\n")
+
+    usb = root / "bus" / "usb" / "devices"
+    for name, vendor, product, interfaces in USB_DEVICES:
+        _write(usb / name / "idVendor", vendor[2:] + "\n")
+        _write(usb / name / "idProduct", product[2:] + "\n")
+        for i, (cls, sub, proto) in enumerate(interfaces):
+            iface = usb / f"{name}:1.{i}"
+            _write(iface / "bInterfaceClass", cls + "\n")
+            _write(iface / "bInterfaceSubClass", sub + "\n")
+            _write(iface / "bInterfaceProtocol", proto + "\n")
+
+    wlan = root / "class" / "net" / "wlan0"
+    (wlan / "wireless").mkdir(parents=True)
+    wlan.joinpath("device").symlink_to(pci / "0000:02:00.0")
+    _write(root / "class" / "rfkill" / "rfkill0" / "type", "wlan\n")
+    _write(root / "class" / "rfkill" / "rfkill1" / "type", "bluetooth\n")
+    (root / "class" / "bluetooth" / "hci0").mkdir(parents=True)
+    return root
+
+
+def make_stub(bin_dir: Path, name: str, output: str = "", code: int = 0) -> Path:
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    path = bin_dir / name
+    body = output.replace("'", "'\\''")
+    path.write_text(f"#!/bin/sh\nprintf '%s' '{body}'\nexit {code}\n", encoding="utf-8")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return path
+
+
+def make_apt_sources(root: Path) -> tuple[Path, Path]:
+    sources_list = root / "sources.list"
+    sources_dir = root / "sources.list.d"
+    _write(sources_list, SOURCES_LIST)
+    _write(sources_dir / "debian.sources", DEB822_SOURCES)
+    _write(sources_dir / "vendor.list", "deb [arch=amd64] https://example.org/apt stable main\n")
+    return sources_list, sources_dir
+
+
+def make_assets(root: Path, small_files: int = 1500, large_files: int = 6) -> Path:
+    """An Xfce Look folder: one icon-theme-like zip of many small files, one of few large ones."""
+    icons = root / "icons"
+    wallpapers = root / "wallpapers"
+    icons.mkdir(parents=True)
+    wallpapers.mkdir(parents=True)
+    with zipfile.ZipFile(icons / "Bench-Icons.zip", "w", zipfile.ZIP_DEFLATED) as zf:
+        for i in range(small_files):
+            zf.writestr(f"Bench-Icons/{i % 12}x/apps/icon-{i}.svg", f'<svg id="{i}">' + "<g/>" * 40 + "</svg>")
+    with zipfile.ZipFile(wallpapers / "Bench-Walls.zip", "w", zipfile.ZIP_STORED) as zf:
+        for i in range(large_files):
+            # Incompressible, like the JPEG wallpapers
+            zf.writestr(f"wall-{i}.jpg", os.urandom(1024 * 1024))
+    return root
+
+
+def make_apt_repo(root: Path) -> list[str]:
+    """A trusted local repository of three packages; returns the apt-get options using it.
+
+    bench-a and bench-b both depend on bench-common. The repository is
+    reached with APT's copy:// method, so downloaded files land in the
+    archives directory as they would from a mirror (file:// is used in place).
+    Needs dpkg-deb, dpkg-scanpackages and apt-get.
+    """
+    repo = root / "repo"
+    repo.mkdir(parents=True)
+    for name, depends in (("bench-a", "bench-common"), ("bench-b", "bench-common"), ("bench-common", None)):
+        pkg = root / "build" / name
+        control = f"Package: {name}\nVersion: 1.0\nArchitecture: all\nMaintainer: bench <bench@localhost>\n"
+        if depends:
+            control += f"Depends: {depends}\n"
+        _write(pkg / "DEBIAN" / "control", control + "Description: benchmark package\n")
+        _write(pkg / "usr" / "share" / name / "data", "x" * 65536)
+        subprocess.run(["dpkg-deb", "-Znone", "--build", str(pkg), str(repo)], stdout=subprocess.DEVNULL, check=True)
+    packages = subprocess.run(
+        ["dpkg-scanpackages", ".", "/dev/null"], cwd=repo, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True
+    ).stdout
+    (repo / "Packages").write_bytes(packages)
+
+    _write(root / "sources.list", f"deb [trusted=yes] copy://{repo} ./\n")
+    _write(root / "status", "")
+    (root / "lists" / "partial").mkdir(parents=True)
+    options = [
+        "-o", f"Dir::Etc::sourcelist={root / 'sources.list'}",
+        "-o", "Dir::Etc::sourceparts=-",
+        "-o", f"Dir::State::lists={root / 'lists'}",
+        "-o", f"Dir::State::status={root / 'status'}",
+        "-o", f"Dir::Cache={root / 'cache'}",
+    ]
+    if os.geteuid() == 0:
+        # The _apt sandbox user cannot read the temporary directory
+        options += ["-o", "APT::Sandbox::User=root"]
+    subprocess.run(["apt-get", *options, "update"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return options
+
+
+class Fixture:
+    """All fake inputs under `root`; `env()` is the environment for subprocesses."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.sysfs = make_sysfs(root / "sys")
+        # sysfs without PCI/USB: detectors fall back to the stub commands
+        self.empty_sysfs = root / "sys-empty"
+        self.empty_sysfs.mkdir()
+        self.bin = root / "bin"
+        make_stub(self.bin, "lspci", LSPCI_OUTPUT)
+        make_stub(self.bin, "lsusb", LSUSB_OUTPUT)
+        make_stub(self.bin, "rfkill", RFKILL_OUTPUT)
+        # The last candidate, so _find_terminal scans the whole list
+        make_stub(self.bin, "xterm")
+        self.sources_list, self.sources_dir = make_apt_sources(root / "apt")
+        self.assets = make_assets(root / "assets")
+        self.xdg = {
+            "XDG_CONFIG_HOME": str(root / "config"),
+            "XDG_CACHE_HOME": str(root / "cache"),
+            "XDG_STATE_HOME": str(root / "state"),
+        }
+
+    def env(self) -> dict[str, str]:
+        return {
+            **os.environ,
+            **self.xdg,
+            "BASHIUM_SYSFS": str(self.sysfs),
+            "PATH": f"{self.bin}{os.pathsep}{os.environ.get('PATH', '')}",
+        }
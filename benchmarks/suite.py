@@ -0,0 +1,507 @@
+"""Benchmark suite on fake hardware, with a JSON baseline and regression thresholds.
+
+    python3 benchmarks/suite.py                   # run, compare with the baseline
+    python3 benchmarks/suite.py --save-baseline   # run and store the results as the baseline
+    python3 benchmarks/suite.py -k detector -r 20 # only matching benchmarks, 20 runs each
+    python3 benchmarks/suite.py --check           # as in CI: a missing baseline is an error
+
+Runs headless: sysfs, lspci/lsusb/rfkill, the terminal emulator, APT sources,
+Xfce Look archives and the XDG directories are fixtures in a temporary
+directory (see fixtures.py). The palette benchmark uses stand-in widgets;
+bench_palette.py measures real cards under a display.
+
+Exits with 1 when a benchmark is slower than the baseline by more than
+--threshold (a ratio) and --min-delta milliseconds, or when one fails. With
+--check, a missing baseline or a benchmark missing from it fails as well.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import USB_DEVICES, Fixture, _write, make_apt_repo, make_sysfs  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+RESULTS_VERSION = 1
+
+# Modules the headless commands must not import (checked with -X importtime)
+GUI_MODULES = ("customtkinter", "tkinter", "PIL")
+
+# name -> setup(fixture) returning the operation to time; an operation may
+# return its own measurement as a float in seconds (e.g. from -X importtime)
+BENCHMARKS: dict[str, Callable[[Fixture], Callable[[], Optional[float]]]] = {}
+
+
+class Skip(Exception):
+    pass
+
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _run_main(fx: Fixture, *args: str) -> None:
+    subprocess.run(
+        [sys.executable, str(REPO / "main.py"), *args],
+        env=fx.env(),
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+
+
+@benchmark("startup.import_cli")
+def bench_import_cli(fx: Fixture):
+    def op() -> float:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import bashium.cli, bashium.hwcache"],
+            cwd=REPO,
+            env=fx.env(),
+            stderr=subprocess.PIPE,
+            text=True,
+            check=True,
+        )
+        total = 0
+        for line in proc.stderr.splitlines():
+            # "import time:  self [us] | cumulative | imported package"
+            parts = [p.strip() for p in line.split("|")]
+            if len(parts) != 3 or not parts[1].isdigit():
+                continue
+            name = parts[2].strip()
+            if name.split(".")[0] in GUI_MODULES:
+                raise RuntimeError(f"headless import pulled in {name}")
+            if name in ("bashium.cli", "bashium.hwcache"):
+                total += int(parts[1])
+        return total / 1e6
+    return op
+
+
+@benchmark("startup.probe_cold")
+def bench_probe_cold(fx: Fixture):
+    return lambda: _run_main(fx, "probe", "--json", "--no-cache")
+
+
+@benchmark("startup.probe_warm")
+def bench_probe_warm(fx: Fixture):
+    _run_main(fx, "probe", "--json")
+    return lambda: _run_main(fx, "probe", "--json")
+
+
+@benchmark("hardware.snapshot_sysfs")
+def bench_snapshot_sysfs(fx: Fixture):
+    from bashium.hardware import start_snapshot
+
+    return lambda: start_snapshot(sysfs=fx.sysfs).wait()
+
+
+@benchmark("hardware.snapshot_commands")
+def bench_snapshot_commands(fx: Fixture):
+    from bashium.hardware import start_snapshot
+
+    return lambda: start_snapshot(sysfs=fx.empty_sysfs).wait()
+
+
+def _detector(name: str, sysfs_attr: str):
+    def setup(fx: Fixture):
+        from bashium.hardware import HW_DETECTORS, start_snapshot
+
+        snapshot = start_snapshot(sysfs=getattr(fx, sysfs_attr)).wait()
+        detector = HW_DETECTORS[name]
+        return lambda: detector(snapshot)
+    return setup
+
+
+for _name in ("wifi", "bt", "nvidia", "usb"):
+    benchmark(f"detector.{_name}.sysfs")(_detector(_name, "sysfs"))
+    benchmark(f"detector.{_name}.commands")(_detector(_name, "empty_sysfs"))
+
+
+@benchmark("detector.nonfree.cold")
+def bench_nonfree_cold(fx: Fixture):
+    from bashium import aptsources
+
+    def op():
+        aptsources._file_cache.clear()
+        aptsources.load_sources_index(fx.sources_list, fx.sources_dir).has_component("non-free")
+    return op
+
+
+@benchmark("detector.nonfree.warm")
+def bench_nonfree_warm(fx: Fixture):
+    from bashium.aptsources import load_sources_index
+
+    return lambda: load_sources_index(fx.sources_list, fx.sources_dir).has_component("non-free")
+
+
+@benchmark("hotplug.usb_add_remove")
+def bench_hotplug(fx: Fixture):
+    # Synthetic uevents on a socketpair: plug/unplug latency, plus checks that
+    # startup results are not re-reported and that changes reach the cache
+    import socket
+    import threading
+
+    from bashium.hardware import HW_DETECTORS, HardwareSnapshot
+    from bashium.hotplug import HotplugMonitor, format_uevent
+    from bashium.hwcache import HardwareCache, fingerprint_dirs, hardware_fingerprint
+    from bashium.sysfs import read_inventory
+
+    sysfs = make_sysfs(fx.root / "sys-hotplug")
+    snapshot = HardwareSnapshot({}, read_inventory(sysfs))
+    hw_info, hw_flags = {}, {}
+    for name in ("wifi", "bt", "nvidia", "usb"):
+        hw_update, flag_update = HW_DETECTORS[name](snapshot)
+        hw_info.update(hw_update)
+        hw_flags.update(flag_update)
+    cache = HardwareCache(fx.root / "hotplug-cache.json")
+    cache.store("old", hw_info, hw_flags)
+
+    reports: list = []
+    reported = threading.Event()
+
+    def on_change(hw_update, flag_update):
+        reports.append(hw_update)
+        reported.set()
+
+    sender, source = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    HotplugMonitor(
+        on_change, source=source, sysfs=sysfs, settle=0.0, initial=(hw_info, hw_flags), cache=cache
+    ).start()
+    devpath = "/devices/pci0000:00/0000:00:14.0/usb1/1-9"
+
+    # Seeded with the startup results: an event without a change reports nothing
+    sender.send(format_uevent("bind", devpath, "usb", DEVTYPE="usb_device"))
+    if reported.wait(0.3):
+        raise RuntimeError(f"unchanged hardware reported: {reports}")
+
+    dongle = sysfs / "bus" / "usb" / "devices" / "1-9"
+    state = {"plugged": False}
+
+    def op():
+        reported.clear()
+        if state["plugged"]:
+            for path in sorted(dongle.rglob("*"), reverse=True):
+                path.unlink() if path.is_file() else path.rmdir()
+            dongle.rmdir()
+            action = "remove"
+        else:
+            _write(dongle / "idVendor", "0bda\n")
+            _write(dongle / "idProduct", "b00a\n")
+            action = "add"
+        state["plugged"] = not state["plugged"]
+        sender.send(format_uevent(action, devpath, "usb", DEVTYPE="usb_device"))
+        if not reported.wait(5):
+            raise RuntimeError(f"no update after {action}")
+        text = reports[-1].get("usb_text")
+        expected = f"USB: {len(USB_DEVICES) + state['plugged']} device(s)"
+        if text != expected:
+            raise RuntimeError(f"{action}: got {text!r}, expected {expected!r}")
+        cached = cache.load(hardware_fingerprint(fingerprint_dirs(sysfs)))
+        if cached is None or cached[0].get("usb_text") != expected:
+            raise RuntimeError("hotplug result not written to the hardware cache")
+    return op
+
+
+@benchmark("prefetch.file_repo")
+def bench_prefetch(fx: Fixture):
+    # Prefetch against a local stand-in repository: per-module batches without
+    # the packages another module already fetched, and cancellation
+    if not all(shutil.which(t) for t in ("apt-get", "dpkg-deb", "dpkg-scanpackages")):
+        raise Skip("apt-get, dpkg-deb or dpkg-scanpackages missing")
+    from bashium.prefetch import DONE, Prefetcher
+
+    root = fx.root / "prefetch"
+    options = make_apt_repo(root)
+
+    class Recording(Prefetcher):
+        def _download(self, name, packages):
+            self.batches.append((name, packages))
+            return super()._download(name, packages)
+
+    def wait_for(check, what: str, timeout: float = 10.0) -> None:
+        deadline = time.monotonic() + timeout
+        while not check():
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"timed out waiting for {what}")
+            time.sleep(0.005)
+
+    # Cancelling kills the running apt-get (here still sleeping in a wrapper)
+    slow = root / "slow-apt-get"
+    _write(slow, '#!/bin/sh\nsleep 30\nexec apt-get "$@"\n')
+    slow.chmod(0o755)
+    prefetcher = Prefetcher(archives=root / "archives-slow", apt_get=str(slow), options=options)
+    prefetcher.update({"A": ["bench-a"]})
+    wait_for(lambda: prefetcher._proc is not None, "the download to start")
+    proc = prefetcher._proc
+    prefetcher.cancel()
+    wait_for(lambda: proc.poll() is not None, "the cancelled download to stop", timeout=2.0)
+    if prefetcher.status("A") is not None:
+        raise RuntimeError("cancelled module still has a status")
+    prefetcher.close()
+
+    state = {"run": 0}
+
+    def op():
+        state["run"] += 1
+        prefetcher = Recording(archives=root / f"archives-{state['run']}", options=options)
+        prefetcher.batches = []
+        prefetcher.update({"A": ["bench-a", "bench-common"], "B": ["bench-b", "bench-common"]})
+        wait_for(lambda: all(prefetcher.status(n).state == DONE for n in "AB"), "both modules")
+        prefetcher.close()
+        expected = [("A", ("bench-a", "bench-common")), ("B", ("bench-b",))]
+        if prefetcher.batches != expected:
+            raise RuntimeError(f"unexpected batches {prefetcher.batches}")
+    return op
+
+
+class _Widget:
+    """Stand-in for a CTk widget: configure() stores the options."""
+
+    __slots__ = ("options",)
+
+    def __init__(self):
+        self.options: dict = {}
+
+    def configure(self, **options):
+        self.options.update(options)
+
+
+def _palette(cards: int):
+    def setup(fx: Fixture):
+        from bashium.styles import PALETTES, StyleRegistry
+
+        palettes = list(PALETTES.values())
+        styles = StyleRegistry(palettes[0])
+        for _ in range(cards):
+            # The widgets a ModuleCard registers, plus its state hook
+            styles.register("card", _Widget())
+            styles.register("accent-title", _Widget())
+            styles.register("body", _Widget(), _Widget())
+            styles.register("run-button", _Widget())
+            styles.register("outline-button", _Widget())
+            dot = _Widget()
+            styles.add_hook(lambda colors, dot=dot: dot.configure(text_color=colors["success"]))
+        state = {"i": 0}
+
+        def op():
+            state["i"] += 1
+            styles.apply(palettes[state["i"] % len(palettes)])
+        return op
+    return setup
+
+
+for _cards in (8, 100, 1000):
+    benchmark(f"palette.apply[{_cards}]")(_palette(_cards))
+
+
+@benchmark("terminal.find")
+def bench_find_terminal(fx: Fixture):
+    from bashium.modules import ScriptModule
+
+    module = ScriptModule("Bench", REPO / "configuration" / "firmware.sh", "")
+
+    def op():
+        # Only the fixture's xterm: every earlier candidate is looked up and missed
+        saved = os.environ["PATH"]
+        os.environ["PATH"] = str(fx.bin)
+        try:
+            argv, _ = module._find_terminal()
+        finally:
+            os.environ["PATH"] = saved
+        if argv is None or argv[0] != "xterm":
+            raise RuntimeError(f"unexpected terminal {argv}")
+    return op
+
+
+def _assets_bytes(fx: Fixture) -> int:
+    import zipfile
+
+    total = 0
+    for path in fx.assets.rglob("*.zip"):
+        with zipfile.ZipFile(path) as zf:
+            total += sum(i.file_size for i in zf.infolist())
+    return total
+
+
+@benchmark("xfce.install_cold")
+def bench_xfce_cold(fx: Fixture):
+    from bashium.xfcelook import install_assets
+
+    def op():
+        home = Path(tempfile.mkdtemp(prefix="home-", dir=fx.root))
+        try:
+            start = time.perf_counter()
+            result = install_assets(fx.assets, home)
+            elapsed = time.perf_counter() - start
+        finally:
+            shutil.rmtree(home, ignore_errors=True)
+        if not result.ok:
+            raise RuntimeError(result.failed)
+        return elapsed
+    return op
+
+
+@benchmark("xfce.install_warm")
+def bench_xfce_warm(fx: Fixture):
+    from bashium.xfcelook import install_assets
+
+    home = Path(tempfile.mkdtemp(prefix="home-", dir=fx.root))
+    install_assets(fx.assets, home)
+    return lambda: install_assets(fx.assets, home)
+
+
+@benchmark("gui.startup")
+def bench_gui_startup(fx: Fixture):
+    if not os.environ.get("DISPLAY"):
+        raise Skip("no display (run under xvfb-run)")
+    try:
+        import customtkinter as ctk
+    except ImportError:
+        raise Skip("customtkinter not installed")
+    from bashium.config import ConfigStore
+    from bashium.gui import BashiumApp
+    from bashium.modules import build_modules
+
+    modules = build_modules(REPO, {}, {})
+
+    def op():
+        root = ctk.CTk()
+        try:
+            BashiumApp(root, modules, {}, ConfigStore(fx.root / "config" / "bench.json"))
+            root.update_idletasks()
+        finally:
+            root.destroy()
+    return op
+
+
+def run_one(setup, fx: Fixture, repeat: int) -> dict:
+    op = setup(fx)
+    op()  # warm-up
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        measured = op()
+        elapsed = time.perf_counter() - start
+        times.append(measured if isinstance(measured, float) else elapsed)
+    return {
+        "median_ms": statistics.median(times) * 1000,
+        "min_ms": min(times) * 1000,
+        "runs": repeat,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta: float) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or "median_ms" not in result:
+            continue
+        now, before = result["median_ms"], base["median_ms"]
+        if before > 0 and now / before > threshold and now - before > min_delta:
+            regressions.append(f"{name}: {before:.3f} ms -> {now:.3f} ms ({now / before:.2f}x)")
+    return regressions
+
+
+def load_baseline(path: Path) -> dict:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data.get("results", {}) if data.get("version") == RESULTS_VERSION else {}
+
+
+def save_results(path: Path, results: dict) -> None:
+    data = {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-r", "--repeat", type=int, default=7, help="timed runs per benchmark")
+    parser.add_argument("-k", "--filter", help="only benchmarks whose name contains this")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results to --baseline")
+    parser.add_argument("-o", "--output", type=Path, help="also write the results to this JSON file")
+    parser.add_argument("--threshold", type=float, default=1.3, help="allowed slowdown ratio (default: 1.3)")
+    parser.add_argument("--min-delta", type=float, default=1.0, help="ignore slowdowns below this many ms")
+    parser.add_argument(
+        "--check", action="store_true", help="fail when there is no baseline to compare a benchmark with"
+    )
+    args = parser.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="bashium-suite-"))
+    saved_env = dict(os.environ)
+    results: dict[str, dict] = {}
+    failed = []
+    try:
+        fx = Fixture(work)
+        # In-process benchmarks see the fixture PATH and XDG directories too
+        os.environ.update(fx.env())
+        for name, setup in BENCHMARKS.items():
+            if args.filter and args.filter not in name:
+                continue
+            try:
+                result = run_one(setup, fx, args.repeat)
+            except Skip as e:
+                print(f"{name:<30} skipped: {e}")
+                continue
+            except Exception as e:
+                failed.append(f"{name}: {e}")
+                print(f"{name:<30} FAILED: {e}")
+                continue
+            if name == "xfce.install_cold":
+                result["mb_per_s"] = _assets_bytes(fx) / 1e6 / (result["median_ms"] / 1000)
+            results[name] = result
+            extra = f"  {result['mb_per_s']:.1f} MB/s" if "mb_per_s" in result else ""
+            print(f"{name:<30} median {result['median_ms']:10.3f} ms  min {result['min_ms']:10.3f} ms{extra}")
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_env)
+        shutil.rmtree(work, ignore_errors=True)
+
+    if args.output:
+        save_results(args.output, results)
+    if args.save_baseline:
+        save_results(args.baseline, {**load_baseline(args.baseline), **results})
+        print(f"Baseline written to {args.baseline}")
+        return 1 if failed else 0
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        return 1 if failed or args.check else 0
+    regressions = compare(results, baseline, args.threshold, args.min_delta)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    unchecked = sorted(results.keys() - baseline.keys())
+    if unchecked:
+        print(f"Not in the baseline: {', '.join(unchecked)}")
+    return 1 if regressions or failed or (args.check and unchecked) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,17 @@
 #!/bin/bash
 
 
-# Function to display a question and wait for the user's response
-ask_question(){
-    local answer
-    printf "\e[33m%s\e[0m (y/n): " "$1"
-    while true; do
-        read -rsn1 answer
-        if [[ $answer =~ ^[yYnN]$ ]]; then
-            printf "%s " "$answer" # print the answer without a newline
-            break
-        fi
-    done
-    echo "" # move to a newline
-    if [[ $answer == [yY] ]]; then
-        return 0
-    else
-        return 1
-    fi
-}
+# ask_question, pause and the unattended answers
+source "$(dirname "${BASH_SOURCE[0]}")/../lib/unattended.sh"
+
+BASHIUM_MAIN="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)/main.py"
 
 has_nonfree_enabled(){
+    # Prefer BASHIUM's APT sources parser (ignores comments and disabled entries)
+    if command -v python3 >/dev/null 2>&1 && [[ -f $BASHIUM_MAIN ]]; then
+        python3 "$BASHIUM_MAIN" sources --check non-free
+        return $?
+    fi
     if grep -Rqs -- 'non-free' /etc/apt/sources.list /etc/apt/sources.list.d 2>/dev/null; then
         return 0
     fi
@@ -51,27 +42,39 @@ ensure_non_free_components(){
     fi
 }
 
-detect_wifi_vendors(){
-    local hw
-    hw=$( (command -v lspci >/dev/null 2>&1 && lspci -nn) 2>/dev/null; (command -v lsusb >/dev/null 2>&1 && lsusb) 2>/dev/null )
-
-    wifi_intel=false
-    wifi_broadcom=false
-    wifi_realtek=false
-    wifi_atheros=false
-    wifi_mediatek=false
-    wifi_ralink=false
+detect_wifi_devices(){
+    local hw devices package ids model
+    declare -gA wifi_models=()
+
+    # Prefer BASHIUM's sysfs scan: exact device ids and models, no lspci needed.
+    # Each line is: firmware package, bus vendor:device, model
+    if command -v python3 >/dev/null 2>&1 && [[ -f $BASHIUM_MAIN ]] \
+        && devices=$(python3 "$BASHIUM_MAIN" firmware 2>/dev/null); then
+        while IFS=$'\t' read -r package ids model; do
+            [[ -n $package ]] || continue
+            wifi_models[$package]+="${wifi_models[$package]:+, }$model ($ids)"
+        done <<< "$devices"
+        return
+    fi
 
+    # Fallback: only the vendor is known
+    hw=$( (command -v lspci >/dev/null 2>&1 && lspci -nn) 2>/dev/null; (command -v lsusb >/dev/null 2>&1 && lsusb) 2>/dev/null )
     if echo "$hw" | grep -Eqi 'Network controller|Wireless|Wi-Fi|802\.11'; then
-        if echo "$hw" | grep -Eqi 'Intel|8086:'; then wifi_intel=true; fi
-        if echo "$hw" | grep -Eqi 'Broadcom|BCM|14e4:'; then wifi_broadcom=true; fi
-        if echo "$hw" | grep -Eqi 'Realtek|RTL|10ec:|0bda:'; then wifi_realtek=true; fi
-        if echo "$hw" | grep -Eqi 'Atheros|Qualcomm|168c:|0cf3:'; then wifi_atheros=true; fi
-        if echo "$hw" | grep -Eqi 'MediaTek|Mediatek|MTK|14c3:|0e8d:'; then wifi_mediatek=true; fi
-        if echo "$hw" | grep -Eqi 'Ralink|148f:'; then wifi_ralink=true; fi
+        if echo "$hw" | grep -Eqi 'Intel|8086:'; then wifi_models[firmware-iwlwifi]="Intel Wi-Fi"; fi
+        if echo "$hw" | grep -Eqi 'Broadcom|BCM|14e4:'; then wifi_models[firmware-brcm80211]="Broadcom Wi-Fi"; fi
+        if echo "$hw" | grep -Eqi 'Realtek|RTL|10ec:|0bda:'; then wifi_models[firmware-realtek]="Realtek Wi-Fi"; fi
+        if echo "$hw" | grep -Eqi 'Atheros|Qualcomm|168c:|0cf3:'; then wifi_models[firmware-atheros]="Atheros/Qualcomm Wi-Fi"; fi
+        if echo "$hw" | grep -Eqi 'MediaTek|Mediatek|MTK|14c3:|0e8d:'; then wifi_models[firmware-mediatek]="MediaTek Wi-Fi"; fi
+        if echo "$hw" | grep -Eqi 'Ralink|148f:'; then wifi_models[firmware-ralink]="Ralink Wi-Fi"; fi
     fi
 }
 
+# Asks whether to install the firmware package for the devices that need it
+ask_firmware(){
+    local package=$1
+    [[ -n ${wifi_models[$package]} ]] && ask_question "Detected ${wifi_models[$package]}. Install $package?"
+}
+
 has_nvidia_gpu(){
     if command -v lspci >/dev/null 2>&1; then
         lspci -nn | grep -qi nvidia
@@ -83,33 +86,33 @@ has_nvidia_gpu(){
 clear
 printf "\e[34m%s\e[0m\n" "Installing firmware packages"
 
-detect_wifi_vendors
+detect_wifi_devices
 
-if [[ $wifi_intel == true ]] && ask_question "Detected Intel Wi-Fi. Install firmware-iwlwifi?"; then
+if ask_firmware firmware-iwlwifi; then
     intel=true
 fi
 
-if [[ $wifi_broadcom == true ]] && ask_question "Detected Broadcom Wi-Fi. Install firmware-brcm80211?"; then
+if ask_firmware firmware-brcm80211; then
     broadcom=true
 fi
 
-if [[ $wifi_realtek == true ]] && ask_question "Detected Realtek Wi-Fi. Install firmware-realtek?"; then
+if ask_firmware firmware-realtek; then
     realtek=true
 fi
 
-if [[ $wifi_atheros == true ]] && ask_question "Detected Atheros/Qualcomm Wi-Fi. Install firmware-atheros?"; then
+if ask_firmware firmware-atheros; then
     atheros=true
 fi
 
-if [[ $wifi_mediatek == true ]] && ask_question "Detected MediaTek Wi-Fi. Install firmware-mediatek?"; then
+if ask_firmware firmware-mediatek; then
     mediatek=true
 fi
 
-if [[ $wifi_ralink == true ]] && ask_question "Detected Ralink Wi-Fi. Install firmware-ralink?"; then
+if ask_firmware firmware-ralink; then
     ralink=true
 fi
 
-if [[ $wifi_intel == false && $wifi_broadcom == false && $wifi_realtek == false && $wifi_atheros == false && $wifi_mediatek == false && $wifi_ralink == false ]]; then
+if [[ ${#wifi_models[@]} -eq 0 ]]; then
     echo "No Wi-Fi hardware detected."
 fi
 
@@ -117,7 +120,7 @@ if ask_question "Install non-free firmware bundle (firmware-linux-nonfree)?"; th
     nonfree=true
 fi
 
-read -rsn1 -p "Press Enter to continue..."
+pause
 clear
 
 # Install the appropriate firmware packages based on the responses
@@ -1,23 +1,7 @@
 #!/bin/bash
 
-# Function to display a question and wait for the user's response
-ask_question(){
-    local answer
-    printf "\e[33m%s\e[0m (y/n): " "$1"
-    while true; do
-        read -rsn1 answer
-        if [[ $answer =~ ^[yYnN]$ ]]; then
-            printf "%s " "$answer" # print the answer without a newline
-            break
-        fi
-    done
-    echo "" # move to a newline
-    if [[ $answer == [yY] ]]; then
-        return 0
-    else
-        return 1
-    fi
-}
+# ask_question, pause and the unattended answers
+source "$(dirname "${BASH_SOURCE[0]}")/../lib/unattended.sh"
 
 print_header(){
     clear
@@ -145,7 +129,10 @@ if has_nvidia_gpu; then nvidia_status="detected"; fi
 if has_nonfree_enabled; then nonfree_status="enabled"; fi
 if is_beep_disabled; then beep_status="disabled"; fi
 
-read -r -p "Enter username for user-level checks (optional, press Enter to skip): " username
+username="${BASHIUM_USERNAME:-}"
+if [[ -z $username && -z ${BASHIUM_UNATTENDED:-} ]]; then
+    read -r -p "Enter username for user-level checks (optional, press Enter to skip): " username
+fi
 if [[ -n $username ]]; then
     user_has_sbin_in_bashrc "$username"
     rc=$?
@@ -190,7 +177,7 @@ if [[ $sbin ]]; then
         ./sbin.sh
     fi
 fi
-read -rsn1 -p "Press Enter to continue..."
+pause
 
 print_header
 
@@ -203,7 +190,7 @@ else
         beep=true
     fi
 fi
-read -rsn1 -p "Press Enter to continue..."
+pause
 
 print_header
 
@@ -213,9 +200,9 @@ if has_bluetooth; then
     fi
 else
     echo "No Bluetooth controller detected. Skipping Bluetooth section."
-    read -rsn1 -p "Press Enter to continue..."
+    pause
 fi
-read -rsn1 -p "Press Enter to continue..."
+pause
 
 print_header
 
@@ -225,9 +212,9 @@ if has_wifi; then
     fi
 else
     echo "No Wi-Fi hardware detected. Skipping firmware section."
-    read -rsn1 -p "Press Enter to continue..."
+    pause
 fi
-read -rsn1 -p "Press Enter to continue..."
+pause
 clear
 
 # Run the appropriate scripts
@@ -9,23 +9,8 @@ print_header(){
 EOF
 }
 
-ask_question(){
-    local answer
-    printf "\e[33m%s\e[0m (y/n): " "$1"
-    while true; do
-        read -rsn1 answer
-        if [[ $answer =~ ^[yYnN]$ ]]; then
-            printf "%s " "$answer"
-            break
-        fi
-    done
-    echo ""
-    if [[ $answer == [yY] ]]; then
-        return 0
-    else
-        return 1
-    fi
-}
+# ask_question, pause and the unattended answers
+source "$(dirname "${BASH_SOURCE[0]}")/../lib/unattended.sh"
 
 if [[ $EUID -ne 0 ]]; then
     exec sudo -E bash "$0" "$@"
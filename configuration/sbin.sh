@@ -14,8 +14,12 @@ EOF
 
 print_header
 
-username="${1:-}"
+username="${1:-${BASHIUM_USERNAME:-}}"
 if [[ -z $username ]]; then
+    if [[ -n ${BASHIUM_UNATTENDED:-} ]]; then
+        echo "No username given (set BASHIUM_USERNAME or \"username\" in the profile)." >&2
+        exit 3
+    fi
     read -r -p "Enter the username: " username
 fi
 
@@ -0,0 +1,57 @@
+#!/bin/bash
+# Prompts shared by the module scripts; source it, do not run it.
+#
+# Unattended runs (BASHIUM_UNATTENDED set, see bashium/profile.py) take their
+# answers from the BASHIUM_ANSWERS file: one "answer<TAB>pattern" line per
+# rule, where pattern is a bash glob matched against the question. A question
+# no rule matches gets $BASHIUM_DEFAULT_ANSWER.
+
+# Answer for unattended runs: the first pattern in $BASHIUM_ANSWERS that matches
+# the question, otherwise $BASHIUM_DEFAULT_ANSWER
+preset_answer(){
+    local answer pattern
+    if [[ -r ${BASHIUM_ANSWERS:-} ]]; then
+        while IFS=$'\t' read -r answer pattern; do
+            if [[ $1 == $pattern ]]; then
+                printf '%s' "$answer"
+                return 0
+            fi
+        done < "$BASHIUM_ANSWERS"
+    fi
+    printf '%s' "${BASHIUM_DEFAULT_ANSWER:-}"
+}
+
+# Function to display a question and wait for the user's response
+ask_question(){
+    local answer
+    printf "\e[33m%s\e[0m (y/n): " "$1"
+    if [[ -n ${BASHIUM_UNATTENDED:-} ]]; then
+        answer=$(preset_answer "$1")
+        if [[ ! $answer =~ ^[yYnN]$ ]]; then
+            echo ""
+            echo "No answer for \"$1\" in unattended mode (set BASHIUM_DEFAULT_ANSWER or add it to the profile answers)." >&2
+            exit 3
+        fi
+        printf "%s " "$answer"
+    else
+        while true; do
+            read -rsn1 answer
+            if [[ $answer =~ ^[yYnN]$ ]]; then
+                printf "%s " "$answer" # print the answer without a newline
+                break
+            fi
+        done
+    fi
+    echo "" # move to a newline
+    if [[ $answer == [yY] ]]; then
+        return 0
+    else
+        return 1
+    fi
+}
+
+pause(){
+    if [[ -z ${BASHIUM_UNATTENDED:-} ]]; then
+        read -rsn1 -p "Press Enter to continue..."
+    fi
+}
@@ -1,23 +1,10 @@
 #!/bin/bash
 
-# Function to display a question and wait for the user's response
-ask_question(){
-    local answer
-    printf "\e[33m%s\e[0m (y/n): " "$1"
-    while true; do
-        read -rsn1 answer
-        if [[ $answer =~ ^[yYnN]$ ]]; then
-            printf "%s " "$answer" # print the answer without a newline
-            break
-        fi
-    done
-    echo "" # move to a newline
-    if [[ $answer == [yY] ]]; then
-        return 0
-    else
-        return 1
-    fi
-}
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+BASHIUM_MAIN="$SCRIPT_DIR/../main.py"
+
+# ask_question, pause and the unattended answers
+source "$SCRIPT_DIR/../lib/unattended.sh"
 
 print_header(){
     clear
@@ -52,28 +39,28 @@ print_header
 if ask_question "Configure audio/video codecs?"; then
     codecs=true
 fi
-read -rsn1 -p "Press Enter to continue..."
+pause
 
 print_header
 
 if ask_question "Install compilation tools?"; then
     compilation=true
 fi
-read -rsn1 -p "Press Enter to continue..."
+pause
 
 print_header
 
 if ask_question "Configure multimedia?"; then
     multimedia=true
 fi
-read -rsn1 -p "Press Enter to continue..."
+pause
 
 print_header
 
 if ask_question "Configure additional elements?"; then
     extra=true
 fi
-read -rsn1 -p "Press Enter to continue..."
+pause
 print_header
 
 codecs_status="no"
@@ -89,21 +76,25 @@ print_status_table "$codecs_status" "$compilation_status" "$multimedia_status" "
 echo ""
 
 
-# Run the appropriate scripts
-if [[ $codecs ]]; then
-    ./codecs.sh
-fi
+selected=()
+if [[ $codecs ]]; then selected+=(codecs.sh); fi
+if [[ $compilation ]]; then selected+=(compilation.sh); fi
+if [[ $multimedia ]]; then selected+=(multimedia.sh); fi
+if [[ $extra ]]; then selected+=(extra.sh); fi
 
-if [[ $compilation ]]; then
-    ./compilation.sh
-fi
-
-if [[ $multimedia ]]; then
-    ./multimedia.sh
-fi
-
-if [[ $extra ]]; then
-    ./extra.sh
+if [[ ${#selected[@]} -gt 0 ]]; then
+    if command -v python3 >/dev/null 2>&1 && [[ -f $BASHIUM_MAIN ]]; then
+        plan_args=(--execute)
+        # Nobody is there to confirm the plan in unattended runs
+        if [[ -n ${BASHIUM_UNATTENDED:-} ]]; then plan_args+=(--yes); fi
+        # One simulated plan and one APT transaction for all selected scripts
+        (cd "$SCRIPT_DIR" && python3 "$BASHIUM_MAIN" apt-plan "${plan_args[@]}" "${selected[@]}") || exit $?
+    else
+        # Run the appropriate scripts
+        for script in "${selected[@]}"; do
+            "$SCRIPT_DIR/$script" || exit $?
+        done
+    fi
 fi
 
 echo "Configuration completed."
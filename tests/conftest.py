@@ -0,0 +1,9 @@
+import pytest
+
+from benchmarks.fixtures import make_sysfs
+
+
+@pytest.fixture
+def sysfs(tmp_path):
+    """The benchmark laptop: NVIDIA GPU, Intel Wi-Fi card, USB Bluetooth dongle."""
+    return make_sysfs(tmp_path / "sys")
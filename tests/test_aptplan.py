@@ -0,0 +1,145 @@
+"""apt-plan against a fake apt-get on PATH."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from bashium.aptplan import (
+    collect_packages,
+    conditional_packages,
+    execute,
+    packages_from_script,
+    script_packages,
+    simulate,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Answers `-s install` with a simulation of every package as new; a real
+# install logs its arguments and exits with $FAKE_APT_EXIT
+FAKE_APT_GET = """#!/bin/sh
+if [ "$1" = "-s" ]; then
+    shift 2
+    for pkg in "$@"; do
+        echo "Inst $pkg (1.0 Debian:stable [amd64])"
+    done
+    echo "Need to get 2,048 kB of archives."
+    echo "After this operation, 10.5 MB of additional disk space will be used."
+    exit 0
+fi
+echo "$@" >> "$FAKE_APT_LOG"
+exit "${FAKE_APT_EXIT:-0}"
+"""
+
+# Runs the command as is, so the tests also pass without root
+FAKE_SUDO = """#!/bin/sh
+exec "$@"
+"""
+
+
+@pytest.fixture
+def fake_apt(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for name, text in (("apt-get", FAKE_APT_GET), ("sudo", FAKE_SUDO)):
+        path = bin_dir / name
+        path.write_text(text)
+        path.chmod(0o755)
+    log = tmp_path / "apt.log"
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_APT_LOG", str(log))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    return log
+
+
+def _script(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return path
+
+
+def test_install_lines_behind_assignments_env_and_sudo(tmp_path):
+    script = _script(tmp_path, "s.sh", """
+DEBIAN_FRONTEND=noninteractive apt-get install -y nvidia-detect
+env DEBIAN_FRONTEND=noninteractive apt install -y a
+sudo -E apt-get install -t bookworm-backports b "$pkg"
+sudo apt install c -y  # comment apt install d
+echo apt install e
+""")
+    assert packages_from_script(script) == ["nvidia-detect", "a", "b", "c"]
+
+
+def test_nvidia_script_has_packages():
+    packages = collect_packages([ROOT / "configuration" / "nvidia.sh"])
+    assert "nvidia-detect" in packages
+    assert "linux-headers-amd64" in packages
+
+
+def test_simulate(fake_apt):
+    plan = simulate(["a", "b"])
+    assert plan.ok
+    assert plan.install == [("a", "1.0"), ("b", "1.0")]
+    assert plan.download_bytes == 2_048_000
+    assert plan.installed_bytes == 10_500_000
+
+
+def test_execute_runs_one_transaction(fake_apt):
+    assert execute(["a", "b"]) == 0
+    assert fake_apt.read_text().split() == ["install", "-y", "a", "b"]
+
+
+def test_execute_returns_apt_status(fake_apt, monkeypatch):
+    monkeypatch.setenv("FAKE_APT_EXIT", "100")
+    assert execute(["a"]) == 100
+
+
+def test_cli_exits_with_apt_status(fake_apt, tmp_path, monkeypatch):
+    script = _script(tmp_path, "s.sh", "sudo apt install a b -y\n")
+    monkeypatch.setenv("FAKE_APT_EXIT", "100")
+    proc = subprocess.run(
+        [sys.executable, str(ROOT / "main.py"), "apt-plan", "--all", "--execute", "--yes", str(script)],
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 100
+    assert "New (2): a b" in proc.stdout
+    assert fake_apt.read_text().split() == ["install", "-y", "a", "b"]
+
+
+
+def test_packages_in_blocks_are_conditional(tmp_path):
+    script = _script(tmp_path, "s.sh", """
+banner(){
+    cat <<'EOF'
+if this were code
+EOF
+}
+sudo apt install base -y
+if [[ $intel ]]; then
+    sudo apt install firmware-iwlwifi -y
+fi
+case $x in
+    a) sudo apt install from-case -y ;;
+esac
+install_driver(){
+    apt-get install -y driver
+}
+if [[ $y ]]; then z=1; fi
+sudo apt install tail -y
+""")
+    assert script_packages(script) == [
+        ("base", False),
+        ("firmware-iwlwifi", True),
+        ("from-case", True),
+        ("driver", True),
+        ("tail", False),
+    ]
+
+
+def test_firmware_packages_are_optional():
+    scripts = [ROOT / "configuration" / "firmware.sh", ROOT / "configuration" / "bluetooth.sh"]
+    assert conditional_packages(scripts) >= {"firmware-iwlwifi", "firmware-realtek"}
+    assert "blueman" not in conditional_packages(scripts)
@@ -0,0 +1,88 @@
+"""Headless commands: what they import and what they print."""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from bashium import cli, hotplug
+
+ROOT = Path(__file__).resolve().parent.parent
+
+GUI_MODULES = ("customtkinter", "tkinter", "PIL")
+
+
+@pytest.fixture
+def xdg(tmp_path, monkeypatch):
+    env = {}
+    for name in ("XDG_CONFIG_HOME", "XDG_CACHE_HOME", "XDG_STATE_HOME"):
+        env[name] = str(tmp_path / name.lower())
+        monkeypatch.setenv(name, env[name])
+    return env
+
+
+def test_probe_does_not_import_gui(xdg):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", str(ROOT / "main.py"), "probe", "--json", "--no-cache"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = set()
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) == 3 and line.startswith("import time:"):
+            imported.add(parts[2].strip().split(".")[0])
+    assert "bashium" in imported
+    assert not imported & set(GUI_MODULES)
+    assert set(json.loads(proc.stdout)) == {"hw_info", "hw_flags", "cached"}
+
+
+class FakeMonitor:
+    """Reports two changes, then interrupts the main thread like Ctrl+C."""
+
+    def __init__(self, on_change):
+        self.on_change = on_change
+        self.stopped = False
+
+    def start(self):
+        def report():
+            self.on_change({"usb_text": "USB: 4 device(s)"}, {})
+            self.on_change({"bt_text": "Detected"}, {"bluetooth": True})
+            os.kill(os.getpid(), signal.SIGINT)
+
+        threading.Timer(0.1, report).start()
+        return self
+
+    def stop(self):
+        self.stopped = True
+
+
+def test_probe_json_watch_prints_json_lines(xdg, monkeypatch, capsys):
+    hw_info, hw_flags = {"usb_text": "USB: 3 device(s)"}, {"bluetooth": False}
+    monkeypatch.setattr(cli, "load_hardware", lambda no_cache: (hw_info, hw_flags, False))
+    monitors = []
+
+    def start_monitor(on_change, initial=None, cache=None):
+        assert initial == (hw_info, hw_flags)
+        monitors.append(FakeMonitor(on_change).start())
+        return monitors[-1]
+
+    monkeypatch.setattr(hotplug, "start_monitor", start_monitor)
+    args = cli.build_parser().parse_args(["probe", "--json", "--watch"])
+    assert cli.cmd_probe(args) == 0
+    assert monitors[0].stopped
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert lines[0] == {"hw_info": hw_info, "hw_flags": hw_flags, "cached": False}
+    assert [(line["hw_info"], line["hw_flags"]) for line in lines[1:]] == [
+        ({"usb_text": "USB: 4 device(s)"}, {}),
+        ({"bt_text": "Detected"}, {"bluetooth": True}),
+    ]
+    assert all(isinstance(line["time"], float) for line in lines[1:])
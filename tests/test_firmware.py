@@ -0,0 +1,51 @@
+"""configuration/firmware.sh questions, driven by the scan of a fake sysfs tree."""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.fixtures import _write
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def questions(sysfs):
+    """Every question the script asks when all answers are "n"."""
+    python = Path(sys.executable).parent
+    proc = subprocess.run(
+        ["bash", str(ROOT / "configuration" / "firmware.sh")],
+        env={
+            "PATH": f"{python}:/usr/bin:/bin",
+            "HOME": os.environ.get("HOME", "/"),
+            "BASHIUM_SYSFS": str(sysfs),
+            "BASHIUM_UNATTENDED": "1",
+            "BASHIUM_DEFAULT_ANSWER": "n",
+        },
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    return re.findall(r"\x1b\[33m(.*?)\x1b\[0m", proc.stdout)
+
+
+def test_questions_name_the_exact_devices(sysfs):
+    asked = questions(sysfs)
+    assert len(asked) == 2
+    assert re.fullmatch(r"Detected .+ \(pci 8086:2723\)\. Install firmware-iwlwifi\?", asked[0])
+    assert asked[1] == "Install non-free firmware bundle (firmware-linux-nonfree)?"
+
+
+def test_unbound_dongle_gets_its_own_package(sysfs):
+    usb = sysfs / "bus" / "usb" / "devices"
+    _write(usb / "1-4" / "idVendor", "0bda\n")
+    _write(usb / "1-4" / "idProduct", "8179\n")
+    _write(usb / "1-4:1.0" / "bInterfaceClass", "ff\n")
+    _write(usb / "1-4:1.0" / "bInterfaceSubClass", "ff\n")
+    _write(usb / "1-4:1.0" / "bInterfaceProtocol", "ff\n")
+    asked = questions(sysfs)
+    assert re.fullmatch(r"Detected .+ \(pci 8086:2723\)\. Install firmware-iwlwifi\?", asked[0])
+    assert re.fullmatch(r"Detected .+ \(usb 0bda:8179\)\. Install firmware-realtek\?", asked[1])
+    assert len(asked) == 3
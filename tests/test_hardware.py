@@ -0,0 +1,79 @@
+"""Wi-Fi detection against a fake sysfs tree."""
+
+import pytest
+
+from benchmarks.fixtures import _write
+from bashium.hardware import HardwareSnapshot, WifiDevice, detect_wifi_devices, detect_wifi_vendors
+from bashium.sysfs import read_inventory
+
+
+def add_usb(sysfs, name, vendor, product, interfaces=()):
+    usb = sysfs / "bus" / "usb" / "devices"
+    _write(usb / name / "idVendor", vendor + "\n")
+    _write(usb / name / "idProduct", product + "\n")
+    for i, (cls, sub, proto) in enumerate(interfaces):
+        iface = usb / f"{name}:1.{i}"
+        _write(iface / "bInterfaceClass", cls + "\n")
+        _write(iface / "bInterfaceSubClass", sub + "\n")
+        _write(iface / "bInterfaceProtocol", proto + "\n")
+    return usb / name
+
+
+@pytest.fixture
+def desktop(tmp_path):
+    """No Wi-Fi card; a Logitech receiver and a Realtek card reader on USB."""
+    sysfs = tmp_path / "sys"
+    (sysfs / "bus" / "pci" / "devices").mkdir(parents=True)
+    add_usb(sysfs, "1-1", "046d", "c52b", [("03", "01", "02")])
+    add_usb(sysfs, "1-2", "0bda", "0158", [("08", "06", "50")])
+    return sysfs
+
+
+def detect(sysfs):
+    snapshot = HardwareSnapshot({}, read_inventory(sysfs))
+    return detect_wifi_vendors(snapshot), detect_wifi_devices(snapshot)
+
+
+def test_pci_card_and_bluetooth_dongle(sysfs):
+    # The Realtek Bluetooth dongle is not a Wi-Fi adapter
+    assert detect(sysfs) == ({"Intel"}, [WifiDevice("pci", "8086", "2723")])
+
+
+def test_storage_from_a_wifi_vendor_is_not_wifi(desktop):
+    assert detect(desktop) == (set(), [])
+
+
+@pytest.mark.parametrize(
+    "vendor, product, interfaces, name",
+    [
+        # RTL8188EUS without a driver: one vendor-specific interface
+        ("0bda", "8179", [("ff", "ff", "ff")], "Realtek"),
+        # RTL8821CU: Bluetooth plus vendor-specific Wi-Fi
+        ("0bda", "c820", [("e0", "01", "01"), ("e0", "01", "01"), ("ff", "ff", "ff")], "Realtek"),
+        ("148f", "5370", [("ff", "ff", "ff")], "Ralink"),
+        ("0e8d", "7961", [("e0", "01", "01"), ("e0", "01", "01"), ("ff", "ff", "ff")], "MediaTek"),
+        # Wireless controller class, not Bluetooth
+        ("0cf3", "9271", [("e0", "02", "01")], "Atheros/Qualcomm"),
+    ],
+)
+def test_unbound_usb_dongle(desktop, vendor, product, interfaces, name):
+    add_usb(desktop, "1-3", vendor, product, interfaces)
+    vendors, devices = detect(desktop)
+    assert vendors == {name}
+    assert devices == [WifiDevice("usb", vendor, product)]
+
+
+def test_unknown_vendor_is_ignored(desktop):
+    add_usb(desktop, "1-3", "2357", "010c", [("ff", "ff", "ff")])
+    assert detect(desktop) == (set(), [])
+
+
+def test_bound_dongle_is_listed_once(desktop):
+    dongle = add_usb(desktop, "1-3", "0bda", "8179", [("ff", "ff", "ff")])
+    wlan = desktop / "class" / "net" / "wlan0"
+    (wlan / "wireless").mkdir(parents=True)
+    wlan.joinpath("device").symlink_to(dongle.parent / "1-3:1.0")
+    vendors, devices = detect(desktop)
+    assert vendors == {"Realtek"}
+    assert devices == [WifiDevice("usb", "0bda", "8179")]
+    assert devices[0].firmware == "firmware-realtek"
@@ -0,0 +1,135 @@
+"""Synthetic uevents on a socketpair, against a fake sysfs tree."""
+
+import queue
+import socket
+
+import pytest
+
+from benchmarks.fixtures import USB_DEVICES, _write
+from bashium.hardware import HW_DETECTORS, HardwareSnapshot
+from bashium.hotplug import HotplugMonitor, format_uevent
+from bashium.hwcache import HardwareCache, fingerprint_dirs, hardware_fingerprint
+from bashium.sysfs import read_inventory
+
+DEVPATH = "/devices/pci0000:00/0000:00:14.0/usb1/1-9"
+
+
+def detect_all(sysfs):
+    snapshot = HardwareSnapshot({}, read_inventory(sysfs))
+    hw_info, hw_flags = {}, {}
+    for name in ("wifi", "bt", "nvidia", "usb"):
+        hw_update, flag_update = HW_DETECTORS[name](snapshot)
+        hw_info.update(hw_update)
+        hw_flags.update(flag_update)
+    return hw_info, hw_flags
+
+
+@pytest.fixture
+def monitor(sysfs, tmp_path):
+    initial = detect_all(sysfs)
+    cache = HardwareCache(tmp_path / "hwcache.json")
+    cache.store("startup", *initial)
+    reports = queue.Queue()
+    sender, source = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    mon = HotplugMonitor(
+        lambda hw, flags: reports.put((hw, flags)),
+        source=source,
+        sysfs=sysfs,
+        settle=0.0,
+        initial=initial,
+        cache=cache,
+    ).start()
+    yield mon, sender, reports, cache
+    mon.stop()
+    sender.close()
+
+
+def test_unchanged_hardware_is_not_reported(monitor):
+    mon, sender, reports, _cache = monitor
+    sender.send(format_uevent("bind", DEVPATH, "usb", DEVTYPE="usb_device"))
+    with pytest.raises(queue.Empty):
+        reports.get(timeout=0.5)
+
+
+def test_usb_add_and_remove(monitor, sysfs):
+    mon, sender, reports, cache = monitor
+    dongle = sysfs / "bus" / "usb" / "devices" / "1-9"
+    _write(dongle / "idVendor", "0bda\n")
+    _write(dongle / "idProduct", "b00a\n")
+    sender.send(format_uevent("add", DEVPATH, "usb", DEVTYPE="usb_device"))
+    assert reports.get(timeout=5) == ({"usb_text": f"USB: {len(USB_DEVICES) + 1} device(s)"}, {})
+
+    for path in sorted(dongle.iterdir()):
+        path.unlink()
+    dongle.rmdir()
+    sender.send(format_uevent("remove", DEVPATH, "usb", DEVTYPE="usb_device"))
+    assert reports.get(timeout=5) == ({"usb_text": f"USB: {len(USB_DEVICES)} device(s)"}, {})
+
+
+def test_bluetooth_dongle_enables_bluetooth(tmp_path):
+    sysfs = tmp_path / "sys"
+    _write(sysfs / "bus" / "usb" / "devices" / "1-1" / "idVendor", "046d\n")
+    _write(sysfs / "bus" / "usb" / "devices" / "1-1" / "idProduct", "c52b\n")
+    (sysfs / "bus" / "pci" / "devices").mkdir(parents=True)
+    initial = detect_all(sysfs)
+    assert initial[1]["bluetooth"] is False
+    reports = queue.Queue()
+    sender, source = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    mon = HotplugMonitor(
+        lambda hw, flags: reports.put((hw, flags)), source=source, sysfs=sysfs, settle=0.0, initial=initial
+    ).start()
+    try:
+        dongle = sysfs / "bus" / "usb" / "devices"
+        _write(dongle / "1-2" / "idVendor", "0bda\n")
+        _write(dongle / "1-2" / "idProduct", "8771\n")
+        _write(dongle / "1-2:1.0" / "bInterfaceClass", "e0\n")
+        _write(dongle / "1-2:1.0" / "bInterfaceSubClass", "01\n")
+        _write(dongle / "1-2:1.0" / "bInterfaceProtocol", "01\n")
+        sender.send(format_uevent("add", "/devices/usb1/1-2", "usb", DEVTYPE="usb_device"))
+        hw_update, flag_update = reports.get(timeout=5)
+    finally:
+        mon.stop()
+        sender.close()
+    assert flag_update == {"bluetooth": True}
+    assert hw_update["usb_text"] == "USB: 2 device(s)"
+
+
+def test_changes_are_cached_under_the_fake_tree_fingerprint(monitor, sysfs):
+    mon, sender, reports, cache = monitor
+    _write(sysfs / "bus" / "usb" / "devices" / "1-9" / "idVendor", "0bda\n")
+    sender.send(format_uevent("add", DEVPATH, "usb", DEVTYPE="usb_device"))
+    reports.get(timeout=5)
+
+    cached = cache.load(hardware_fingerprint(fingerprint_dirs(sysfs)))
+    assert cached is not None
+    assert cached[0]["usb_text"] == f"USB: {len(USB_DEVICES) + 1} device(s)"
+    # The host's key is left alone
+    assert cache.load(hardware_fingerprint()) is None
+
+
+def test_unbound_wifi_dongle_enables_wifi(tmp_path):
+    sysfs = tmp_path / "sys"
+    (sysfs / "bus" / "pci" / "devices").mkdir(parents=True)
+    (sysfs / "bus" / "usb" / "devices").mkdir(parents=True)
+    initial = detect_all(sysfs)
+    assert initial[1]["wifi"] is False
+    reports = queue.Queue()
+    sender, source = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    mon = HotplugMonitor(
+        lambda hw, flags: reports.put((hw, flags)), source=source, sysfs=sysfs, settle=0.0, initial=initial
+    ).start()
+    try:
+        # No driver bound, so no net or rfkill events follow
+        usb = sysfs / "bus" / "usb" / "devices"
+        _write(usb / "1-1" / "idVendor", "148f\n")
+        _write(usb / "1-1" / "idProduct", "5370\n")
+        _write(usb / "1-1:1.0" / "bInterfaceClass", "ff\n")
+        _write(usb / "1-1:1.0" / "bInterfaceSubClass", "ff\n")
+        _write(usb / "1-1:1.0" / "bInterfaceProtocol", "ff\n")
+        sender.send(format_uevent("add", "/devices/usb1/1-1", "usb", DEVTYPE="usb_device"))
+        hw_update, flag_update = reports.get(timeout=5)
+    finally:
+        mon.stop()
+        sender.close()
+    assert flag_update == {"wifi": True}
+    assert hw_update["wifi_text"].startswith("Detected: ")
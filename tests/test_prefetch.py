@@ -0,0 +1,89 @@
+"""The prefetcher against a local repository, with the real apt-get."""
+
+import shutil
+import time
+
+import pytest
+
+from benchmarks.fixtures import _write, make_apt_repo
+from bashium.prefetch import DONE, Prefetcher, archives_dir
+
+pytestmark = pytest.mark.skipif(
+    not all(shutil.which(t) for t in ("apt-get", "dpkg-deb", "dpkg-scanpackages")),
+    reason="apt-get, dpkg-deb or dpkg-scanpackages missing",
+)
+
+
+class Recording(Prefetcher):
+    """Remembers which packages each apt-get run was given."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+
+    def _download(self, name, packages):
+        self.batches.append((name, packages))
+        return super()._download(name, packages)
+
+
+def wait_for(check, what: str, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not check():
+        if time.monotonic() > deadline:
+            raise AssertionError(f"timed out waiting for {what}")
+        time.sleep(0.01)
+
+
+@pytest.fixture(scope="module")
+def repo(tmp_path_factory):
+    root = tmp_path_factory.mktemp("apt")
+    return root, make_apt_repo(root)
+
+
+@pytest.fixture
+def cache_home(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
+def debs(archives):
+    return sorted(p.name for p in archives.glob("*.deb"))
+
+
+def test_shared_packages_are_downloaded_once_into_archives_dir(repo, cache_home):
+    _root, options = repo
+    prefetcher = Recording(options=options)
+    try:
+        prefetcher.update({"A": ["bench-a", "bench-common"], "B": ["bench-b", "bench-common"]})
+        wait_for(lambda: all(prefetcher.status(n).state == DONE for n in "AB"), "both modules")
+    finally:
+        prefetcher.close()
+
+    assert prefetcher.batches == [("A", ("bench-a", "bench-common")), ("B", ("bench-b",))]
+    assert prefetcher.archives == archives_dir()
+    assert debs(archives_dir()) == ["bench-a_1.0_all.deb", "bench-b_1.0_all.deb", "bench-common_1.0_all.deb"]
+
+
+def test_unticking_a_module_cancels_its_download(repo, tmp_path):
+    root, options = repo
+    # Sleeps before downloading bench-a, so there is time to untick A
+    wrapper = tmp_path / "apt-get"
+    _write(wrapper, '#!/bin/sh\ncase "$*" in *bench-a*) sleep 30 ;; esac\nexec apt-get "$@"\n')
+    wrapper.chmod(0o755)
+    archives = tmp_path / "archives"
+    changes = []
+    prefetcher = Prefetcher(changes.append, archives=archives, apt_get=str(wrapper), options=options)
+    try:
+        prefetcher.update({"A": ["bench-a"], "B": ["bench-b"]})
+        wait_for(lambda: prefetcher._proc is not None, "A's download to start")
+        proc = prefetcher._proc
+
+        prefetcher.update({"B": ["bench-b"]})
+        wait_for(lambda: proc.poll() is not None, "A's apt-get to be killed", timeout=2.0)
+        assert prefetcher.status("A") is None
+        wait_for(lambda: prefetcher.status("B").state == DONE, "B")
+    finally:
+        prefetcher.close()
+
+    assert "A" in changes
+    # B and its dependency, nothing of A
+    assert debs(archives) == ["bench-b_1.0_all.deb", "bench-common_1.0_all.deb"]
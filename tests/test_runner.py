@@ -0,0 +1,38 @@
+"""Scripts under a pty: controlling terminal, prompts and escape sequences."""
+
+import threading
+
+from bashium.runner import AnsiStripper, PtyRun, strip_ansi
+
+
+def run(argv, answer=None):
+    output = []
+    finished = threading.Event()
+    pty_run = PtyRun(argv, on_output=output.append, on_exit=lambda code: finished.set()).start()
+    if answer is not None:
+        pty_run.write(answer)
+    assert finished.wait(10)
+    return pty_run.returncode, "".join(output)
+
+
+def test_pty_is_the_controlling_terminal():
+    # /dev/tty only opens with a controlling terminal, as sudo's prompt needs
+    code, output = run(["bash", "-c", "echo to-tty > /dev/tty && read -r -p 'name? ' name && echo hi $name"], "bob\r")
+    assert code == 0
+    assert "to-tty" in output
+    assert "hi bob" in output
+
+
+def test_exit_status_and_missing_command():
+    assert run(["bash", "-c", "exit 3"])[0] == 3
+    code, output = run(["bashium-no-such-command"])
+    assert code == 127
+    assert "bashium-no-such-command" in output
+
+
+def test_escape_sequence_split_across_reads():
+    text = "\x1b[1;33mQuestion\x1b[0m (y/n): \x1b]0;title\x07done\r\n"
+    for size in range(1, len(text) + 1):
+        stripper = AnsiStripper()
+        chunks = [stripper.feed(text[i:i + size]) for i in range(0, len(text), size)]
+        assert "".join(chunks) + stripper.feed("", final=True) == strip_ansi(text)
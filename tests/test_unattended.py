@@ -0,0 +1,48 @@
+"""lib/unattended.sh, the prompts every module script sources."""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from bashium.profile import Profile, write_answers
+
+ROOT = Path(__file__).resolve().parent.parent
+HELPER = ROOT / "lib" / "unattended.sh"
+SCRIPTS = ("configuration/install.sh", "configuration/firmware.sh", "configuration/nvidia.sh", "software/install.sh")
+
+
+def ask(question, env):
+    proc = subprocess.run(
+        ["bash", "-c", 'source "$0"; ask_question "$1" && echo YES || echo NO', str(HELPER), question],
+        env={"PATH": "/usr/bin:/bin", "BASHIUM_UNATTENDED": "1", **env},
+        capture_output=True,
+        text=True,
+    )
+    return proc.returncode, proc.stdout.split()[-1] if proc.stdout.split() else ""
+
+
+@pytest.fixture
+def answers(tmp_path):
+    profile = Profile(modules=(), answers=(("Install compilation tools?", "y"), ("*firmware*", "n")))
+    path = tmp_path / "answers.tsv"
+    write_answers(profile, path)
+    return str(path)
+
+
+def test_first_matching_pattern_wins(answers):
+    assert ask("Install compilation tools?", {"BASHIUM_ANSWERS": answers}) == (0, "YES")
+    assert ask("Install firmware-iwlwifi?", {"BASHIUM_ANSWERS": answers, "BASHIUM_DEFAULT_ANSWER": "y"}) == (0, "NO")
+
+
+def test_default_answer_and_missing_answer(answers):
+    assert ask("Configure multimedia?", {"BASHIUM_ANSWERS": answers, "BASHIUM_DEFAULT_ANSWER": "y"}) == (0, "YES")
+    code, _ = ask("Configure multimedia?", {"BASHIUM_ANSWERS": answers})
+    assert code == 3
+
+
+@pytest.mark.parametrize("script", SCRIPTS)
+def test_scripts_source_the_helper(script):
+    text = (ROOT / script).read_text()
+    assert "lib/unattended.sh" in text
+    assert "preset_answer(){" not in text
@@ -2,6 +2,7 @@
 
 # Find the path to the directory where the script is lockated
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+BASHIUM_MAIN="$SCRIPT_DIR/../main.py"
 
 print_header(){
     clear
@@ -41,7 +42,14 @@ EOF
 
 # Ask for the username
 print_header
-read -p "Enter the username: " USERNAME
+USERNAME="${BASHIUM_USERNAME:-}"
+if [[ -z $USERNAME ]]; then
+    if [[ -n ${BASHIUM_UNATTENDED:-} ]]; then
+        echo "No username given (set BASHIUM_USERNAME or \"username\" in the profile)." >&2
+        exit 3
+    fi
+    read -p "Enter the username: " USERNAME
+fi
 
 # Determine the user's home directory
 HOME_DIR="/home/$USERNAME"
@@ -69,17 +77,26 @@ mkdir -p "$THEMES_DIR"
 mkdir -p "$WALLPAPERS_DIR"
 mkdir -p "$ICONS_DIR"
 
-# Unzip .zip files to the appropriate directories
-for dir in icons themes wallpapers; do
-    if [ -d "$SCRIPT_DIR/$dir" ]; then
-        cd "$SCRIPT_DIR/$dir"
-        for zip_file in *.zip; do
-            if [ -f "$zip_file" ]; then
-                echo "Unzipping $zip_file to $HOME_DIR/.$dir"
-                unzip -o "$zip_file" -d "$HOME_DIR/.$dir"
-            fi
-        done
-    fi
-done
+unzip_all(){
+    for dir in icons themes wallpapers; do
+        if [ -d "$SCRIPT_DIR/$dir" ]; then
+            cd "$SCRIPT_DIR/$dir"
+            for zip_file in *.zip; do
+                if [ -f "$zip_file" ]; then
+                    echo "Unzipping $zip_file to $HOME_DIR/.$dir"
+                    unzip -o "$zip_file" -d "$HOME_DIR/.$dir"
+                fi
+            done
+        fi
+    done
+}
+
+# Extract in parallel, skipping archives that are already installed
+if command -v python3 >/dev/null 2>&1 && [[ -f $BASHIUM_MAIN ]]; then
+    # The installer reports its own failures; unzipping everything again would hide them
+    python3 "$BASHIUM_MAIN" xfce-look --home "$HOME_DIR" --assets "$SCRIPT_DIR" || exit $?
+else
+    unzip_all
+fi
 
 echo "Installation completed."